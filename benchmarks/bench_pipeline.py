@@ -0,0 +1,213 @@
+"""視窗管理流程（列舉 → 排版 → 套用）效能測試
+
+在模擬桌面上以不同視窗數量執行 manage_windows、get_window_list 與
+update_window_list，記錄各階段耗時、峰值記憶體與後端呼叫次數，並輸出 JSON
+以便比較不同版本之間的差異。
+
+用法:
+    python benchmarks/bench_pipeline.py --scales 10 100 1000 5000 --output bench.json
+    python benchmarks/bench_pipeline.py --compare old.json new.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.window_backend import SimulatedBackend
+from functions.MainTab_functions import MainTabFunctions
+
+DEFAULT_SCALES = [10, 100, 500, 1000, 5000, 10000]
+TITLE = 'BenchTarget'
+MONITOR_WIDTH = 1920
+MONITOR_HEIGHT = 1080
+WINDOW_WIDTH = 480
+WINDOW_HEIGHT = 344
+
+
+def build_desktop(count: int, noise_ratio: float) -> SimulatedBackend:
+    """建立可容納指定數量視窗的模擬桌面"""
+    per_monitor = (MONITOR_WIDTH // WINDOW_WIDTH) * (MONITOR_HEIGHT // WINDOW_HEIGHT)
+    monitor_count = max(1, math.ceil(count / per_monitor))
+    backend = SimulatedBackend([
+        {'left': i * MONITOR_WIDTH, 'top': 0, 'width': MONITOR_WIDTH, 'height': MONITOR_HEIGHT}
+        for i in range(monitor_count)
+    ])
+    backend.create_windows(TITLE, count)
+    backend.create_windows('Noise', int(count * noise_ratio))
+    return backend
+
+
+def measure(func: Callable, repeat: int, idempotent: bool = True) -> Dict:
+    """執行並記錄耗時與峰值記憶體
+
+    計時時不開啟 tracemalloc，避免追蹤成本影響結果；峰值記憶體另外以一次
+    追蹤執行取得。非冪等的操作只執行一次，並在追蹤下同時計時。
+    """
+    timings = []
+    if idempotent:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if not timings:
+        timings.append(elapsed)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'max_s': max(timings),
+        'peak_bytes': peak,
+    }
+
+
+def registry_bytes(functions: MainTabFunctions) -> int:
+    """估計已管理視窗登錄表本身（紀錄、索引與排序列表）佔用的記憶體"""
+    registry = functions.window_positions
+    total = sum(sys.getsizeof(container) for container in (registry._by_hwnd, registry._by_slot, registry._by_group,
+                                                           registry._by_pid, registry._ordered))
+    for slots in registry._by_slot.values():
+        total += sys.getsizeof(slots) + sum(sys.getsizeof(key) for key in slots)
+    for index in (registry._by_group, registry._by_pid):
+        total += sum(sys.getsizeof(windows) for windows in index.values())
+    total += sum(sys.getsizeof(window) for window in registry._ordered)
+    return total
+
+
+def lookup_all(functions: MainTabFunctions) -> None:
+    """以 hwnd、格位與列位置查詢每個已管理視窗"""
+    registry = functions.window_positions
+    for window in registry.records():
+        registry.get(window.hwnd)
+        registry.at_slot(window.group, window.x, window.y)
+        registry.row_of(window.hwnd)
+
+
+def create_qt_refresh(functions: MainTabFunctions):
+    """建立離屏的視窗表格，回傳與 MainTab.update_window_list 相同的更新步驟
+
+    不建立 MainTab，避免讀寫使用者的設定與格位檔、啟動背景執行緒或接回真實
+    視窗；環境沒有 PyQt6 時回傳 None。
+    """
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt6.QtWidgets import QApplication, QTableView
+        from window_table_model import WindowTableModel
+    except ImportError:
+        return None
+    app = QApplication.instance() or QApplication([])
+    model = WindowTableModel(functions)
+    view = QTableView()
+    view.setModel(model)
+
+    def update_window_list() -> None:
+        functions.window_index.ensure_fresh()
+        model.set_windows(functions.listed_windows())
+
+    update_window_list.keep_alive = (app, model, view)
+    return update_window_list
+
+
+def run_scale(count: int, repeat: int, noise_ratio: float) -> Dict:
+    """在指定視窗數量下執行各階段"""
+    backend = build_desktop(count, noise_ratio)
+    # 不保存格位（slot_store 為 None），也不啟動取樣、探測、節流與重試等背景執行緒
+    functions = MainTabFunctions(backend)
+    phases = {}
+
+    def phase(name: str, func: Callable, idempotent: bool = True) -> None:
+        backend.reset_counts()
+        result = measure(func, repeat, idempotent)
+        runs = repeat + 1 if idempotent else 1
+        result['backend_calls'] = sum(backend.call_counts.values()) // runs
+        phases[name] = result
+
+    # 第一次套用包含配置新位置，只能量測一次
+    phase('manage_windows_initial', lambda: functions.manage_windows(TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, True), False)
+    phase('manage_windows_reapply', lambda: functions.manage_windows(TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, True))
+    phase('get_window_list', functions.get_window_list)
+    phase('registry_lookup', lambda: lookup_all(functions))
+
+    update_window_list = create_qt_refresh(functions)
+    if update_window_list is not None:
+        phase('update_window_list', update_window_list)
+
+    return {
+        'windows': count,
+        'total_windows': len(backend.windows),
+        'monitors': len(backend.monitors),
+        'managed': len(functions.window_positions),
+        'registry_bytes': registry_bytes(functions),
+        'phases': phases,
+    }
+
+
+def run(scales: List[int], repeat: int, noise_ratio: float) -> Dict:
+    results = []
+    for count in scales:
+        result = run_scale(count, repeat, noise_ratio)
+        results.append(result)
+        for name, data in result['phases'].items():
+            print(f"{count:>6} {name:<24} {data['median_s'] * 1000:10.3f} ms "
+                  f"{data['peak_bytes'] / 1024:10.1f} KiB {data['backend_calls']:>8} calls")
+        print(f"{count:>6} {'registry':<24} {result['registry_bytes'] / 1024:24.1f} KiB")
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'noise_ratio': noise_ratio,
+        'results': results,
+    }
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """比較兩份結果的中位數耗時"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {r['windows']: r for r in json.load(f)['results']}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = {r['windows']: r for r in json.load(f)['results']}
+    for count in sorted(set(old) & set(new)):
+        for name, data in new[count]['phases'].items():
+            before = old[count]['phases'].get(name)
+            if before is None:
+                continue
+            ratio = data['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+            print(f"{count:>6} {name:<24} {before['median_s'] * 1000:10.3f} ms -> "
+                  f"{data['median_s'] * 1000:10.3f} ms  x{ratio:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='視窗管理流程效能測試')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--noise-ratio', type=float, default=1.0,
+                        help='每個目標視窗對應的無關視窗數量')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.scales, args.repeat, args.noise_ratio)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"結果已寫入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,26 @@
-import win32gui
-import win32con
-import win32api
-import subprocess
-import time
+import threading
 import logging
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from functions.window_backend import (WindowBackend, create_backend, WS_CAPTION, WS_THICKFRAME,
+                                      SWP_NOMOVE, SWP_NOSIZE, SWP_NOZORDER, SWP_FRAMECHANGED, SWP_NOACTIVATE,
+                                      SWP_SHOWWINDOW, SWP_HIDEWINDOW, SW_SHOWNOACTIVATE, SW_SHOWMINNOACTIVE)
+from functions.slot_allocator import SlotAllocator, PageAllocator
+from functions.window_index import WindowIndex
+from functions.monitor_topology import MonitorTopology
+from functions.launcher import InstanceLauncher
+from functions.supervisor import ProcessSupervisor
+from functions.process_metrics import ProcessMetricsCollector, create_process_reader
+from functions.health_probe import HealthProbeScheduler
+from functions.process_throttle import InstanceThrottler, create_process_controller
+from functions.window_writer import WindowWriter
+from functions.auto_tiler import AutoTiler
+from functions.window_matcher import MatcherIndex, WindowGroup
+from functions.slot_store import SlotStore, SlotRecord
+from functions.window_registry import WindowRegistry, ManagedWindow
+from functions.bin_packer import WindowPacker
+from functions.load_monitor import AdaptiveRateController, create_load_sampler
+from functions.window_plan import LayoutPlan, WindowChange, diff_window
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,23 +29,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger('MainTab_Functions')
 
+# 背景執行時的回報函式：(已完成數量, 總數, 訊息)
+ProgressCallback = Callable[[int, int, str], None]
+
 class MainTabFunctions:
-    def __init__(self):
-        self.window_positions = {}
+    def __init__(self, backend: Optional[WindowBackend] = None, slot_store: Optional[SlotStore] = None):
+        self.backend = backend if backend is not None else create_backend()
+        # 保存格位分配的位置，None 表示不保存
+        self.slot_store = slot_store
+        self._process_names: Dict[int, str] = {}
+        self.window_positions = WindowRegistry()
+        self.slot_allocator = SlotAllocator()
+        # 每個群組各自的格位，'' 為單一標題排版使用的預設群組
+        self.slot_allocators: Dict[str, SlotAllocator] = {'': self.slot_allocator}
+        # 每個群組超出螢幕格位的視窗放入的虛擬分頁
+        self.page_allocators: Dict[str, PageAllocator] = {}
+        # bypass_limit 時是否把超出的視窗放到虛擬分頁，否則往最後一格右側排列
+        self.overflow_pages = False
+        # 不在目前頁面的視窗處理方式：'hide' 隱藏，'minimize' 最小化
+        self.page_out_mode = 'hide'
+        self.active_page = 0
+        # 緊密排列不同大小視窗時使用的裝箱狀態
+        self.packer = WindowPacker()
+        self.window_index = WindowIndex(self.backend)
+        self.monitor_topology = MonitorTopology(self.backend)
+        self.rate_controller = AdaptiveRateController(create_load_sampler())
+        self.supervisor = ProcessSupervisor()
+        self.launcher = InstanceLauncher(self.window_index, spawn=self.supervisor.spawn, rate_controller=self.rate_controller)
+        # 等待重新啟動的實例保留原本的格位：{launch_index: 原本的視窗紀錄}
+        self.slot_reservations: Dict[int, ManagedWindow] = {}
+        # 各群組最近一次排版的視窗大小與樣式，重新啟動的視窗依此放回原位
+        self.layout_options: Dict[str, Dict] = {}
+        self.process_metrics = ProcessMetricsCollector(create_process_reader(), self.tracked_pids)
+        self.health_probe = HealthProbeScheduler(self.backend, self._probe_targets, on_hung=self.on_window_hung)
+        # 依政策節流背景實例，聚焦的視窗立即恢復
+        self.throttler = InstanceThrottler(create_process_controller(self.backend), self.throttle_states)
+        self.window_index.add_listener(self._on_foreground)
+        # 視窗無回應時是否結束其行程，交由 supervisor 重新啟動
+        self.restart_hung = False
+        self.window_writer = WindowWriter(self.backend, self.window_index)
+        # 自動排版新視窗使用的 manage_windows 參數，None 表示未開啟
+        self.watch_options: Optional[Dict] = None
+        self.auto_tiler = AutoTiler(self.window_index, self._auto_tile, self._is_new_match)
+        # 排版可能在背景執行緒進行，同一時間只允許一個排版修改 window_positions
+        self._layout_lock = threading.Lock()
 
-    def execute_program(self, program_path: str, count: int) -> Tuple[bool, str]:
-        """執行程式指定次數"""
+    def execute_program(self, program_path: str, count: int, title: Optional[str] = None, max_in_flight: Optional[int] = None, adaptive: bool = False, progress: Optional[ProgressCallback] = None, partial: Optional[Callable] = None, cancel_event: Optional[threading.Event] = None) -> Tuple[bool, str]:
+        """執行程式指定次數，等待每個實例的視窗出現後才啟動下一批"""
         try:
             logger.info(f"開始執行程式: {program_path}, 次數: {count}")
-            for i in range(count):
-                subprocess.Popen(
-                    ['start', '', program_path], 
-                    shell=True, 
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                time.sleep(0.3)
-            logger.info("程式執行完成")
-            return True, f"成功執行程式 {count} 次"
+            if max_in_flight is not None:
+                self.launcher.max_in_flight = max(1, max_in_flight)
+            results = self.launcher.launch(program_path, count, title, adaptive, progress, partial, cancel_event)
+            latencies = [r.latency for r in results if r.latency is not None]
+            timed_out = sum(1 for r in results if r.timed_out)
+            logger.info(f"程式執行完成，啟動延遲: {[round(latency, 2) for latency in latencies]}")
+
+            message = f"成功執行程式 {len(results)} 次"
+            if latencies:
+                message += f"，{len(latencies)} 個視窗就緒，平均 {sum(latencies) / len(latencies):.2f} 秒"
+            if timed_out:
+                message += f"，{timed_out} 個等待逾時"
+            if cancel_event is not None and cancel_event.is_set():
+                return False, f"已取消，{message}"
+            return True, message
         except Exception as e:
             error_msg = f"執行錯誤: {str(e)}"
             logger.error(error_msg)
@@ -38,36 +101,8 @@ class MainTabFunctions:
     def get_screen_info(self) -> List[Dict]:
         """獲取所有螢幕的資訊"""
         try:
-            screens = []
-            # 獲取主螢幕資訊
-            main_screen = {
-                'left': 0,
-                'top': 0,
-                'width': win32api.GetSystemMetrics(win32con.SM_CXSCREEN),
-                'height': win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-            }
-            screens.append(main_screen)
-
-            # 檢查是否有第二螢幕
-            if win32api.GetSystemMetrics(win32con.SM_CMONITORS) > 1:
-                # 獲取虛擬螢幕的總大小
-                virtual_width = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN)
-                virtual_height = win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN)
-                virtual_left = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN)
-                virtual_top = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN)
-
-                # 如果虛擬螢幕的寬度大於主螢幕，表示有右側螢幕
-                if virtual_width > main_screen['width']:
-                    second_screen = {
-                        'left': main_screen['width'],
-                        'top': 0,
-                        'width': virtual_width - main_screen['width'],
-                        'height': virtual_height
-                    }
-                    screens.append(second_screen)
-                
-            logger.info(f"成功獲取螢幕資訊: {screens}")
-            return screens
+            # 快取到顯示設定改變為止，排版時不再重新查詢
+            return self.monitor_topology.get_monitors()
             
         except Exception as e:
             error_msg = f"獲取螢幕資訊時發生錯誤: {str(e)}"
@@ -80,128 +115,787 @@ class MainTabFunctions:
         vertical = screen_info['height'] // window_height
         return horizontal, vertical
 
-    def manage_windows(self, title: str, window_width: int, window_height: int, remove_title: bool = False, dont_movewindow: bool = False, remove_border: bool = False, bypass_limit: bool = False) -> Tuple[bool, str]:
+    def manage_windows(self, title: str, window_width: int, window_height: int, remove_title: bool = False, dont_movewindow: bool = False, remove_border: bool = False, bypass_limit: bool = False, strategy: str = 'grid', rows: int = 0, columns: int = 0, dry_run: bool = False, progress: Optional[ProgressCallback] = None, partial: Optional[Callable] = None, cancel_event: Optional[threading.Event] = None) -> Tuple[bool, str]:
         """管理指定標題的視窗"""
+        with self._layout_lock:
+            if progress is not None:
+                progress(0, 2, "計算視窗排版中")
+            success, message, plan = self.plan_windows(title, window_width, window_height, remove_title, dont_movewindow, remove_border, bypass_limit, strategy, rows, columns)
+            if not success:
+                return False, message
+            if dry_run:
+                return True, f"預計執行 {plan.operation_count} 個操作，{plan.unchanged} 個視窗無需變更"
+            if partial is not None:
+                partial(plan)
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "已取消，未變更任何視窗"
+            if progress is not None:
+                progress(1, 2, f"套用 {len(plan.changes)} 個視窗變更中")
+            self.layout_options[''] = {
+                'width': window_width,
+                'height': window_height,
+                'remove_title': remove_title,
+                'remove_border': remove_border
+            }
+            return self.apply_plan(plan)
+
+    def manage_groups(self, groups: List[WindowGroup], pack: bool = False, dry_run: bool = False, progress: Optional[ProgressCallback] = None, partial: Optional[Callable] = None, cancel_event: Optional[threading.Event] = None) -> Tuple[bool, str]:
+        """一次列舉同時管理多個群組的視窗，各群組使用自己的大小、樣式與區域"""
+        with self._layout_lock:
+            if progress is not None:
+                progress(0, 2, "計算群組排版中")
+            success, message, plan = self.plan_groups(groups, pack)
+            if not success:
+                return False, message
+            if dry_run:
+                return True, f"預計執行 {plan.operation_count} 個操作，{plan.unchanged} 個視窗無需變更"
+            if partial is not None:
+                partial(plan)
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "已取消，未變更任何視窗"
+            if progress is not None:
+                progress(1, 2, f"套用 {len(plan.changes)} 個視窗變更中")
+            for group in groups:
+                self.layout_options[group.name] = {
+                    'width': group.width,
+                    'height': group.height,
+                    'remove_title': group.remove_title,
+                    'remove_border': group.remove_border
+                }
+            return self.apply_plan(plan)
+
+    def plan_groups(self, groups: List[WindowGroup], pack: bool = False) -> Tuple[bool, str, Optional[LayoutPlan]]:
+        """以單次走訪解析所有群組的視窗並合併成一個排版計畫
+
+        pack 為 True 時忽略各群組的區域與排版方式，把所有群組大小不同的視窗
+        一起裝入所有螢幕。
+        """
         try:
             screens = self.get_screen_info()
             if not screens:
-                return False, "無法獲取螢幕資訊"
+                return False, "無法獲取螢幕資訊", None
+            if not groups:
+                return False, "沒有設定任何群組", None
+
+            self.window_index.ensure_fresh()
+            matched = MatcherIndex(groups, self.backend).resolve(self.window_index, self._paged_out)
+            if pack:
+                return self._plan_packed(groups, matched, screens)
+
+            plan = LayoutPlan("")
+            summary = []
+            for group, current_windows, region in zip(groups, matched, self._group_regions(groups, screens)):
+                summary.append(f"{group.name} {len(current_windows)} 個")
+                success, message, group_plan = self._plan_group(
+                    group.name, current_windows, region, group.width, group.height,
+                    group.remove_title, False, group.remove_border, group.bypass_limit,
+                    group.strategy, group.rows, group.columns)
+                if not success:
+                    return False, f"{group.name}: {message}", None
+                plan.positions.update(group_plan.positions)
+                plan.removed.extend(group_plan.removed)
+                plan.changes.extend(group_plan.changes)
+                plan.unchanged += group_plan.unchanged
+                plan.allocators.update(group_plan.allocators)
+            plan.message = f"成功處理群組：{'，'.join(summary)}"
+            return True, plan.message, plan
+
+        except Exception as e:
+            error_msg = f"管理群組時發生錯誤: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg, None
+
+    def _plan_packed(self, groups: List[WindowGroup], matched: List[List[int]], screens: List[Dict]) -> Tuple[bool, str, Optional[LayoutPlan]]:
+        """以 MaxRects 裝箱排列不同大小的視窗，已放置的視窗維持原位"""
+        packer = self.packer.copy()
+        packer.configure(screens)
+        current: Dict[int, WindowGroup] = {}
+        for group, hwnds in zip(groups, matched):
+            for hwnd in hwnds:
+                current.setdefault(hwnd, group)
+
+        # 已不符合、大小改變或被其他排版移動的視窗歸還空間
+        for hwnd, (_, x, y, width, height) in list(packer.placements.items()):
+            group = current.get(hwnd)
+            pos = self.window_positions.get(hwnd)
+            if (group is None or pos is None or pos.group != group.name or (pos.x, pos.y) != (x, y)
+                    or (width, height) != (group.width, group.height)):
+                packer.remove(hwnd)
+
+        plan = LayoutPlan("")
+        names = {group.name for group in groups}
+        plan.removed = [pos.hwnd for pos in self.window_positions.records()
+                        if pos.group in names and pos.hwnd not in current]
+
+        # 大的視窗先放，同樣大小依啟動順序
+        new_hwnds = sorted((hwnd for hwnd in current if hwnd not in packer.placements),
+                           key=lambda hwnd: (-current[hwnd].width * current[hwnd].height, self._launch_key(hwnd)))
+        skipped = 0
+        for hwnd in new_hwnds:
+            group = current[hwnd]
+            position = packer.place(hwnd, group.width, group.height)
+            if position is None:
+                skipped += 1
+                # 放不下的視窗不再管理，避免與已放置的視窗重疊
+                if hwnd in self.window_positions:
+                    plan.removed.append(hwnd)
+                continue
+            pos = self._slot_pos(hwnd, group.name, position[0], position[1])
+            pos.width, pos.height = group.width, group.height
+            plan.positions[hwnd] = pos
+
+        for hwnd, (_, x, y, width, height) in packer.placements.items():
+            group = current[hwnd]
+            info = self.window_index.get(hwnd)
+            style = self._target_style(info.style, group.remove_title, group.remove_border)
+            change = diff_window(hwnd, info.style, info.rect, style, x, y, width, height)
+            # 緊密排列的視窗都在第 0 頁
+            old = self.window_positions.get(hwnd)
+            if (old is None or old.page == self.active_page) != (self.active_page == 0):
+                change = self._page_change(plan, hwnd, change, self.active_page == 0)
+            if change is None:
+                plan.unchanged += 1
+            else:
+                plan.changes.append(change)
+
+        plan.packer = packer
+        plan.message = f"成功緊密排列 {len(packer.placements)} 個視窗，螢幕使用率 {packer.utilisation:.0%}"
+        if skipped:
+            plan.message += f"，{skipped} 個視窗放不下"
+        return True, plan.message, plan
+
+    def _group_regions(self, groups: List[WindowGroup], screens: List[Dict]) -> List[List[Dict]]:
+        """回傳每個群組可使用的螢幕區域，未指定區域的群組平分每個螢幕的高度"""
+        shared = [group for group in groups if group.region is None]
+        # 已由其他群組以索引指定的螢幕不再平分，全部被指定時仍使用所有螢幕
+        reserved = {i for group in groups if isinstance(group.region, list) for i in group.region}
+        free = [screen for i, screen in enumerate(screens) if i not in reserved] or screens
+        regions = []
+        for group in groups:
+            if group.region is None:
+                band = shared.index(group)
+                regions.append([{
+                    'left': screen['left'],
+                    'top': screen['top'] + band * (screen['height'] // len(shared)),
+                    'width': screen['width'],
+                    'height': screen['height'] // len(shared)
+                } for screen in free])
+            elif isinstance(group.region, dict):
+                regions.append([group.region])
+            else:
+                regions.append([screens[i] for i in group.region if 0 <= i < len(screens)])
+        return regions
+
+    def _allocator(self, group: str) -> SlotAllocator:
+        allocator = self.slot_allocators.get(group)
+        if allocator is None:
+            allocator = self.slot_allocators[group] = SlotAllocator()
+        return allocator
+
+    def _pager(self, group: str) -> PageAllocator:
+        pager = self.page_allocators.get(group)
+        if pager is None:
+            pager = self.page_allocators[group] = PageAllocator()
+        return pager
+
+    def _group_of(self, hwnd: int) -> Optional[str]:
+        """回傳視窗所屬的群組，未管理時回傳 None"""
+        pos = self.window_positions.get(hwnd)
+        return pos.group if pos is not None else None
+
+    def _claim_pos(self, pos: ManagedWindow) -> bool:
+        return _claim_in(self._allocator(pos.group), self._pager(pos.group), pos)
+
+    def _release_pos(self, pos: ManagedWindow) -> None:
+        if pos.page:
+            self._pager(pos.group).release(pos.page, pos.x, pos.y)
+        else:
+            self._allocator(pos.group).release(pos.x, pos.y)
+
+    def _paged_out(self, hwnd: int) -> bool:
+        """視窗是否放在目前以外的分頁，這類視窗隱藏時仍繼續管理"""
+        pos = self.window_positions.get(hwnd)
+        return pos is not None and pos.page != self.active_page
+
+    def start_watch(self, title: str, window_width: int, window_height: int, remove_title: bool = False, remove_border: bool = False, bypass_limit: bool = False, strategy: str = 'grid', rows: int = 0, columns: int = 0, on_tiled: Optional[Callable[[bool, str], None]] = None) -> None:
+        """開始監看新出現的同標題視窗，出現時自動排入空閒格位"""
+        self.watch_options = {
+            'title': title,
+            'window_width': window_width,
+            'window_height': window_height,
+            'remove_title': remove_title,
+            'remove_border': remove_border,
+            'bypass_limit': bypass_limit,
+            'strategy': strategy,
+            'rows': rows,
+            'columns': columns
+        }
+        self.auto_tiler.on_tiled = on_tiled
+        self.auto_tiler.start()
+        logger.info(f"開始自動排版標題為 {title} 的新視窗")
+
+    def stop_watch(self) -> None:
+        """停止自動排版新視窗"""
+        self.auto_tiler.stop()
+        self.watch_options = None
+
+    def _is_new_match(self, hwnd: int) -> bool:
+        options = self.watch_options
+        if options is None or hwnd in self.window_positions:
+            return False
+        info = self.window_index.get(hwnd)
+        return info is not None and info.visible and info.title == options['title']
+
+    def _auto_tile(self) -> Tuple[bool, str]:
+        options = self.watch_options
+        if options is None:
+            return False, "自動排版已停止"
+        return self.manage_windows(**options)
+
+    def plan_windows(self, title: str, window_width: int, window_height: int, remove_title: bool = False, dont_movewindow: bool = False, remove_border: bool = False, bypass_limit: bool = False, strategy: str = 'grid', rows: int = 0, columns: int = 0) -> Tuple[bool, str, Optional[LayoutPlan]]:
+        """計算排版計畫與需要的操作，不寫入任何視窗"""
+        try:
+            screens = self.get_screen_info()
+            if not screens:
+                return False, "無法獲取螢幕資訊", None
             
-            current_windows = []
-            def enum_callback(hwnd: int, results: list):
-                if win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd):
-                    window_title = win32gui.GetWindowText(hwnd)
-                    if window_title == title:
-                        results.append(hwnd)
-            win32gui.EnumWindows(enum_callback, current_windows)
+            # 從視窗索引讀取，只在索引失效時才完整列舉
+            self.window_index.ensure_fresh()
+            current_windows = [hwnd for hwnd in self.window_index.find_by_title(title, visible_only=False)
+                               if self.window_index.get(hwnd).visible or self._paged_out(hwnd)]
             
             if not current_windows:
-                return False, "找不到指定標題的視窗"
+                return False, "找不到指定標題的視窗", None
 
-            existing_hwnds = set(self.window_positions.keys())
-            current_hwnds = set(current_windows)
-            new_hwnds = current_hwnds - existing_hwnds
-            removed_hwnds = existing_hwnds - current_hwnds
+            return self._plan_group('', current_windows, screens, window_width, window_height, remove_title, dont_movewindow, remove_border, bypass_limit, strategy, rows, columns)
 
-            for hwnd in removed_hwnds:
-                del self.window_positions[hwnd]
-            
-            used_positions = set((pos['x'], pos['y']) for pos in self.window_positions.values())
-            available_positions = []
-            
-            for screen in screens:
-                h_count, v_count = self.calculate_window_capacity(screen, window_width, window_height)
-                for row in range(v_count):
-                    for col in range(h_count):
-                        x = screen['left'] + (col * window_width)
-                        y = screen['top'] + (row * window_height)
-                        if (x, y) not in used_positions:
-                            available_positions.append((x, y))
-            
-            # dont_movewindow 為 True 時僅移動到當前位置
+        except Exception as e:
+            error_msg = f"管理視窗時發生錯誤: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg, None
+
+    def _plan_group(self, group: str, current_windows: List[int], screens: List[Dict], window_width: int, window_height: int, remove_title: bool, dont_movewindow: bool, remove_border: bool, bypass_limit: bool, strategy: str = 'grid', rows: int = 0, columns: int = 0) -> Tuple[bool, str, Optional[LayoutPlan]]:
+        allocator = self._allocator(group)
+        pager = self._pager(group)
+        # 螢幕配置、視窗大小或排版方式改變時才重建格位，並重新佔用群組現有視窗的位置；
+        # 位置已不是格位的視窗在這次排版重新分配。分頁與第 0 頁使用相同的格位，一起重建。
+        # 重建在新的配置器上進行，由 apply_plan 取代原本的配置器，預覽或失敗的計畫不影響現有格位
+        misplaced = set()
+        rebuilt = not allocator.is_configured(screens, window_width, window_height, strategy, rows, columns, len(current_windows))
+        if rebuilt:
+            allocator, pager = SlotAllocator(), PageAllocator()
+            allocator.configure(screens, window_width, window_height, strategy, rows, columns, len(current_windows))
+            pager.configure(allocator.cells())
+            for pos in list(self.slot_reservations.values()):
+                if pos.group == group:
+                    _claim_in(allocator, pager, pos)
+            for pos in self.window_positions.in_group(group):
+                if not _claim_in(allocator, pager, pos):
+                    misplaced.add(pos.hwnd)
             if dont_movewindow:
-                for hwnd in current_windows:
-                    rect = win32gui.GetWindowRect(hwnd)
-                    current_x, current_y = rect[0], rect[1]
-
-                    self.window_positions[hwnd] = {
-                        'x': current_x,
-                        'y': current_y,
-                        'order': len(self.window_positions) + 1
-                    }
-
-                    style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-                    if remove_title:
-                        style &= ~win32con.WS_CAPTION
-                    if remove_border:
-                        style &= ~win32con.WS_THICKFRAME
-                    win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
-
-                    win32gui.SetWindowPos(
-                        hwnd,
-                        None,
-                        current_x,
-                        current_y,
-                        window_width,
-                        window_height,
-                        win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED
-                    )
-                return True, "視窗已移動到當前位置，但未進行排序"
+                misplaced.clear()
 
-            # 檢查是否有足夠空間
-            if not bypass_limit and len(new_hwnds) > len(available_positions):
-                return False, "螢幕空間不足，請關閉多餘的視窗"
-
-            # 生成額外位置（若 bypass_limit 為 True）
-            if bypass_limit and len(new_hwnds) > len(available_positions):
-                extra_needed = len(new_hwnds) - len(available_positions)
-                for i in range(extra_needed):
-                    last_x = available_positions[-1][0] + window_width if available_positions else 0
-                    last_y = available_positions[-1][1] if available_positions else 0
-                    available_positions.append((last_x, last_y))
-            
-            for hwnd, (x, y) in zip(new_hwnds, available_positions):
-                self.window_positions[hwnd] = {
-                    'x': x,
-                    'y': y,
-                    'order': len(self.window_positions) + 1
-                }
-            
+        # 計畫期間的格位變更在結束時還原，實際佔用由 apply_plan 進行
+        allocator.begin()
+        pager.begin()
+        try:
+            success, message, plan = self._build_plan(group, allocator, current_windows, window_width, window_height, remove_title, dont_movewindow, remove_border, bypass_limit, misplaced, pager)
+        finally:
+            allocator.rollback()
+            pager.rollback()
+        if plan is not None and rebuilt:
+            plan.allocators[group] = (allocator, pager)
+        return success, message, plan
+
+    def _build_plan(self, group: str, allocator: SlotAllocator, current_windows: List[int], window_width: int, window_height: int, remove_title: bool, dont_movewindow: bool, remove_border: bool, bypass_limit: bool, misplaced: Set[int] = frozenset(), pager: Optional[PageAllocator] = None) -> Tuple[bool, str, Optional[LayoutPlan]]:
+        current_hwnds = set(current_windows)
+        # 尚未管理、原本屬於其他群組或位置已不是格位的視窗都要分配新格位
+        # 依啟動順序分配，每次排版的結果相同，不受列舉順序影響
+        new_hwnds = sorted((hwnd for hwnd in current_windows if hwnd in misplaced or self._group_of(hwnd) != group), key=self._launch_key)
+        plan = LayoutPlan(f"成功處理 {len(current_windows)} 個視窗")
+        removed = [pos for pos in self.window_positions.in_group(group) if pos.hwnd not in current_hwnds]
+        plan.removed = [pos.hwnd for pos in removed]
+
+        for pos in removed:
+            if pos.page:
+                pager.release(pos.page, pos.x, pos.y)
+            else:
+                allocator.release(pos.x, pos.y)
+
+        # dont_movewindow 為 True 時僅移動到當前位置
+        if dont_movewindow:
+            plan.message = "視窗已移動到當前位置，但未進行排序"
             for hwnd in current_windows:
-                if hwnd in self.window_positions:
-                    pos = self.window_positions[hwnd]
-
-                    style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-                    if remove_title:
-                        style &= ~win32con.WS_CAPTION
-                    if remove_border:
-                        style &= ~win32con.WS_THICKFRAME
-                    win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
-
-                    win32gui.SetWindowPos(
-                        hwnd,
-                        None,
-                        pos['x'],
-                        pos['y'],
-                        window_width,
-                        window_height,
-                        win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED
-                    )
+                rect = self.window_index.get(hwnd).rect
+                current_x, current_y = rect[0], rect[1]
+
+                pos = self.window_positions.get(hwnd)
+                if pos is not None and pos.group == group:
+                    # 分頁中的視窗不在螢幕上，維持原本的頁面與格位
+                    if pos.page:
+                        continue
+                    allocator.release(pos.x, pos.y)
+                allocator.claim(current_x, current_y)
+                plan.positions[hwnd] = self._slot_pos(hwnd, group, current_x, current_y)
+        else:
+            # 檢查是否有足夠空間
+            if not bypass_limit and len(new_hwnds) > allocator.free_count:
+                return False, "螢幕空間不足，請關閉多餘的視窗", None
+
+            # 空閒格位用完後，若 bypass_limit 為 True 則放到虛擬分頁，
+            # 未開啟分頁時往最後一格的右側生成額外位置
+            overflow_x, overflow_y = allocator.last_cell() or (-window_width, 0)
+            for hwnd in new_hwnds:
+                position = allocator.allocate()
+                page = 0
+                if position is None and self.overflow_pages and pager is not None:
+                    paged = pager.allocate()
+                    if paged is not None:
+                        page, position = paged[0], paged[1:]
+                if position is None:
+                    overflow_x += window_width
+                    position = (overflow_x, overflow_y)
+                plan.positions[hwnd] = self._slot_pos(hwnd, group, position[0], position[1], page)
+
+        # 只為樣式或位置與目標不同的視窗產生操作；格位大小依排版方式可能與視窗大小不同
+        for hwnd in current_windows:
+            pos = plan.positions.get(hwnd) or self.window_positions.get(hwnd)
+            if pos is None:
+                continue
+            width, height = allocator.cell_size(pos.x, pos.y) or (window_width, window_height)
+            if (pos.width, pos.height) != (width, height):
+                if hwnd in plan.positions:
+                    pos.width, pos.height = width, height
+                else:
+                    pos = plan.positions[hwnd] = pos.with_size(width, height)
+            old = self.window_positions.get(hwnd)
+            shown = pos.page == self.active_page
+            was_shown = old is None or old.page == self.active_page
+            # 留在其他分頁的視窗換頁時才寫入
+            if not shown and not was_shown and hwnd not in plan.positions:
+                plan.unchanged += 1
+                continue
+            info = self.window_index.get(hwnd)
+            style = self._target_style(info.style, remove_title, remove_border)
+            change = diff_window(hwnd, info.style, info.rect, style, pos.x, pos.y, width, height)
+            if shown != was_shown:
+                change = self._page_change(plan, hwnd, change, shown)
+            if change is None:
+                plan.unchanged += 1
+            else:
+                plan.changes.append(change)
+
+        return True, plan.message, plan
+
+    def _launch_key(self, hwnd: int) -> Tuple:
+        """排序用的啟動順序：由本程式啟動的實例依啟動序號，其餘依行程 ID"""
+        info = self.window_index.get(hwnd)
+        managed = self.supervisor.by_pid.get(info.pid)
+        if managed is not None:
+            return 0, managed.launch_index, hwnd
+        return 1, info.pid, hwnd
+
+    def _slot_pos(self, hwnd: int, group: str, x: int, y: int, page: int = 0) -> ManagedWindow:
+        """建立視窗紀錄並記錄之後用來接回視窗的識別資訊，序號由 apply_plan 決定"""
+        info = self.window_index.get(hwnd)
+        managed = self.supervisor.by_pid.get(info.pid)
+        return ManagedWindow(hwnd, x, y, 0, info.pid, group,
+                             managed.launch_index if managed is not None else None, info.title, page=page)
+
+    def _page_change(self, plan: LayoutPlan, hwnd: int, change: Optional[WindowChange], show: bool) -> Optional[WindowChange]:
+        """在視窗的寫入操作加上換頁所需的顯示或隱藏
+
+        隱藏模式直接在同一批次的 SetWindowPos 加上顯示/隱藏旗標；最小化模式
+        改以 ShowWindowAsync 送出，還原的視窗回到最小化前所在的格位，不另外
+        移動，位置差異由下次排版修正。
+        """
+        if self.page_out_mode == 'minimize':
+            plan.page_commands.append((hwnd, SW_SHOWNOACTIVATE if show else SW_SHOWMINNOACTIVE))
+            if show and change is not None:
+                if change.style is None:
+                    return None
+                change.flags |= SWP_NOMOVE | SWP_NOSIZE
+            return change
+        if change is None:
+            change = WindowChange(hwnd, None, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER)
+        change.flags |= SWP_NOACTIVATE | (SWP_SHOWWINDOW if show else SWP_HIDEWINDOW)
+        return change
+
+    def _target_style(self, style: int, remove_title: bool, remove_border: bool) -> int:
+        if remove_title:
+            style &= ~WS_CAPTION
+        if remove_border:
+            style &= ~WS_THICKFRAME
+        return style
+
+    def apply_plan(self, plan: LayoutPlan) -> Tuple[bool, str]:
+        """套用排版計畫，只執行有差異的操作"""
+        try:
+            for group, (allocator, pager) in plan.allocators.items():
+                self.slot_allocators[group] = allocator
+                self.page_allocators[group] = pager
+                if group == '':
+                    self.slot_allocator = allocator
+            if plan.packer is not None:
+                self.packer = plan.packer
+                # 緊密排列的視窗不在格位上，之後改用格位排版時重建格位
+                for group in {pos.group for pos in plan.positions.values()}:
+                    self._allocator(group).reset()
+            for hwnd in plan.removed:
+                self.release_window(hwnd)
+            for hwnd, pos in plan.positions.items():
+                old = self.window_positions.get(hwnd)
+                if old is not None:
+                    self._release_pos(old)
+                # 已管理的視窗保留原本的序號，新視窗接在最後
+                pos.order = old.order if old is not None else self.window_positions.next_order
+                self._claim_pos(pos)
+                self.window_positions.add(pos)
+
+            deferred = self._commit_paged(plan)
+            self.save_slots()
+            if deferred:
+                return True, f"{plan.message}，{len(deferred)} 個視窗未回應，已排入重試"
             
-            return True, f"成功處理 {len(current_windows)} 個視窗"
+            return True, plan.message
 
         except Exception as e:
             error_msg = f"管理視窗時發生錯誤: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
 
+    def commit_changes(self, changes: List[WindowChange]) -> List[int]:
+        """在期限內寫入樣式並移動視窗，回傳未完成、已排入重試佇列的視窗"""
+        return self.window_writer.commit(changes)
+
+    def _commit_paged(self, plan: LayoutPlan) -> List[int]:
+        """先還原換入的視窗，寫入變更後再最小化換出的視窗"""
+        # 暫停的行程無法處理視窗訊息，寫入前先恢復
+        hwnds = [change.hwnd for change in plan.changes] + [hwnd for hwnd, _ in plan.page_commands]
+        self.throttler.wake({pos.pid for pos in map(self.window_positions.get, hwnds) if pos is not None})
+        for hwnd, command in plan.page_commands:
+            if command == SW_SHOWNOACTIVATE:
+                self._show_async(hwnd, command)
+        deferred = self.commit_changes(plan.changes) if plan.changes else []
+        for hwnd, command in plan.page_commands:
+            if command == SW_SHOWMINNOACTIVE:
+                self._show_async(hwnd, command)
+        return deferred
+
+    def _show_async(self, hwnd: int, command: int) -> None:
+        try:
+            self.backend.show_window_async(hwnd, command)
+        except Exception as e:
+            logger.warning(f"改變視窗 {hwnd} 顯示狀態失敗: {str(e)}")
+
+    def switch_page(self, page: int) -> Tuple[bool, str]:
+        """切換顯示的分頁，以單一批次換出目前頁面並換入目標頁面的視窗"""
+        with self._layout_lock:
+            try:
+                occupancy = self.page_occupancy()
+                if not 0 <= page < len(occupancy):
+                    return False, f"沒有第 {page + 1} 頁"
+                if page == self.active_page:
+                    return True, f"目前已在第 {page + 1} 頁"
+                self.window_index.ensure_fresh()
+                plan = LayoutPlan(f"已切換到第 {page + 1} 頁")
+                shown = hidden = 0
+                for pos in self.window_positions.records():
+                    if pos.page not in (page, self.active_page) or self.window_index.get(pos.hwnd) is None:
+                        continue
+                    show = pos.page == page
+                    change = None
+                    if show:
+                        # 換入的視窗同時放回格位，隱藏期間被移動也會復原
+                        options = self.layout_options.get(pos.group, {})
+                        change = WindowChange(pos.hwnd, None, pos.x, pos.y,
+                                              pos.width or options.get('width', 0),
+                                              pos.height or options.get('height', 0), SWP_NOZORDER)
+                        if not change.width or not change.height:
+                            change.flags |= SWP_NOMOVE | SWP_NOSIZE
+                        shown += 1
+                    else:
+                        hidden += 1
+                    change = self._page_change(plan, pos.hwnd, change, show)
+                    if change is not None:
+                        plan.changes.append(change)
+                self.active_page = page
+                deferred = self._commit_paged(plan)
+                message = f"{plan.message}，顯示 {shown} 個視窗，隱藏 {hidden} 個視窗"
+                if deferred:
+                    message += f"，{len(deferred)} 個視窗未回應，已排入重試"
+                logger.info(message)
+                return True, message
+            except Exception as e:
+                error_msg = f"切換分頁時發生錯誤: {str(e)}"
+                logger.error(error_msg)
+                return False, error_msg
+
+    def page_occupancy(self) -> List[int]:
+        """回傳每頁的視窗數量，第 0 頁為螢幕上的格位，至少包含一頁"""
+        counts = [0]
+        for pos in self.window_positions.records():
+            if pos.page >= len(counts):
+                counts.extend([0] * (pos.page + 1 - len(counts)))
+            counts[pos.page] += 1
+        return counts
+
+    def page_capacity(self) -> int:
+        """每頁可容納的視窗數量，為所有群組格位數的總和"""
+        return sum(allocator.capacity for allocator in self.slot_allocators.values())
+
+    def supervise(self) -> Tuple[bool, str]:
+        """檢查受監控的行程，結束的實例依退避時間重新啟動並放回原本的格位"""
+        # 排版進行中時略過這次檢查，避免在 UI 執行緒等待
+        if not self._layout_lock.acquire(blocking=False):
+            return True, ""
+        try:
+            messages = []
+            for event, managed, old_pid in self.supervisor.poll():
+                if event == 'exit':
+                    hwnds = [pos.hwnd for pos in self.window_positions.find_by_pid(old_pid)]
+                    if self.supervisor.enabled and hwnds:
+                        # 保留第一個視窗的格位給重新啟動的實例，其餘格位歸還
+                        self.slot_reservations[managed.launch_index] = self.window_positions.pop(hwnds[0])
+                        hwnds = hwnds[1:]
+                    for hwnd in hwnds:
+                        self.release_window(hwnd)
+                    messages.append(f"實例 {managed.launch_index + 1} 已結束")
+                elif event == 'restart':
+                    messages.append(f"實例 {managed.launch_index + 1} 已重新啟動（第 {managed.restarts} 次）")
+                elif event == 'gave_up':
+                    pos = self.slot_reservations.pop(managed.launch_index, None)
+                    if pos is not None:
+                        self._release_pos(pos)
+                    messages.append(f"實例 {managed.launch_index + 1} 連續崩潰，已停止重新啟動")
+            self._adopt_restarted()
+            if messages:
+                self.save_slots()
+            return True, "，".join(messages)
+        except Exception as e:
+            error_msg = f"監控行程時發生錯誤: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+        finally:
+            self._layout_lock.release()
+
+    def _adopt_restarted(self) -> None:
+        """把重新啟動後出現的視窗移回保留的格位"""
+        if not self.slot_reservations:
+            return
+        self.window_index.ensure_fresh()
+        plan = LayoutPlan("")
+        for launch_index, pos in list(self.slot_reservations.items()):
+            managed = self.supervisor.processes.get(launch_index)
+            if managed is None:
+                del self.slot_reservations[launch_index]
+                self._release_pos(pos)
+                continue
+            if managed.process is None:
+                continue
+            hwnds = self.window_index.find_by_pid(managed.pid)
+            if not hwnds:
+                continue
+            hwnd = hwnds[0]
+            del self.slot_reservations[launch_index]
+            pos.hwnd = hwnd
+            pos.pid = managed.pid
+            self.window_positions.add(pos)
+            options = self.layout_options.get(pos.group)
+            if options is None:
+                continue
+            info = self.window_index.get(hwnd)
+            style = self._target_style(info.style, options['remove_title'], options['remove_border'])
+            change = diff_window(hwnd, info.style, info.rect, style, pos.x, pos.y,
+                                 pos.width or options['width'], pos.height or options['height'])
+            # 保留的格位在其他分頁時，新視窗出現後直接換出
+            if pos.page != self.active_page:
+                change = self._page_change(plan, hwnd, change, False)
+            if change is not None:
+                plan.changes.append(change)
+        if plan.changes or plan.page_commands:
+            self._commit_paged(plan)
+
+    def save_slots(self) -> None:
+        """保存目前的格位分配，包含等待重新啟動的實例保留的格位"""
+        if self.slot_store is None:
+            return
+        # 行程 ID 可能被重複使用，執行檔名稱只在單次保存或恢復期間快取
+        self._process_names.clear()
+        records = []
+        for pos in self.window_positions.records() + list(self.slot_reservations.values()):
+            if pos.executable is None:
+                pos.executable = self._process_name(pos.pid)
+            records.append(SlotRecord(pos.pid, pos.launch_index, pos.executable, pos.title,
+                                      pos.group, pos.x, pos.y, pos.order, pos.width, pos.height, pos.page))
+        records.sort(key=lambda record: record.order)
+        self.slot_store.save(self.layout_options, records)
+
+    def restore_slots(self) -> Tuple[bool, str]:
+        """讀取保存的格位並接回仍在執行的實例，只列舉一次視窗並以單一批次寫入"""
+        if self.slot_store is None:
+            return True, ""
+        with self._layout_lock:
+            try:
+                layout_options, records = self.slot_store.load()
+                if not records:
+                    return True, ""
+                self._process_names.clear()
+                self.window_index.ensure_fresh()
+                # 上次結束時不在顯示頁面的視窗可能仍處於隱藏狀態，找不到可見視窗時才以行程 ID 接回
+                by_pid: Dict[int, List[int]] = {}
+                hidden: Dict[int, List[int]] = {}
+                for hwnd, info in list(self.window_index.windows.items()):
+                    if hwnd not in self.window_positions:
+                        (by_pid if info.visible else hidden).setdefault(info.pid, []).append(hwnd)
+
+                # 先以行程 ID 接回；行程 ID 可能被重複使用，需確認執行檔相同
+                matched: List[Tuple[SlotRecord, int]] = []
+                missing: List[SlotRecord] = []
+                for record in records:
+                    hwnds = by_pid.get(record.pid)
+                    if not hwnds:
+                        hwnds = hidden.get(record.pid)
+                    if hwnds and self._process_name(record.pid) == record.executable:
+                        hwnd = next((h for h in hwnds if self.window_index.get(h).title == record.title), hwnds[0])
+                        hwnds.remove(hwnd)
+                        matched.append((record, hwnd))
+                    else:
+                        missing.append(record)
+
+                # 行程已重新啟動時改以執行檔與原始標題比對，依行程 ID 順序對應
+                if missing:
+                    titles = {record.title for record in missing}
+                    pool: Dict[Tuple[str, str], List[int]] = {}
+                    for pid in sorted(by_pid):
+                        for hwnd in sorted(by_pid[pid]):
+                            title = self.window_index.get(hwnd).title
+                            if title in titles:
+                                pool.setdefault((self._process_name(pid), title), []).append(hwnd)
+                    still_missing = []
+                    for record in missing:
+                        candidates = pool.get((record.executable, record.title))
+                        if candidates:
+                            matched.append((record, candidates.pop(0)))
+                        else:
+                            still_missing.append(record)
+                    missing = still_missing
+
+                for group, options in layout_options.items():
+                    self.layout_options.setdefault(group, options)
+                plan = LayoutPlan("")
+                for record, hwnd in matched:
+                    info = self.window_index.get(hwnd)
+                    pos = ManagedWindow(hwnd, record.x, record.y, record.order, info.pid, record.group,
+                                        record.launch_index, record.title, record.executable,
+                                        record.width or 0, record.height or 0, record.page)
+                    self.window_positions.add(pos)
+                    self._claim_pos(pos)
+                    options = self.layout_options.get(record.group)
+                    if options is None:
+                        continue
+                    style = self._target_style(info.style, options['remove_title'], options['remove_border'])
+                    change = diff_window(hwnd, info.style, info.rect, style, record.x, record.y,
+                                         pos.width or options['width'], pos.height or options['height'])
+                    # 重新啟動後顯示第 0 頁，其他分頁的視窗維持換出
+                    if (pos.page != self.active_page) == info.visible:
+                        change = self._page_change(plan, hwnd, change, not info.visible)
+                    if change is not None:
+                        plan.changes.append(change)
+                deferred = self._commit_paged(plan)
+                self.save_slots()
+
+                message = f"已接回 {len(matched)} 個視窗的格位"
+                if missing:
+                    message += f"，{len(missing)} 個實例未找到"
+                if deferred:
+                    message += f"，{len(deferred)} 個視窗未回應，已排入重試"
+                logger.info(message)
+                return True, message
+            except Exception as e:
+                error_msg = f"恢復格位時發生錯誤: {str(e)}"
+                logger.error(error_msg)
+                return False, error_msg
+
+    def _process_name(self, pid: int) -> str:
+        name = self._process_names.get(pid)
+        if name is None:
+            try:
+                name = self.backend.get_process_name(pid)
+            except Exception:
+                name = ''
+            self._process_names[pid] = name
+        return name
+
+    def tracked_pids(self) -> Set[int]:
+        """回傳已啟動的實例與已管理視窗所屬的行程"""
+        pids = set(self.supervisor.by_pid)
+        pids.update(self.window_positions.pids())
+        return pids
+
+    def managed_windows(self) -> Dict[int, Optional[int]]:
+        """回傳已管理的視窗與其行程 ID"""
+        return {pos.hwnd: pos.pid for pos in self.window_positions.records()}
+
+    def _probe_targets(self) -> Dict[int, Optional[int]]:
+        """需要健康探測的視窗，暫停中的行程必然不回應，不探測"""
+        return {hwnd: pid for hwnd, pid in self.managed_windows().items()
+                if self.throttler.level_of(pid) != 'suspended'}
+
+    def throttle_states(self) -> Dict[int, Tuple[bool, bool]]:
+        """回傳每個已管理行程 (是否聚焦, 是否在目前頁面顯示)，供節流排程使用"""
+        try:
+            foreground = self.backend.get_foreground_window()
+        except Exception:
+            foreground = 0
+        states: Dict[int, Tuple[bool, bool]] = {}
+        for pos in self.window_positions.records():
+            if not pos.pid:
+                continue
+            info = self.window_index.get(pos.hwnd)
+            shown = pos.page == self.active_page and info is not None and info.visible
+            focused, visible = states.get(pos.pid, (False, False))
+            states[pos.pid] = (focused or pos.hwnd == foreground, visible or shown)
+        return states
+
+    def _on_foreground(self, event: str, hwnd: int) -> None:
+        """使用者切換到已管理的視窗時立即恢復其行程，不等下一次節流檢查"""
+        if event == 'foreground':
+            pos = self.window_positions.get(hwnd)
+            if pos is not None and pos.pid:
+                self.throttler.wake((pos.pid,))
+
+    def on_window_hung(self, hwnd: int, pid: Optional[int]) -> None:
+        """健康探測判定視窗無回應，依設定結束行程讓 supervisor 重新啟動"""
+        if self.throttler.level_of(pid) == 'suspended':
+            return
+        if self.restart_hung and pid is not None and self.supervisor.enabled:
+            if self.supervisor.terminate(pid):
+                logger.warning(f"視窗 {hwnd} 無回應，已結束行程 {pid} 等待重新啟動")
+
+    def release_window(self, hwnd: int) -> None:
+        """停止管理視窗並歸還其格位"""
+        pos = self.window_positions.pop(hwnd, None)
+        if pos is not None:
+            self._release_pos(pos)
+            # 不再管理的視窗不能留在換出的狀態
+            if pos.page != self.active_page and self.backend.is_window(hwnd):
+                plan = LayoutPlan("")
+                change = self._page_change(plan, hwnd, None, True)
+                if change is not None:
+                    plan.changes.append(change)
+                self._commit_paged(plan)
+        self.packer.remove(hwnd)
+        self.window_writer.discard(hwnd)
+
     def update_window_title(self, hwnd: int, new_title: str) -> Tuple[bool, str]:
         """更新視窗標題"""
         try:
-            if not win32gui.IsWindow(hwnd):
+            if not self.backend.is_window(hwnd):
                 return False, "無效的視窗控制代碼"
                 
-            win32gui.SetWindowText(hwnd, new_title)
+            self.backend.set_window_text(hwnd, new_title)
+            self.window_index.note_title(hwnd, new_title)
             return True, "成功更新視窗標題"
             
         except Exception as e:
@@ -212,28 +906,25 @@ class MainTabFunctions:
     def update_window_style(self, hwnd: int, remove_title: bool, remove_border: bool) -> Tuple[bool, str]:
         """更新視窗樣式"""
         try:
-            if not win32gui.IsWindow(hwnd):
+            if not self.backend.is_window(hwnd):
                 return False, "無效的視窗控制代碼"
                 
-            style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+            style = self.backend.get_window_style(hwnd)
             
             if remove_title:
-                style &= ~win32con.WS_CAPTION
+                style &= ~WS_CAPTION
             else:
-                style |= win32con.WS_CAPTION
+                style |= WS_CAPTION
                 
             if remove_border:
-                style &= ~win32con.WS_THICKFRAME
+                style &= ~WS_THICKFRAME
             else:
-                style |= win32con.WS_THICKFRAME
+                style |= WS_THICKFRAME
                 
-            win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
-            win32gui.SetWindowPos(
-                hwnd, None, 0, 0, 0, 0,
-                win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | 
-                win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED
-            )
-            
+            change = WindowChange(hwnd, style, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER | SWP_FRAMECHANGED)
+            if self.window_writer.commit([change]):
+                return True, "視窗未回應，已排入重試"
+
             return True, "成功更新視窗樣式"
             
         except Exception as e:
@@ -244,18 +935,11 @@ class MainTabFunctions:
     def update_window_position(self, hwnd: int, x: int, y: int, width: int, height: int) -> Tuple[bool, str]:
         """更新視窗位置"""
         try:
-            if not win32gui.IsWindow(hwnd):
+            if not self.backend.is_window(hwnd):
                 return False, "無效的視窗控制代碼"
 
-            win32gui.SetWindowPos(
-                hwnd,
-                None,
-                x,
-                y,
-                width,
-                height,
-                win32con.SWP_NOZORDER
-            )
+            if self.window_writer.commit([WindowChange(hwnd, None, x, y, width, height, SWP_NOZORDER)]):
+                return True, "視窗未回應，已排入重試"
             return True, "成功更新視窗位置"
 
         except Exception as e:
@@ -263,23 +947,58 @@ class MainTabFunctions:
             logger.error(error_msg)
             return False, error_msg
 
+    def refresh_window_index(self) -> Tuple[bool, str]:
+        """必要時完整列舉視窗，供 UI 在背景執行緒更新索引"""
+        try:
+            self.window_index.ensure_fresh()
+            return True, ""
+        except Exception as e:
+            error_msg = f"列舉視窗時發生錯誤: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+
+    def listed_windows(self) -> List[ManagedWindow]:
+        """依序號回傳仍在視窗索引中的已管理視窗紀錄，供表格模型直接讀取"""
+        return [pos for pos in self.window_positions.records() if self.window_index.get(pos.hwnd) is not None]
+
     def get_window_list(self) -> List[Dict]:
         """獲取已管理視窗的列表"""
         window_list = []
-        for hwnd, info in self.window_positions.items():
-            if win32gui.IsWindow(hwnd):
-                style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-                has_caption = bool(style & win32con.WS_CAPTION)
-                has_border = bool(style & win32con.WS_THICKFRAME)
+        self.window_index.ensure_fresh()
+        # 排版可能同時在背景執行緒修改 window_positions，先取得快照；登錄表已依序號排列
+        for info in self.window_positions.records():
+            hwnd = info.hwnd
+            cached = self.window_index.get(hwnd)
+            if cached is not None:
+                has_caption = bool(cached.style & WS_CAPTION)
+                has_border = bool(cached.style & WS_THICKFRAME)
+                metrics = self.process_metrics.latest(cached.pid) or (None, None, None, None)
                 
                 window_list.append({
-                    'order': info['order'],
-                    'title': win32gui.GetWindowText(hwnd),
+                    'order': info.order,
+                    'group': info.group,
+                    'title': cached.title,
                     'hwnd': hwnd,
-                    'X': info['x'],
-                    'Y': info['y'],
+                    'pid': cached.pid,
+                    'X': info.x,
+                    'Y': info.y,
                     'has_caption': has_caption,
-                    'has_border': has_border
+                    'has_border': has_border,
+                    'cpu': metrics[0],
+                    'memory': metrics[1],
+                    'handles': metrics[2],
+                    'threads': metrics[3],
+                    'trend': self.process_metrics.trend(cached.pid),
+                    'health': self.health_probe.summary(hwnd),
+                    'throttle': self.throttler.summary(cached.pid),
+                    'hung': self.health_probe.is_hung(hwnd)
                 })
         
-        return sorted(window_list, key=lambda x: x['order'])
\ No newline at end of file
+        return window_list
+
+
+def _claim_in(allocator: SlotAllocator, pager: PageAllocator, pos: ManagedWindow) -> bool:
+    """在指定的配置器佔用視窗紀錄的格位，分頁中的視窗佔用分頁格位"""
+    if pos.page:
+        return pager.claim(pos.page, pos.x, pos.y)
+    return allocator.claim(pos.x, pos.y)
@@ -0,0 +1,133 @@
+import time
+import threading
+import logging
+from typing import Callable, Optional, Set, Tuple
+
+from functions.window_index import WindowIndex
+
+logger = logging.getLogger('Auto_Tiler')
+
+
+class AutoTiler:
+    """監看新出現的視窗並自動排版
+
+    視窗建立、顯示或改名且 matches(hwnd) 成立時記錄為待處理；最後一個事件
+    之後安靜 quiet 秒，或第一個待處理視窗已等待 max_delay 秒時，才呼叫一次
+    tile()，一波同時啟動的實例只需少數幾次排版。視窗索引沒有事件時改為
+    每 poll_interval 秒完整列舉一次找出新視窗。啟動時的第一次列舉也在監看
+    執行緒進行，start 不會在呼叫端（UI 執行緒）列舉視窗。每次 start 的
+    執行緒使用各自的停止事件，stop 後立即 start 時，仍在排版的舊執行緒也
+    會結束。
+    """
+
+    def __init__(self, window_index: WindowIndex, tile: Callable[[], Tuple[bool, str]],
+                 matches: Callable[[int], bool], quiet: float = 0.05, max_delay: float = 0.25,
+                 poll_interval: float = 0.5):
+        self.window_index = window_index
+        self.tile = tile
+        self.matches = matches
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.on_tiled: Optional[Callable[[bool, str], None]] = None
+        self.passes = 0
+        self.tiled_windows = 0
+        self._pending: Set[int] = set()
+        self._first_pending = 0.0
+        self._last_event = 0.0
+        self._condition = threading.Condition()
+        # 目前這次監看的停止事件，None 表示未開始
+        self._stop_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return self._stop_event is not None and not self._stop_event.is_set()
+
+    def start(self) -> None:
+        """開始監看，啟動時已存在的符合視窗也會排版一次"""
+        if self.active:
+            return
+        stop_event = self._stop_event = threading.Event()
+        self.window_index.add_listener(self._on_event)
+        self._thread = threading.Thread(target=self._run, args=(stop_event,), name='AutoTiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止監看"""
+        if not self.active:
+            return
+        self.window_index.remove_listener(self._on_event)
+        with self._condition:
+            self._stop_event.set()
+            self._pending.clear()
+            self._condition.notify_all()
+
+    def _on_event(self, event: str, hwnd: int) -> None:
+        if event in ('create', 'show', 'name') and self.matches(hwnd):
+            self._add_pending([hwnd])
+
+    def _add_pending(self, hwnds) -> None:
+        now = time.monotonic()
+        with self._condition:
+            if not self._pending:
+                self._first_pending = now
+            self._pending.update(hwnds)
+            self._last_event = now
+            self._condition.notify_all()
+
+    def _poll(self) -> None:
+        """完整列舉找出尚未處理的符合視窗"""
+        self.window_index.ensure_fresh()
+        hwnds = [hwnd for hwnd in list(self.window_index.windows) if self.matches(hwnd)]
+        if hwnds:
+            self._add_pending(hwnds)
+
+    def _run(self, stop_event: threading.Event) -> None:
+        # 視窗索引過期時 ensure_fresh 會完整列舉，因此啟動時的列舉也在這裡進行
+        if not stop_event.is_set():
+            self._safe_poll()
+        while True:
+            with self._condition:
+                while not stop_event.is_set() and not self._pending:
+                    if not self._condition.wait(None if self.window_index.live else self.poll_interval):
+                        break
+                if stop_event.is_set():
+                    return
+                if self._pending:
+                    # 合併一波事件：等到安靜下來或等待時間達到上限
+                    while not stop_event.is_set():
+                        now = time.monotonic()
+                        wait = min(self._last_event + self.quiet, self._first_pending + self.max_delay) - now
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    if stop_event.is_set():
+                        return
+                    batch = len(self._pending)
+                    self._pending.clear()
+                else:
+                    batch = 0
+            if not batch:
+                self._safe_poll()
+                continue
+            self._tile(batch)
+
+    def _safe_poll(self) -> None:
+        try:
+            self._poll()
+        except Exception as e:
+            logger.error(f"列舉新視窗時發生錯誤: {str(e)}")
+
+    def _tile(self, batch: int) -> None:
+        try:
+            success, message = self.tile()
+        except Exception as e:
+            success, message = False, f"自動排版時發生錯誤: {str(e)}"
+            logger.error(message)
+        self.passes += 1
+        if success:
+            self.tiled_windows += batch
+        logger.info(f"自動排版 {batch} 個新視窗: {message}")
+        if self.on_tiled is not None:
+            self.on_tiled(success, message)
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional, Tuple
+
+# (x, y, 寬, 高)
+Rect = Tuple[int, int, int, int]
+
+
+class MaxRectsBin:
+    """單一螢幕的 MaxRects 裝箱
+
+    保存所有極大的空閒矩形，放入視窗時選擇短邊剩餘最少的位置（BSSF），
+    再把與新視窗重疊的空閒矩形切成不重疊的部分並移除被包含的矩形。移除
+    視窗時由剩下的視窗重新切出極大空閒矩形；只把歸還的矩形與相鄰空閒矩形
+    合併無法得到跨越多個舊矩形的空間，反覆新增移除後空閒區域會越切越碎。
+    """
+    __slots__ = ('left', 'top', 'width', 'height', 'free', 'used', 'used_area')
+
+    def __init__(self, screen: Dict):
+        self.left = screen['left']
+        self.top = screen['top']
+        self.width = screen['width']
+        self.height = screen['height']
+        self.free: List[Rect] = [(self.left, self.top, self.width, self.height)]
+        self.used: List[Rect] = []
+        self.used_area = 0
+
+    def copy(self) -> 'MaxRectsBin':
+        other = MaxRectsBin.__new__(MaxRectsBin)
+        other.left, other.top, other.width, other.height = self.left, self.top, self.width, self.height
+        other.free = list(self.free)
+        other.used = list(self.used)
+        other.used_area = self.used_area
+        return other
+
+    def find(self, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+        """回傳最適合的位置與分數 (短邊剩餘, 長邊剩餘, x, y)，放不下時回傳 None"""
+        best = None
+        for x, y, free_width, free_height in self.free:
+            if free_width < width or free_height < height:
+                continue
+            left_x, left_y = free_width - width, free_height - height
+            score = (min(left_x, left_y), max(left_x, left_y), y, x)
+            if best is None or score < best:
+                best = score
+        if best is None:
+            return None
+        return best[0], best[1], best[3], best[2]
+
+    def insert(self, x: int, y: int, width: int, height: int) -> None:
+        """佔用指定矩形，切分與其重疊的空閒矩形"""
+        rect = (x, y, width, height)
+        self.free = _split(self.free, rect)
+        self.used.append(rect)
+        self.used_area += width * height
+
+    def release(self, x: int, y: int, width: int, height: int) -> None:
+        """歸還矩形，由剩下的視窗重新切出空閒矩形"""
+        try:
+            self.used.remove((x, y, width, height))
+        except ValueError:
+            return
+        self.used_area -= width * height
+        self.free = [(self.left, self.top, self.width, self.height)]
+        for rect in self.used:
+            self.free = _split(self.free, rect)
+
+
+def _split(free_rects: List[Rect], rect: Rect) -> List[Rect]:
+    """把與 rect 重疊的空閒矩形切成不重疊的部分"""
+    x, y, width, height = rect
+    right, bottom = x + width, y + height
+    pieces = []
+    for free in free_rects:
+        fx, fy, fw, fh = free
+        if fx >= right or fx + fw <= x or fy >= bottom or fy + fh <= y:
+            pieces.append(free)
+            continue
+        if fx < x:
+            pieces.append((fx, fy, x - fx, fh))
+        if fx + fw > right:
+            pieces.append((right, fy, fx + fw - right, fh))
+        if fy < y:
+            pieces.append((fx, fy, fw, y - fy))
+        if fy + fh > bottom:
+            pieces.append((fx, bottom, fw, fy + fh - bottom))
+    return _prune(pieces)
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[0] + outer[2] >= inner[0] + inner[2] and outer[1] + outer[3] >= inner[1] + inner[3])
+
+
+def _prune(rects: List[Rect]) -> List[Rect]:
+    """移除被其他空閒矩形包含的矩形"""
+    # 面積大的先保留，只需與已保留的矩形比較
+    result: List[Rect] = []
+    for rect in sorted(set(rects), key=lambda r: -r[2] * r[3]):
+        if rect[2] > 0 and rect[3] > 0 and not any(_contains(kept, rect) for kept in result):
+            result.append(rect)
+    return result
+
+
+class WindowPacker:
+    """把不同大小的視窗裝入所有螢幕
+
+    每個螢幕一個 MaxRectsBin，視窗放在所有螢幕中最貼合的位置。放入只影響
+    相關的空閒矩形，移除只重建該螢幕的空閒矩形，新增或關閉一個視窗不需要
+    重新排列其他視窗。
+    """
+
+    def __init__(self):
+        self.bins: List[MaxRectsBin] = []
+        # {hwnd: (螢幕索引, x, y, 寬, 高)}
+        self.placements: Dict[int, Tuple[int, int, int, int, int]] = {}
+        self._key: Optional[Tuple] = None
+
+    def configure(self, screens: List[Dict]) -> bool:
+        """設定螢幕，配置改變時清除所有放置並回傳 True"""
+        key = tuple((s['left'], s['top'], s['width'], s['height']) for s in screens)
+        if key == self._key:
+            return False
+        self._key = key
+        self.bins = [MaxRectsBin(screen) for screen in screens]
+        self.placements = {}
+        return True
+
+    def copy(self) -> 'WindowPacker':
+        """複製目前狀態，計算排版計畫時不影響原本的放置"""
+        other = WindowPacker()
+        other.bins = [packing_bin.copy() for packing_bin in self.bins]
+        other.placements = dict(self.placements)
+        other._key = self._key
+        return other
+
+    def place(self, hwnd: int, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """放入視窗並回傳位置，所有螢幕都放不下時回傳 None"""
+        best = None
+        for monitor, packing_bin in enumerate(self.bins):
+            found = packing_bin.find(width, height)
+            if found is not None and (best is None or found[:2] < best[1][:2]):
+                best = (monitor, found)
+        if best is None:
+            return None
+        monitor, (_, _, x, y) = best
+        self.bins[monitor].insert(x, y, width, height)
+        self.placements[hwnd] = (monitor, x, y, width, height)
+        return x, y
+
+    def remove(self, hwnd: int) -> bool:
+        """移除視窗並歸還其空間"""
+        placement = self.placements.pop(hwnd, None)
+        if placement is None:
+            return False
+        monitor, x, y, width, height = placement
+        self.bins[monitor].release(x, y, width, height)
+        return True
+
+    @property
+    def total_area(self) -> int:
+        return sum(packing_bin.width * packing_bin.height for packing_bin in self.bins)
+
+    @property
+    def utilisation(self) -> float:
+        """已放置視窗佔所有螢幕面積的比例"""
+        total = self.total_area
+        return sum(packing_bin.used_area for packing_bin in self.bins) / total if total else 0.0
@@ -0,0 +1,217 @@
+import heapq
+import time
+import threading
+import logging
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from functions.window_backend import WindowBackend
+
+logger = logging.getLogger('Health_Probe')
+
+# 延遲分桶的上限（秒），超過最後一個上限的回應歸入最後一桶
+BUCKET_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+# 新視窗的相位以黃金比例遞增，讓探測平均分散在整個間隔內
+PHASE_STEP = 0.6180339887
+
+
+class LatencyHistogram:
+    """單一視窗的回應延遲分桶統計，逾時另外計數"""
+    __slots__ = ('counts', 'timeouts')
+
+    def __init__(self):
+        self.counts = array('l', [0]) * (len(BUCKET_BOUNDS) + 1)
+        self.timeouts = 0
+
+    def add(self, latency: Optional[float]) -> None:
+        if latency is None:
+            self.timeouts += 1
+        else:
+            self.counts[bisect_left(BUCKET_BOUNDS, latency)] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts) + self.timeouts
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """回傳有回應的探測中第 fraction 分位所在分桶的上限，沒有資料時回傳 None"""
+        answered = sum(self.counts)
+        if not answered:
+            return None
+        target = fraction * answered
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else float('inf')
+        return float('inf')
+
+
+class ProbeState:
+    """單一視窗的探測狀態"""
+    __slots__ = ('pid', 'histogram', 'failures', 'hung_since', 'last_latency', 'in_flight')
+
+    def __init__(self, pid: Optional[int]):
+        self.pid = pid
+        self.histogram = LatencyHistogram()
+        self.failures = 0
+        self.hung_since: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.in_flight = False
+
+
+class HealthProbeScheduler:
+    """定期確認已管理視窗是否仍在處理訊息
+
+    每個視窗每 interval 秒探測一次，各視窗依相位錯開而不會同時送出。探測
+    先以 is_hung 做不需等待的檢查，再以有逾時的空訊息往返量測延遲，並在
+    最多 workers 個背景執行緒上進行；全部執行緒都在等待無回應的視窗時，
+    到期的探測延後而不排隊，因此無回應的視窗再多也不會拖住 UI 或排版。
+    連續 hung_after 次沒有回應即標記為無回應並呼叫 on_hung(hwnd, pid)。
+    """
+
+    def __init__(self, backend: WindowBackend, targets: Callable[[], Dict[int, Optional[int]]],
+                 interval: float = 5.0, timeout: float = 1.0, hung_after: int = 2, workers: int = 4,
+                 on_hung: Optional[Callable[[int, Optional[int]], None]] = None):
+        self.backend = backend
+        self.targets = targets
+        self.interval = interval
+        self.timeout = timeout
+        self.hung_after = hung_after
+        self.workers = workers
+        self.on_hung = on_hung
+        self.states: Dict[int, ProbeState] = {}
+        self._schedule: List[Tuple[float, int]] = []
+        self._phase = 0.0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """開始背景探測"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='HealthProbe')
+        self._thread = threading.Thread(target=self._run, name='HealthProbeScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止背景探測，不等待進行中的探測"""
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                wait = self.tick()
+            except Exception as e:
+                logger.error(f"排程健康探測時發生錯誤: {str(e)}")
+                wait = self.interval
+            self._stop.wait(wait)
+
+    def tick(self) -> float:
+        """同步探測目標並送出到期的探測，回傳距離下一個到期的秒數"""
+        now = time.monotonic()
+        self._sync_targets(now)
+        due = []
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                if self._in_flight + len(due) >= self.workers:
+                    break
+                _, hwnd = heapq.heappop(self._schedule)
+                state = self.states.get(hwnd)
+                if state is None or state.in_flight:
+                    continue
+                state.in_flight = True
+                due.append(hwnd)
+            self._in_flight += len(due)
+            next_due = self._schedule[0][0] - now if self._schedule else self.interval
+        for hwnd in due:
+            self._executor.submit(self.probe, hwnd)
+        # 執行緒全忙時稍後再檢查，不必等到下一個到期時間
+        if self._in_flight >= self.workers:
+            return min(max(next_due, 0.0), 0.05)
+        return min(max(next_due, 0.01), 0.5)
+
+    def _sync_targets(self, now: float) -> None:
+        targets = self.targets()
+        with self._lock:
+            for hwnd in [hwnd for hwnd in self.states if hwnd not in targets]:
+                del self.states[hwnd]
+            for hwnd, pid in targets.items():
+                state = self.states.get(hwnd)
+                if state is None:
+                    self.states[hwnd] = ProbeState(pid)
+                    self._phase = (self._phase + PHASE_STEP) % 1.0
+                    heapq.heappush(self._schedule, (now + self._phase * self.interval, hwnd))
+                elif state.pid != pid:
+                    state.pid = pid
+            # 移除已不再探測的視窗留在排程中的項目
+            if len(self._schedule) > 2 * len(self.states) + 16:
+                self._schedule = [(due, hwnd) for due, hwnd in self._schedule if hwnd in self.states]
+                heapq.heapify(self._schedule)
+
+    def probe(self, hwnd: int) -> None:
+        """探測單一視窗並記錄結果"""
+        try:
+            if self.backend.is_hung(hwnd):
+                latency = None
+            else:
+                latency = self.backend.probe_window(hwnd, self.timeout)
+        except Exception as e:
+            logger.debug(f"探測視窗 {hwnd} 失敗: {str(e)}")
+            latency = None
+
+        became_hung = False
+        with self._lock:
+            self._in_flight -= 1
+            state = self.states.get(hwnd)
+            if state is None:
+                return
+            state.in_flight = False
+            state.last_latency = latency
+            state.histogram.add(latency)
+            if latency is None:
+                state.failures += 1
+                if state.failures >= self.hung_after and state.hung_since is None:
+                    state.hung_since = time.monotonic()
+                    became_hung = True
+            else:
+                if state.hung_since is not None:
+                    logger.info(f"視窗 {hwnd} 已恢復回應")
+                state.failures = 0
+                state.hung_since = None
+            heapq.heappush(self._schedule, (time.monotonic() + self.interval, hwnd))
+
+        if became_hung:
+            logger.warning(f"視窗 {hwnd} 連續 {self.hung_after} 次沒有回應")
+            if self.on_hung is not None:
+                try:
+                    self.on_hung(hwnd, state.pid)
+                except Exception as e:
+                    logger.error(f"處理無回應視窗 {hwnd} 時發生錯誤: {str(e)}")
+
+    def is_hung(self, hwnd: int) -> bool:
+        state = self.states.get(hwnd)
+        return state is not None and state.hung_since is not None
+
+    def summary(self, hwnd: int) -> str:
+        """回傳表格顯示用的回應狀態"""
+        state = self.states.get(hwnd)
+        if state is None or not state.histogram.total:
+            return ""
+        if state.hung_since is not None:
+            return f"無回應 {time.monotonic() - state.hung_since:.0f} 秒"
+        p95 = state.histogram.percentile(0.95)
+        if p95 is None:
+            return ""
+        if p95 == float('inf'):
+            return f"正常 p95>{BUCKET_BOUNDS[-1] * 1000:.0f}ms"
+        return f"正常 p95≤{p95 * 1000:.0f}ms"
@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+from functions.window_index import WindowIndex
+from functions.load_monitor import AdaptiveRateController
+
+logger = logging.getLogger('Instance_Launcher')
+
+
+class LaunchResult:
+    """單一實例的啟動結果"""
+    __slots__ = ('index', 'pid', 'hwnd', 'started', 'ready_at', 'timed_out')
+
+    def __init__(self, index: int, pid: Optional[int], started: float):
+        self.index = index
+        self.pid = pid
+        self.hwnd: Optional[int] = None
+        self.started = started
+        self.ready_at: Optional[float] = None
+        self.timed_out = False
+
+    @property
+    def latency(self) -> Optional[float]:
+        """從啟動到視窗出現的秒數"""
+        return self.ready_at - self.started if self.ready_at is not None else None
+
+
+class InstanceLauncher:
+    """管線化的程式啟動器
+
+    同時最多有 max_in_flight 個實例在啟動中；實例的視窗出現或等待超過
+    ready_timeout 秒後才釋放名額給下一個實例。視窗出現由視窗索引的事件
+    判斷，後端沒有事件時改為定期完整列舉。設定 rate_controller 並以
+    adaptive=True 啟動時，同時啟動數量改由系統負載決定，max_in_flight
+    作為上限。spawn 建立行程並回傳其行程 ID，無法得知時回傳 None。
+    """
+
+    def __init__(self, window_index: WindowIndex, spawn: Callable[[str], Optional[int]],
+                 max_in_flight: int = 4, ready_timeout: float = 30.0, poll_interval: float = 0.25,
+                 rate_controller: Optional[AdaptiveRateController] = None, rate_window: float = 10.0):
+        self.window_index = window_index
+        self.spawn = spawn
+        self.max_in_flight = max_in_flight
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.rate_controller = rate_controller
+        self.rate_window = rate_window
+        self.current_limit = max_in_flight
+        self._spawn_times: Deque[float] = deque()
+
+    @property
+    def launch_rate(self) -> float:
+        """最近 rate_window 秒內每秒啟動的實例數"""
+        now = time.monotonic()
+        while self._spawn_times and now - self._spawn_times[0] > self.rate_window:
+            self._spawn_times.popleft()
+        return len(self._spawn_times) / self.rate_window
+
+    def launch(self, program_path: str, count: int, title: Optional[str] = None, adaptive: bool = False,
+               progress: Optional[Callable[[int, int, str], None]] = None,
+               partial: Optional[Callable] = None,
+               cancel_event: Optional[threading.Event] = None) -> List[LaunchResult]:
+        """啟動 count 個實例並等待各自的視窗出現"""
+        appeared: "queue.Queue[int]" = queue.Queue()
+
+        def on_event(event: str, hwnd: int) -> None:
+            if event in ('create', 'show', 'name'):
+                appeared.put(hwnd)
+
+        adaptive = adaptive and self.rate_controller is not None
+        if adaptive:
+            self.rate_controller.reset(self.max_in_flight)
+        self.current_limit = self.max_in_flight
+        self._spawn_times.clear()
+
+        self.window_index.add_listener(on_event)
+        try:
+            self.window_index.ensure_fresh()
+            seen = set(self.window_index.windows)
+            pending: Deque[int] = deque(range(count))
+            in_flight: List[LaunchResult] = []
+            results: List[LaunchResult] = []
+            finished = 0
+
+            while pending or in_flight:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info(f"啟動已取消，已完成 {finished} 個實例")
+                    break
+
+                if adaptive:
+                    self.current_limit = self.rate_controller.update()
+                while pending and len(in_flight) < self.current_limit:
+                    index = pending.popleft()
+                    started = time.monotonic()
+                    self._spawn_times.append(started)
+                    result = LaunchResult(index, self.spawn(program_path), started)
+                    in_flight.append(result)
+                    results.append(result)
+
+                for hwnd in self._new_windows(appeared, seen):
+                    result = self._match(hwnd, in_flight, title)
+                    if result is None:
+                        continue
+                    seen.add(hwnd)
+                    result.hwnd = hwnd
+                    result.ready_at = time.monotonic()
+                    in_flight.remove(result)
+                    finished += 1
+                    logger.info(f"實例 {result.index + 1} 已就緒，耗時 {result.latency:.2f} 秒")
+                    self._report(result, finished, count, progress, partial)
+
+                now = time.monotonic()
+                for result in [r for r in in_flight if now - r.started > self.ready_timeout]:
+                    result.timed_out = True
+                    in_flight.remove(result)
+                    finished += 1
+                    logger.warning(f"實例 {result.index + 1} 等待視窗逾時")
+                    self._report(result, finished, count, progress, partial)
+            return results
+        finally:
+            self.window_index.remove_listener(on_event)
+
+    def _new_windows(self, appeared: "queue.Queue[int]", seen: set) -> List[int]:
+        """等待並回傳新出現的頂層視窗"""
+        hwnds = []
+        if self.window_index.live:
+            try:
+                hwnds.append(appeared.get(timeout=self.poll_interval))
+                while True:
+                    hwnds.append(appeared.get_nowait())
+            except queue.Empty:
+                pass
+        else:
+            time.sleep(self.poll_interval)
+            self.window_index.rescan()
+            hwnds = [hwnd for hwnd in self.window_index.windows if hwnd not in seen]
+
+        fresh = []
+        for hwnd in hwnds:
+            info = self.window_index.get(hwnd)
+            if hwnd in seen or info is None or not info.visible:
+                continue
+            fresh.append(hwnd)
+        return fresh
+
+    def _match(self, hwnd: int, in_flight: List[LaunchResult], title: Optional[str]) -> Optional[LaunchResult]:
+        """找出新視窗對應的啟動中實例"""
+        info = self.window_index.get(hwnd)
+        if info is None:
+            return None
+        for result in in_flight:
+            if result.pid is not None and result.pid == info.pid:
+                return result
+        # 行程 ID 不符（例如程式透過啟動器或捷徑建立另一個行程）時，依標題把
+        # 視窗配給最早啟動的實例；沒有標題時只能配給無法得知行程 ID 的實例
+        if title:
+            return in_flight[0] if in_flight and info.title == title else None
+        for result in in_flight:
+            if result.pid is None:
+                return result
+        return None
+
+    def _report(self, result: LaunchResult, finished: int, count: int,
+                progress: Optional[Callable[[int, int, str], None]], partial: Optional[Callable]) -> None:
+        if partial is not None:
+            partial(result)
+        if progress is not None:
+            progress(finished, count, f"啟動中 {finished}/{count}，同時啟動 {self.current_limit} 個，"
+                                      f"每秒 {self.launch_rate:.2f} 個")
@@ -0,0 +1,132 @@
+import math
+import logging
+from array import array
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger('Layout_Engine')
+
+# grid: 依列填滿；column: 依欄填滿；centered: 格位整體置中；
+# fit: 依視窗數量等比例縮放填滿螢幕；custom: 指定列數與欄數平分螢幕
+LAYOUT_STRATEGIES = ('grid', 'column', 'centered', 'fit', 'custom')
+
+
+class CellLayout:
+    """排版結果：每個格位的矩形以平行的整數陣列保存，依配置順序排列"""
+    __slots__ = ('xs', 'ys', 'widths', 'heights', 'monitors')
+
+    def __init__(self, xs, ys, widths, heights, monitors):
+        self.xs = xs
+        self.ys = ys
+        self.widths = widths
+        self.heights = heights
+        self.monitors = monitors
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def rect(self, cell: int) -> Tuple[int, int, int, int]:
+        return int(self.xs[cell]), int(self.ys[cell]), int(self.widths[cell]), int(self.heights[cell])
+
+
+def screen_grid(screen: Dict, strategy: str, width: int, height: int, rows: int = 0, columns: int = 0,
+                count: int = 0) -> Tuple[int, int, int, int, int, int, bool]:
+    """計算單一螢幕的格位：回傳 (欄數, 列數, 格寬, 格高, 左側位移, 上方位移, 依欄填滿)"""
+    screen_width, screen_height = screen['width'], screen['height']
+    if strategy == 'custom':
+        columns, rows = max(1, columns), max(1, rows)
+        return columns, rows, screen_width // columns, screen_height // rows, 0, 0, False
+    if strategy == 'fit':
+        if count <= 0:
+            return 0, 0, width, height, 0, 0, False
+        # 嘗試每種欄數，取縮放後格位最大的配置，維持原本的長寬比
+        best = None
+        for cols in range(1, count + 1):
+            need_rows = math.ceil(count / cols)
+            scale = min(screen_width / (cols * width), screen_height / (need_rows * height))
+            if best is None or scale > best[0]:
+                best = (scale, cols, need_rows)
+        scale, columns, rows = best
+        cell_width, cell_height = max(1, int(width * scale)), max(1, int(height * scale))
+        return (columns, rows, cell_width, cell_height,
+                (screen_width - columns * cell_width) // 2, (screen_height - rows * cell_height) // 2, False)
+    columns, rows = screen_width // width, screen_height // height
+    if strategy == 'centered':
+        return (columns, rows, width, height,
+                (screen_width - columns * width) // 2, (screen_height - rows * height) // 2, False)
+    return columns, rows, width, height, 0, 0, strategy == 'column'
+
+
+def split_count(screens: List[Dict], count: int) -> List[int]:
+    """依螢幕面積分配 fit 排版每個螢幕的視窗數量"""
+    areas = [screen['width'] * screen['height'] for screen in screens]
+    total = sum(areas) or 1
+    counts = [count * area // total for area in areas]
+    # 餘數依序分給面積最大的螢幕
+    for index in sorted(range(len(screens)), key=lambda i: -areas[i])[:count - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+
+def compute_cells(screens: List[Dict], strategy: str, width: int, height: int, rows: int = 0,
+                  columns: int = 0, count: int = 0) -> CellLayout:
+    """一次計算所有螢幕的格位矩形
+
+    每個螢幕的格位數量與大小先以少量算術決定，格位座標再以陣列運算一次
+    產生；有 NumPy 時使用向量化運算，否則以 array 模組產生相同結果。
+    """
+    if strategy not in LAYOUT_STRATEGIES:
+        raise ValueError(f"未知的排版方式: {strategy}")
+    counts = split_count(screens, count) if strategy == 'fit' else [count] * len(screens)
+    grids = [screen_grid(screen, strategy, width, height, rows, columns, screen_count)
+             for screen, screen_count in zip(screens, counts)]
+    if np is not None:
+        return _compute_numpy(screens, grids, counts if strategy == 'fit' else None)
+    return _compute_array(screens, grids, counts if strategy == 'fit' else None)
+
+
+def _compute_numpy(screens: List[Dict], grids: List[Tuple], limits) -> CellLayout:
+    parts = []
+    for monitor, (screen, grid) in enumerate(zip(screens, grids)):
+        cols, row_count, cell_width, cell_height, offset_x, offset_y, by_column = grid
+        total = cols * row_count if limits is None else min(cols * row_count, limits[monitor])
+        if total <= 0:
+            continue
+        index = np.arange(total, dtype=np.int32)
+        if by_column:
+            col, row = index // row_count, index % row_count
+        else:
+            row, col = index // cols, index % cols
+        parts.append((screen['left'] + offset_x + col * cell_width,
+                      screen['top'] + offset_y + row * cell_height,
+                      np.full(total, cell_width, dtype=np.int32),
+                      np.full(total, cell_height, dtype=np.int32),
+                      np.full(total, monitor, dtype=np.int32)))
+    if not parts:
+        empty = np.zeros(0, dtype=np.int32)
+        return CellLayout(empty, empty, empty, empty, empty)
+    return CellLayout(*(np.concatenate(column).astype(np.int32) for column in zip(*parts)))
+
+
+def _compute_array(screens: List[Dict], grids: List[Tuple], limits) -> CellLayout:
+    xs, ys, widths, heights, monitors = array('i'), array('i'), array('i'), array('i'), array('i')
+    for monitor, (screen, grid) in enumerate(zip(screens, grids)):
+        cols, row_count, cell_width, cell_height, offset_x, offset_y, by_column = grid
+        total = cols * row_count if limits is None else min(cols * row_count, limits[monitor])
+        if total <= 0:
+            continue
+        left, top = screen['left'] + offset_x, screen['top'] + offset_y
+        if by_column:
+            xs.extend(left + (i // row_count) * cell_width for i in range(total))
+            ys.extend(top + (i % row_count) * cell_height for i in range(total))
+        else:
+            xs.extend(left + (i % cols) * cell_width for i in range(total))
+            ys.extend(top + (i // cols) * cell_height for i in range(total))
+        widths.extend(array('i', [cell_width]) * total)
+        heights.extend(array('i', [cell_height]) * total)
+        monitors.extend(array('i', [monitor]) * total)
+    return CellLayout(xs, ys, widths, heights, monitors)
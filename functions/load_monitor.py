@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger('Load_Monitor')
+
+
+class LoadSample:
+    """系統負載取樣，各項數值為 0 到 1 的比例，無法取得時為 None"""
+    __slots__ = ('cpu', 'memory', 'disk')
+
+    def __init__(self, cpu: Optional[float], memory: Optional[float], disk: Optional[float]):
+        self.cpu = cpu
+        self.memory = memory
+        self.disk = disk
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {'cpu': self.cpu, 'memory': self.memory, 'disk': self.disk}
+
+
+class LoadSampler:
+    """系統負載取樣器介面，數值以兩次取樣之間的變化計算"""
+
+    def sample(self) -> LoadSample:
+        raise NotImplementedError
+
+
+class ProcLoadSampler(LoadSampler):
+    """讀取 Linux /proc 的 CPU、記憶體與磁碟使用率"""
+
+    def __init__(self, proc_root: str = '/proc'):
+        self.proc_root = proc_root
+        self._cpu = self._read_cpu()
+        self._disk = self._read_disk_ticks()
+        self._disk_time = time.monotonic()
+
+    def sample(self) -> LoadSample:
+        cpu = self._read_cpu()
+        cpu_usage = None
+        if cpu is not None and self._cpu is not None:
+            busy = cpu[0] - self._cpu[0]
+            total = cpu[1] - self._cpu[1]
+            cpu_usage = busy / total if total > 0 else 0.0
+        self._cpu = cpu
+
+        now = time.monotonic()
+        ticks = self._read_disk_ticks()
+        disk_usage = None
+        if ticks is not None and self._disk is not None and now > self._disk_time:
+            elapsed_ms = (now - self._disk_time) * 1000
+            busiest = max((ticks[name] - self._disk.get(name, ticks[name]) for name in ticks), default=0)
+            disk_usage = min(1.0, busiest / elapsed_ms)
+        self._disk = ticks
+        self._disk_time = now
+
+        return LoadSample(cpu_usage, self._read_memory(), disk_usage)
+
+    def _read_cpu(self):
+        """回傳 (忙碌時間, 總時間)"""
+        try:
+            with open(os.path.join(self.proc_root, 'stat'), 'r') as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        # user nice system idle iowait irq softirq steal ...
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields[:8])
+        return total - idle, total
+
+    def _read_memory(self) -> Optional[float]:
+        try:
+            values = {}
+            with open(os.path.join(self.proc_root, 'meminfo'), 'r') as f:
+                for line in f:
+                    key, value = line.split(':', 1)
+                    values[key] = int(value.split()[0])
+            return 1.0 - values['MemAvailable'] / values['MemTotal']
+        except (OSError, ValueError, KeyError, ZeroDivisionError):
+            return None
+
+    def _read_disk_ticks(self) -> Optional[Dict[str, int]]:
+        """回傳各磁碟處理 I/O 的累計毫秒數"""
+        try:
+            ticks = {}
+            with open(os.path.join(self.proc_root, 'diskstats'), 'r') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 13 or parts[2].startswith(('loop', 'ram')):
+                        continue
+                    ticks[parts[2]] = int(parts[12])
+            return ticks
+        except (OSError, ValueError):
+            return None
+
+
+class Win32LoadSampler(LoadSampler):
+    """以 GetSystemTimes 與 GlobalMemoryStatusEx 取得 CPU 與記憶體使用率"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.windll.kernel32
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.wintypes.DWORD), ('dwMemoryLoad', ctypes.wintypes.DWORD),
+                ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+        self._memory_status = MEMORYSTATUSEX
+        self._times = self._read_times()
+
+    def sample(self) -> LoadSample:
+        times = self._read_times()
+        idle = times[0] - self._times[0]
+        # GetSystemTimes 的核心時間包含閒置時間
+        total = (times[1] - self._times[1]) + (times[2] - self._times[2])
+        self._times = times
+        cpu = (total - idle) / total if total > 0 else 0.0
+
+        status = self._memory_status()
+        status.dwLength = self._ctypes.sizeof(status)
+        memory = None
+        if self._kernel32.GlobalMemoryStatusEx(self._ctypes.byref(status)):
+            memory = status.dwMemoryLoad / 100
+        return LoadSample(cpu, memory, None)
+
+    def _read_times(self):
+        ctypes = self._ctypes
+        idle, kernel, user = (ctypes.c_ulonglong(), ctypes.c_ulonglong(), ctypes.c_ulonglong())
+        self._kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user))
+        return idle.value, kernel.value, user.value
+
+
+def create_load_sampler() -> Optional[LoadSampler]:
+    """依照執行平台建立負載取樣器，不支援時回傳 None"""
+    try:
+        if sys.platform == 'win32':
+            return Win32LoadSampler()
+        if os.path.exists('/proc/stat'):
+            return ProcLoadSampler()
+    except Exception as e:
+        logger.error(f"建立負載取樣器時發生錯誤: {str(e)}")
+    return None
+
+
+class AdaptiveRateController:
+    """依系統負載調整同時啟動數量
+
+    任何一項負載超過門檻時將上限減半，全部低於門檻的 headroom 比例時加一，
+    讓負載維持在門檻之下，又不會在系統空閒時放慢啟動。
+    """
+
+    def __init__(self, sampler: Optional[LoadSampler], thresholds: Optional[Dict[str, float]] = None,
+                 min_limit: int = 1, max_limit: int = 16, sample_interval: float = 0.5, headroom: float = 0.8):
+        self.sampler = sampler
+        self.thresholds = {'cpu': 0.85, 'memory': 0.90, 'disk': 0.80}
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.sample_interval = sample_interval
+        self.headroom = headroom
+        self.limit = max_limit
+        self.last_sample: Optional[LoadSample] = None
+        self._last_time = 0.0
+
+    def reset(self, max_limit: int) -> None:
+        """開始新一輪啟動，從上限的一半開始"""
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = max(self.min_limit, self.max_limit // 2)
+        self._last_time = 0.0
+
+    def update(self) -> int:
+        """必要時取樣並回傳目前允許的同時啟動數量"""
+        if self.sampler is None:
+            return self.max_limit
+        now = time.monotonic()
+        if now - self._last_time < self.sample_interval:
+            return self.limit
+        self._last_time = now
+        try:
+            sample = self.sampler.sample()
+        except Exception as e:
+            logger.error(f"取樣系統負載時發生錯誤: {str(e)}")
+            return self.limit
+        self.last_sample = sample
+
+        values = [(value, self.thresholds[key]) for key, value in sample.as_dict().items() if value is not None]
+        if any(value >= threshold for value, threshold in values):
+            self.limit = max(self.min_limit, self.limit // 2)
+        elif all(value < threshold * self.headroom for value, threshold in values):
+            self.limit = min(self.max_limit, self.limit + 1)
+        return self.limit
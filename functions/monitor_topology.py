@@ -0,0 +1,43 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from functions.window_backend import WindowBackend
+
+logger = logging.getLogger('Monitor_Topology')
+
+
+class MonitorTopology:
+    """螢幕配置的快取
+
+    列舉所有螢幕的工作區（扣除工作列），依位置由左至右、由上至下排序，
+    結果保留到顯示設定改變才重新查詢。後端送出 'display' 事件或呼叫
+    invalidate 時清除快取，version 會在每次重新查詢後遞增。
+    """
+
+    def __init__(self, backend: WindowBackend):
+        self.backend = backend
+        self.version = 0
+        self._monitors: Optional[List[Dict]] = None
+        self._lock = threading.Lock()
+        backend.subscribe_events(self._on_event)
+
+    def get_monitors(self) -> List[Dict]:
+        """回傳快取的螢幕列表，必要時重新查詢"""
+        with self._lock:
+            if self._monitors is None:
+                monitors = self.backend.get_monitors()
+                monitors.sort(key=lambda m: (m['left'], m['top']))
+                self._monitors = monitors
+                self.version += 1
+                logger.info(f"成功獲取螢幕資訊: {monitors}")
+            return self._monitors
+
+    def invalidate(self) -> None:
+        """顯示設定改變時清除快取"""
+        with self._lock:
+            self._monitors = None
+
+    def _on_event(self, event: str, hwnd: int) -> None:
+        if event == 'display':
+            self.invalidate()
@@ -0,0 +1,308 @@
+import os
+import sys
+import time
+import threading
+import logging
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('Process_Metrics')
+
+# 單一行程的原始讀數：(累計 CPU 秒數, 常駐記憶體位元組, 控制代碼數, 執行緒數)
+RawSample = Tuple[float, int, int, int]
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+class ProcessReader:
+    """一次讀取多個行程的原始讀數"""
+
+    def read(self, pids: Iterable[int]) -> Dict[int, RawSample]:
+        """回傳仍存在的行程讀數，已結束的行程不會出現在結果中"""
+        raise NotImplementedError
+
+    def forget(self, pids: Iterable[int]) -> None:
+        """不再追蹤的行程，釋放保留的資源"""
+
+
+class ProcReader(ProcessReader):
+    """讀取 Linux /proc/<pid>/stat 與開啟的檔案描述元
+
+    stat 檔在追蹤期間保持開啟，每次以 pread 重新讀取，省去開檔與關檔。
+    列出 fd 目錄的成本比讀取 stat 高，且控制代碼數變化緩慢，因此每個行程
+    只在每 handle_every 次讀取中輪到一次，其餘沿用上次的數值。
+    """
+
+    def __init__(self, proc_root: str = '/proc', handle_every: int = 5):
+        self.proc_root = proc_root
+        self.handle_every = max(1, handle_every)
+        self._ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._handles: Dict[int, int] = {}
+        self._stat_fds: Dict[int, int] = {}
+        self._pass = 0
+
+    def read(self, pids: Iterable[int]) -> Dict[int, RawSample]:
+        samples = {}
+        turn = self._pass % self.handle_every
+        self._pass += 1
+        for pid in pids:
+            try:
+                fd = self._stat_fds.get(pid)
+                if fd is None:
+                    fd = self._stat_fds[pid] = os.open(f'{self.proc_root}/{pid}/stat', os.O_RDONLY)
+                # 行程名稱可能包含空白，從最後一個右括號之後切分
+                fields = os.pread(fd, 4096, 0).rsplit(b')', 1)[1].split()
+                handles = self._handles.get(pid)
+                if handles is None or pid % self.handle_every == turn:
+                    handles = self._handles[pid] = len(os.listdir(f'{self.proc_root}/{pid}/fd'))
+            except (OSError, IndexError):
+                self.forget((pid,))
+                continue
+            # fields[0] 為原始第 3 欄 state
+            cpu = (int(fields[11]) + int(fields[12])) / self._ticks
+            samples[pid] = (cpu, int(fields[21]) * self._page_size, handles, int(fields[17]))
+        return samples
+
+    def forget(self, pids: Iterable[int]) -> None:
+        for pid in pids:
+            self._handles.pop(pid, None)
+            fd = self._stat_fds.pop(pid, None)
+            if fd is not None:
+                os.close(fd)
+
+
+class Win32ProcessReader(ProcessReader):
+    """以 GetProcessTimes、K32GetProcessMemoryInfo 與 GetProcessHandleCount 讀取，
+    執行緒數由單次 Toolhelp 快照取得；行程控制代碼在追蹤期間保留重複使用"""
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    TH32CS_SNAPPROCESS = 0x00000002
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes
+        wintypes = ctypes.wintypes
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.OpenProcess.restype = wintypes.HANDLE
+        self._kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        self._handles: Dict[int, int] = {}
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        class PROCESSENTRY32(ctypes.Structure):
+            _fields_ = [
+                ('dwSize', wintypes.DWORD), ('cntUsage', wintypes.DWORD),
+                ('th32ProcessID', wintypes.DWORD), ('th32DefaultHeapID', ctypes.c_void_p),
+                ('th32ModuleID', wintypes.DWORD), ('cntThreads', wintypes.DWORD),
+                ('th32ParentProcessID', wintypes.DWORD), ('pcPriClassBase', ctypes.c_long),
+                ('dwFlags', wintypes.DWORD), ('szExeFile', ctypes.c_char * 260),
+            ]
+
+        self._memory_counters = PROCESS_MEMORY_COUNTERS
+        self._process_entry = PROCESSENTRY32
+
+    def _thread_counts(self) -> Dict[int, int]:
+        ctypes = self._ctypes
+        snapshot = self._kernel32.CreateToolhelp32Snapshot(self.TH32CS_SNAPPROCESS, 0)
+        counts = {}
+        if not snapshot or snapshot == ctypes.c_void_p(-1).value:
+            return counts
+        try:
+            entry = self._process_entry()
+            entry.dwSize = ctypes.sizeof(entry)
+            ok = self._kernel32.Process32First(snapshot, ctypes.byref(entry))
+            while ok:
+                counts[entry.th32ProcessID] = entry.cntThreads
+                ok = self._kernel32.Process32Next(snapshot, ctypes.byref(entry))
+        finally:
+            self._kernel32.CloseHandle(snapshot)
+        return counts
+
+    def read(self, pids: Iterable[int]) -> Dict[int, RawSample]:
+        ctypes = self._ctypes
+        threads = self._thread_counts()
+        samples = {}
+        creation, exit_time, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+        handle_count = ctypes.c_ulong()
+        counters = self._memory_counters()
+        counters.cb = ctypes.sizeof(counters)
+        for pid in pids:
+            if pid not in threads:
+                self.forget((pid,))
+                continue
+            handle = self._handles.get(pid)
+            if handle is None:
+                handle = self._kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+                if not handle:
+                    continue
+                self._handles[pid] = handle
+            if not self._kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                                  ctypes.byref(kernel), ctypes.byref(user)):
+                continue
+            rss = counters.WorkingSetSize if self._kernel32.K32GetProcessMemoryInfo(
+                handle, ctypes.byref(counters), counters.cb) else 0
+            handles = handle_count.value if self._kernel32.GetProcessHandleCount(
+                handle, ctypes.byref(handle_count)) else 0
+            # FILETIME 以 100 奈秒為單位
+            samples[pid] = ((kernel.value + user.value) / 1e7, rss, handles, threads[pid])
+        return samples
+
+    def forget(self, pids: Iterable[int]) -> None:
+        for pid in pids:
+            handle = self._handles.pop(pid, None)
+            if handle:
+                self._kernel32.CloseHandle(handle)
+
+
+def create_process_reader() -> Optional[ProcessReader]:
+    """依照執行平台建立行程讀取器，不支援時回傳 None"""
+    try:
+        if sys.platform == 'win32':
+            return Win32ProcessReader()
+        if os.path.exists('/proc/self/stat'):
+            return ProcReader()
+    except Exception as e:
+        logger.error(f"建立行程讀取器時發生錯誤: {str(e)}")
+    return None
+
+
+class MetricHistory:
+    """單一行程固定長度的環狀緩衝區，每項指標各以一個 array 保存"""
+    __slots__ = ('capacity', 'cpu', 'memory', 'handles', 'threads', 'head', 'count')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.cpu = array('d', [0.0]) * capacity
+        self.memory = array('d', [0.0]) * capacity
+        self.handles = array('l', [0]) * capacity
+        self.threads = array('l', [0]) * capacity
+        self.head = 0
+        self.count = 0
+
+    def append(self, cpu: float, memory: float, handles: int, threads: int) -> None:
+        head = self.head
+        self.cpu[head] = cpu
+        self.memory[head] = memory
+        self.handles[head] = handles
+        self.threads[head] = threads
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest(self) -> Optional[Tuple[float, float, int, int]]:
+        """回傳最新一筆 (CPU 百分比, 記憶體 MB, 控制代碼數, 執行緒數)"""
+        if not self.count:
+            return None
+        last = self.head - 1
+        return self.cpu[last], self.memory[last], self.handles[last], self.threads[last]
+
+    def series(self, metric: str) -> List[float]:
+        """依時間先後回傳單項指標的歷史"""
+        values = getattr(self, metric)
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            return values[start:start + self.count].tolist()
+        return values[start:].tolist() + values[:self.head].tolist()
+
+
+def sparkline(values: List[float], width: int = 20) -> str:
+    """把數列轉成文字走勢圖，以數列自身的最大值縮放"""
+    values = values[-width:]
+    if not values:
+        return ''
+    top = max(values)
+    if top <= 0:
+        return SPARK_CHARS[0] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / top
+    return ''.join(SPARK_CHARS[int(value * scale)] for value in values)
+
+
+class ProcessMetricsCollector:
+    """定期取樣所有已啟動實例的資源使用量
+
+    背景執行緒每 interval 秒呼叫 pids() 取得要追蹤的行程，以讀取器一次
+    讀完，CPU 使用率以兩次讀數的差值除以經過時間與核心數計算，結果寫入
+    每個行程的 MetricHistory。pass_cpu_time 記錄最近一次取樣本身耗用的
+    CPU 秒數。
+    """
+
+    def __init__(self, reader: Optional[ProcessReader], pids: Callable[[], Set[int]],
+                 interval: float = 1.0, history: int = 60):
+        self.reader = reader
+        self.pids = pids
+        self.interval = interval
+        self.history_size = history
+        self.histories: Dict[int, MetricHistory] = {}
+        self.pass_cpu_time = 0.0
+        self._previous: Dict[int, Tuple[float, float]] = {}
+        self._tracked: Set[int] = set()
+        self._cpu_count = os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """開始背景取樣"""
+        if self.reader is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ProcessMetrics', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止背景取樣"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"取樣行程資源時發生錯誤: {str(e)}")
+
+    def sample(self) -> None:
+        """讀取一次所有追蹤中的行程"""
+        started = time.thread_time()
+        pids = set(self.pids())
+        dropped = self._tracked - pids
+        self._tracked = pids
+        if dropped:
+            self.reader.forget(dropped)
+        now = time.monotonic()
+        raw = self.reader.read(pids)
+        with self._lock:
+            for pid in [pid for pid in self.histories if pid not in raw]:
+                del self.histories[pid]
+                self._previous.pop(pid, None)
+            for pid, (cpu_time, rss, handles, threads) in raw.items():
+                history = self.histories.get(pid)
+                if history is None:
+                    history = self.histories[pid] = MetricHistory(self.history_size)
+                previous = self._previous.get(pid)
+                self._previous[pid] = (cpu_time, now)
+                if previous is None or now <= previous[1]:
+                    continue
+                usage = (cpu_time - previous[0]) / (now - previous[1]) / self._cpu_count * 100
+                history.append(usage, rss / (1024 * 1024), handles, threads)
+        self.pass_cpu_time = time.thread_time() - started
+
+    def latest(self, pid: Optional[int]) -> Optional[Tuple[float, float, int, int]]:
+        """回傳行程最新一筆讀數，尚無資料時回傳 None"""
+        with self._lock:
+            history = self.histories.get(pid)
+            return history.latest() if history is not None else None
+
+    def trend(self, pid: Optional[int], metric: str = 'cpu') -> str:
+        """回傳行程單項指標的文字走勢圖"""
+        with self._lock:
+            history = self.histories.get(pid)
+            return sparkline(history.series(metric)) if history is not None else ''
@@ -0,0 +1,552 @@
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import logging
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('Process_Throttle')
+
+# 節流程度由輕到重，每一級包含前一級的限制
+THROTTLE_LEVELS = ('normal', 'low', 'limited', 'suspended')
+LEVEL_LABELS = {'normal': '正常', 'low': '低優先', 'limited': '限制 CPU', 'suspended': '已暫停'}
+# 每一級的 (降低優先順序, 限制 CPU 核心, 暫停行程)
+LEVEL_ASPECTS = {
+    'normal': (False, False, False),
+    'low': (True, False, False),
+    'limited': (True, True, False),
+    'suspended': (True, True, True),
+}
+
+
+def _severity(level: str) -> int:
+    return THROTTLE_LEVELS.index(level)
+
+
+class ProcessController:
+    """改變行程排程設定的後端，各方法失敗時拋出 OSError"""
+
+    def lower_priority(self, pid: int) -> None:
+        """降低行程的排程優先順序，並記住原本的設定"""
+        raise NotImplementedError
+
+    def restore_priority(self, pid: int) -> None:
+        """恢復 lower_priority 之前的優先順序"""
+        raise NotImplementedError
+
+    def limit_affinity(self, pid: int, cpus: int) -> None:
+        """把行程限制在 cpus 個核心上執行，並記住原本的設定"""
+        raise NotImplementedError
+
+    def restore_affinity(self, pid: int) -> None:
+        """恢復 limit_affinity 之前的核心設定"""
+        raise NotImplementedError
+
+    def suspend(self, pid: int) -> None:
+        """暫停行程的所有執行緒"""
+        raise NotImplementedError
+
+    def resume(self, pid: int) -> None:
+        """恢復暫停的行程"""
+        raise NotImplementedError
+
+    def forget(self, pid: int) -> None:
+        """不再控制的行程，釋放保留的資源"""
+
+
+class PosixProcessController(ProcessController):
+    """以 nice 值、sched_setaffinity 與 SIGSTOP/SIGCONT 控制 Linux 行程
+
+    非特權使用者只能調高 nice 值，調回原本的數值需要 CAP_SYS_NICE 或足夠的
+    RLIMIT_NICE，否則 restore_priority 會拋出 PermissionError。恢復失敗時
+    仍保留原本的設定，之後再次降低時以原本的數值計算，nice 值不會一路累加。
+    限制核心時保留編號最大的核心，讓前景實例優先使用前面的核心。
+    """
+
+    def __init__(self, nice_step: int = 10):
+        self.nice_step = nice_step
+        self._nice: Dict[int, int] = {}
+        self._affinity: Dict[int, Set[int]] = {}
+
+    def lower_priority(self, pid: int) -> None:
+        original = self._nice.get(pid)
+        if original is None:
+            original = os.getpriority(os.PRIO_PROCESS, pid)
+        os.setpriority(os.PRIO_PROCESS, pid, min(19, original + self.nice_step))
+        self._nice.setdefault(pid, original)
+
+    def restore_priority(self, pid: int) -> None:
+        original = self._nice.get(pid)
+        if original is not None:
+            os.setpriority(os.PRIO_PROCESS, pid, original)
+            del self._nice[pid]
+
+    def limit_affinity(self, pid: int, cpus: int) -> None:
+        original = self._affinity.get(pid)
+        if original is None:
+            original = os.sched_getaffinity(pid)
+        os.sched_setaffinity(pid, sorted(original)[-max(1, cpus):])
+        self._affinity.setdefault(pid, original)
+
+    def restore_affinity(self, pid: int) -> None:
+        original = self._affinity.get(pid)
+        if original is not None:
+            os.sched_setaffinity(pid, original)
+            del self._affinity[pid]
+
+    def suspend(self, pid: int) -> None:
+        os.kill(pid, signal.SIGSTOP)
+
+    def resume(self, pid: int) -> None:
+        os.kill(pid, signal.SIGCONT)
+
+    def forget(self, pid: int) -> None:
+        self._nice.pop(pid, None)
+        self._affinity.pop(pid, None)
+
+
+class Win32ProcessController(ProcessController):
+    """以 SetPriorityClass、SetProcessAffinityMask 與 NtSuspendProcess/NtResumeProcess
+    控制行程；行程控制代碼在控制期間保留重複使用"""
+
+    PROCESS_SET_INFORMATION = 0x0200
+    PROCESS_SUSPEND_RESUME = 0x0800
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    IDLE_PRIORITY_CLASS = 0x00000040
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.windll.kernel32
+        self._ntdll = ctypes.windll.ntdll
+        self._kernel32.OpenProcess.restype = ctypes.wintypes.HANDLE
+        self._kernel32.GetPriorityClass.argtypes = [ctypes.wintypes.HANDLE]
+        self._kernel32.GetProcessAffinityMask.argtypes = [
+            ctypes.wintypes.HANDLE, ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_size_t)
+        ]
+        self._kernel32.SetProcessAffinityMask.argtypes = [ctypes.wintypes.HANDLE, ctypes.c_size_t]
+        self._ntdll.NtSuspendProcess.argtypes = [ctypes.wintypes.HANDLE]
+        self._ntdll.NtResumeProcess.argtypes = [ctypes.wintypes.HANDLE]
+        self._handles: Dict[int, int] = {}
+        self._priority: Dict[int, int] = {}
+        self._affinity: Dict[int, int] = {}
+
+    def _handle(self, pid: int) -> int:
+        handle = self._handles.get(pid)
+        if handle is None:
+            handle = self._kernel32.OpenProcess(
+                self.PROCESS_SET_INFORMATION | self.PROCESS_SUSPEND_RESUME | self.PROCESS_QUERY_LIMITED_INFORMATION,
+                False, pid)
+            if not handle:
+                raise self._ctypes.WinError()
+            self._handles[pid] = handle
+        return handle
+
+    def lower_priority(self, pid: int) -> None:
+        handle = self._handle(pid)
+        # 上次恢復失敗時保留的才是原本的設定
+        original = self._priority.get(pid) or self._kernel32.GetPriorityClass(handle)
+        if not original or not self._kernel32.SetPriorityClass(handle, self.IDLE_PRIORITY_CLASS):
+            raise self._ctypes.WinError()
+        self._priority.setdefault(pid, original)
+
+    def restore_priority(self, pid: int) -> None:
+        original = self._priority.get(pid)
+        if original is not None:
+            if not self._kernel32.SetPriorityClass(self._handle(pid), original):
+                raise self._ctypes.WinError()
+            del self._priority[pid]
+
+    def limit_affinity(self, pid: int, cpus: int) -> None:
+        ctypes = self._ctypes
+        handle = self._handle(pid)
+        process_mask, system_mask = ctypes.c_size_t(), ctypes.c_size_t()
+        if not self._kernel32.GetProcessAffinityMask(handle, ctypes.byref(process_mask), ctypes.byref(system_mask)):
+            raise ctypes.WinError()
+        original = self._affinity.get(pid) or process_mask.value
+        # 保留編號最大的 cpus 個核心
+        bits = [bit for bit in range(original.bit_length()) if original >> bit & 1]
+        mask = sum(1 << bit for bit in bits[-max(1, cpus):])
+        if not self._kernel32.SetProcessAffinityMask(handle, mask):
+            raise ctypes.WinError()
+        self._affinity.setdefault(pid, original)
+
+    def restore_affinity(self, pid: int) -> None:
+        original = self._affinity.get(pid)
+        if original is not None:
+            if not self._kernel32.SetProcessAffinityMask(self._handle(pid), original):
+                raise self._ctypes.WinError()
+            del self._affinity[pid]
+
+    def suspend(self, pid: int) -> None:
+        status = self._ntdll.NtSuspendProcess(self._handle(pid))
+        if status:
+            raise OSError(f"NtSuspendProcess 失敗: 0x{status & 0xFFFFFFFF:08X}")
+
+    def resume(self, pid: int) -> None:
+        status = self._ntdll.NtResumeProcess(self._handle(pid))
+        if status:
+            raise OSError(f"NtResumeProcess 失敗: 0x{status & 0xFFFFFFFF:08X}")
+
+    def forget(self, pid: int) -> None:
+        self._priority.pop(pid, None)
+        self._affinity.pop(pid, None)
+        handle = self._handles.pop(pid, None)
+        if handle:
+            self._kernel32.CloseHandle(handle)
+
+
+class SimulatedProcessController(ProcessController):
+    """記錄每個模擬行程目前的限制，不影響真實行程
+
+    模擬桌面的行程 ID 是假的，可能與真實行程重複，不能送出任何系統呼叫。
+    暫停的行程不再處理訊息，其視窗在模擬桌面上標示為無回應。
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        # {pid: {'priority', 'affinity', 'suspended'}}
+        self.applied: Dict[int, Set[str]] = {}
+        self.calls = 0
+
+    def _set(self, pid: int, aspect: str, enabled: bool) -> None:
+        self.calls += 1
+        aspects = self.applied.setdefault(pid, set())
+        if enabled:
+            aspects.add(aspect)
+        else:
+            aspects.discard(aspect)
+        if aspect == 'suspended' and self.backend is not None:
+            for window in list(self.backend.windows.values()):
+                if window.pid == pid:
+                    window.hung = enabled
+
+    def lower_priority(self, pid: int) -> None:
+        self._set(pid, 'priority', True)
+
+    def restore_priority(self, pid: int) -> None:
+        self._set(pid, 'priority', False)
+
+    def limit_affinity(self, pid: int, cpus: int) -> None:
+        self._set(pid, 'affinity', True)
+
+    def restore_affinity(self, pid: int) -> None:
+        self._set(pid, 'affinity', False)
+
+    def suspend(self, pid: int) -> None:
+        self._set(pid, 'suspended', True)
+
+    def resume(self, pid: int) -> None:
+        self._set(pid, 'suspended', False)
+
+    def forget(self, pid: int) -> None:
+        self.applied.pop(pid, None)
+
+
+def create_process_controller(backend=None) -> Optional[ProcessController]:
+    """依照執行平台建立行程控制器，模擬桌面使用只記錄狀態的控制器，不支援時回傳 None"""
+    from functions.window_backend import SimulatedBackend
+    try:
+        if isinstance(backend, SimulatedBackend):
+            return SimulatedProcessController(backend)
+        if sys.platform == 'win32':
+            return Win32ProcessController()
+        if hasattr(os, 'sched_setaffinity'):
+            return PosixProcessController()
+    except Exception as e:
+        logger.error(f"建立行程控制器時發生錯誤: {str(e)}")
+    return None
+
+
+class ThrottlePolicy:
+    """依實例目前的狀態決定節流程度
+
+    聚焦的實例一律不節流；其餘在目前頁面顯示的實例使用 visible，不在目前
+    頁面或已隱藏的使用 hidden；超過 idle_minutes 分鐘未聚焦時至少使用
+    idle，idle_minutes 為 0 表示不依閒置時間節流。
+    """
+    __slots__ = ('visible', 'hidden', 'idle', 'idle_minutes', 'affinity_cpus')
+
+    def __init__(self, visible: str = 'normal', hidden: str = 'suspended', idle: str = 'low',
+                 idle_minutes: float = 0, affinity_cpus: int = 1):
+        for level in (visible, hidden, idle):
+            if level not in THROTTLE_LEVELS:
+                raise ValueError(f"未知的節流程度: {level}")
+        if idle_minutes < 0 or affinity_cpus < 1:
+            raise ValueError("閒置時間不可為負數，核心數至少為 1")
+        self.visible = visible
+        self.hidden = hidden
+        self.idle = idle
+        self.idle_minutes = idle_minutes
+        self.affinity_cpus = affinity_cpus
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ThrottlePolicy':
+        return cls(data.get('visible', 'normal'), data.get('hidden', 'suspended'), data.get('idle', 'low'),
+                   float(data.get('idle_minutes', 0)), int(data.get('affinity_cpus', 1)))
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def level_for(self, focused: bool, shown: bool, idle_seconds: float) -> str:
+        if focused:
+            return 'normal'
+        level = self.visible if shown else self.hidden
+        if self.idle_minutes > 0 and idle_seconds >= self.idle_minutes * 60 and _severity(self.idle) > _severity(level):
+            level = self.idle
+        return level
+
+
+class ThrottleState:
+    """單一行程的節流狀態與活動統計"""
+    __slots__ = ('level', 'since', 'last_active', 'hold_until', 'level_time', 'transitions', 'failures')
+
+    def __init__(self, now: float):
+        self.level = 'normal'
+        self.since = now
+        self.last_active = now
+        self.hold_until = 0.0
+        # 各節流程度累計的秒數，依 THROTTLE_LEVELS 順序
+        self.level_time = array('d', [0.0]) * len(THROTTLE_LEVELS)
+        self.transitions = 0
+        self.failures = 0
+
+
+class InstanceThrottler:
+    """依政策降低背景實例的優先順序、限制 CPU 核心或暫停行程
+
+    背景執行緒每 interval 秒呼叫 states() 取得每個行程 (是否聚焦, 是否在目前
+    頁面顯示)，依政策決定節流程度，只對程度改變的行程呼叫控制器。聚焦、
+    換頁或排版寫入前由 wake 立即恢復，不等下一次檢查；剛恢復的行程在 grace
+    秒內不會被加重節流，避免在寫入視窗時又被暫停。不再管理的行程與關閉
+    節流時，所有行程恢復原本的設定。
+
+    設定 state_path 時把暫停中的行程寫入該檔案，程式異常結束留下的暫停
+    行程在下次 start 時恢復執行。
+    """
+
+    def __init__(self, controller: Optional[ProcessController], states: Callable[[], Dict[int, Tuple[bool, bool]]],
+                 interval: float = 1.0, grace: float = 3.0, state_path: Optional[str] = None):
+        self.controller = controller
+        self.states = states
+        self.interval = interval
+        self.grace = grace
+        self.state_path = state_path
+        self._saved_suspended: List[int] = []
+        self.policy = ThrottlePolicy()
+        self.enabled = False
+        self.wake_count = 0
+        self.last_wake_time: Optional[float] = None
+        self._states: Dict[int, ThrottleState] = {}
+        self._own_pid = os.getpid()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """恢復上次未正常結束時暫停的行程並開始背景檢查"""
+        if self.controller is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._resume_saved()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='InstanceThrottler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止背景檢查並恢復所有行程
+
+        等待進行中的檢查結束後才恢復，避免檢查在恢復之後又暫停行程。
+        """
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.release_all()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"節流行程時發生錯誤: {str(e)}")
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """依目前狀態調整一次所有行程的節流程度"""
+        if self.controller is None:
+            return
+        if not self.enabled:
+            if self._states:
+                self.release_all()
+            return
+        now = time.monotonic() if now is None else now
+        states = self.states()
+        with self._lock:
+            # 不再管理的行程恢復原本設定；已結束的行程在 _apply 中略過
+            for pid in [pid for pid in self._states if pid not in states]:
+                self._apply(pid, self._states[pid], 'normal', now)
+                self._drop(pid)
+            for pid, (focused, shown) in states.items():
+                if pid <= 0 or pid == self._own_pid:
+                    continue
+                state = self._states.get(pid)
+                if state is None:
+                    state = self._states[pid] = ThrottleState(now)
+                if focused:
+                    state.last_active = now
+                level = self.policy.level_for(focused, shown, now - state.last_active)
+                if now < state.hold_until and _severity(level) > _severity(state.level):
+                    continue
+                if level != state.level:
+                    self._apply(pid, state, level, now)
+            self._save_suspended()
+
+    def wake(self, pids: Iterable[int]) -> int:
+        """立即恢復行程並視為剛有活動，回傳實際恢復的行程數"""
+        if self.controller is None:
+            return 0
+        started = time.perf_counter()
+        now = time.monotonic()
+        woken = 0
+        with self._lock:
+            for pid in pids:
+                state = self._states.get(pid)
+                if state is None:
+                    continue
+                state.last_active = now
+                state.hold_until = now + self.grace
+                if state.level != 'normal':
+                    self._apply(pid, state, 'normal', now)
+                    woken += 1
+        if woken:
+            self.wake_count += woken
+            self.last_wake_time = time.perf_counter() - started
+        return woken
+
+    def release_all(self) -> None:
+        """恢復所有行程原本的設定"""
+        if self.controller is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for pid, state in list(self._states.items()):
+                self._apply(pid, state, 'normal', now)
+                self._drop(pid)
+            self._save_suspended()
+
+    def _save_suspended(self) -> None:
+        """暫停的行程改變時寫入 state_path，沒有暫停的行程時刪除檔案
+
+        wake 恢復的行程不立即寫入，下次檢查時才更新；檔案中多出已恢復的
+        行程無妨，恢復執行中的行程不會有任何效果。
+        """
+        if self.state_path is None:
+            return
+        pids = sorted(pid for pid, state in self._states.items() if LEVEL_ASPECTS[state.level][2])
+        if pids == self._saved_suspended:
+            return
+        try:
+            if pids:
+                temp_path = self.state_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'suspended': pids}, f)
+                os.replace(temp_path, self.state_path)
+            elif os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            self._saved_suspended = pids
+        except OSError as e:
+            logger.error(f"儲存暫停的行程時發生錯誤: {str(e)}")
+
+    def _resume_saved(self) -> None:
+        """恢復 state_path 中記錄的暫停行程並刪除檔案"""
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                pids = [int(pid) for pid in json.load(f).get('suspended', [])]
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.error(f"讀取暫停的行程時發生錯誤: {str(e)}")
+            pids = []
+        for pid in pids:
+            try:
+                self.controller.resume(pid)
+                logger.info(f"已恢復上次暫停的行程 {pid}")
+            except OSError:
+                # 行程已結束或無權限
+                pass
+            self.controller.forget(pid)
+        try:
+            os.remove(self.state_path)
+        except OSError as e:
+            logger.error(f"刪除暫停行程紀錄時發生錯誤: {str(e)}")
+        self._saved_suspended = []
+
+    def _drop(self, pid: int) -> None:
+        del self._states[pid]
+        self.controller.forget(pid)
+
+    def _apply(self, pid: int, state: ThrottleState, level: str, now: float) -> None:
+        """只執行兩個程度之間有差異的操作；解除限制時先恢復執行，加重時最後才暫停"""
+        current, target = LEVEL_ASPECTS[state.level], LEVEL_ASPECTS[level]
+        steps: List[Callable[[], None]] = []
+        if current[2] and not target[2]:
+            steps.append(lambda: self.controller.resume(pid))
+        if current[1] != target[1]:
+            steps.append((lambda: self.controller.limit_affinity(pid, self.policy.affinity_cpus)) if target[1]
+                         else (lambda: self.controller.restore_affinity(pid)))
+        if current[0] != target[0]:
+            steps.append((lambda: self.controller.lower_priority(pid)) if target[0]
+                         else (lambda: self.controller.restore_priority(pid)))
+        if target[2] and not current[2]:
+            steps.append(lambda: self.controller.suspend(pid))
+        for step in steps:
+            try:
+                step()
+            except ProcessLookupError:
+                break
+            except OSError as e:
+                # 失敗的步驟不重試，避免每次檢查都重複失敗；狀態仍視為已套用，
+                # 控制器保留恢復失敗的原本設定，再次加重時不會從已降低的數值繼續降低
+                state.failures += 1
+                logger.warning(f"調整行程 {pid} 為{LEVEL_LABELS[level]}失敗: {str(e)}")
+        state.level_time[_severity(state.level)] += now - state.since
+        state.since = now
+        state.level = level
+        state.transitions += 1
+
+    def level_of(self, pid: Optional[int]) -> str:
+        """回傳行程目前的節流程度"""
+        state = self._states.get(pid)
+        return state.level if state is not None else 'normal'
+
+    def summary(self, pid: Optional[int]) -> str:
+        """回傳行程的節流程度與距離上次活動的時間"""
+        state = self._states.get(pid)
+        if state is None:
+            return ""
+        idle = time.monotonic() - state.last_active
+        text = LEVEL_LABELS[state.level]
+        if idle >= 60:
+            text += f"，閒置 {int(idle // 60)} 分"
+        return text
+
+    def level_seconds(self, pid: int) -> Dict[str, float]:
+        """回傳行程在各節流程度累計的秒數，包含目前程度持續的時間"""
+        with self._lock:
+            state = self._states.get(pid)
+            if state is None:
+                return {}
+            seconds = dict(zip(THROTTLE_LEVELS, state.level_time))
+            seconds[state.level] += time.monotonic() - state.since
+            return seconds
+
+    def counts(self) -> Dict[str, int]:
+        """回傳各節流程度的行程數量"""
+        with self._lock:
+            result = dict.fromkeys(THROTTLE_LEVELS, 0)
+            for state in self._states.values():
+                result[state.level] += 1
+            return result
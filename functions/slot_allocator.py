@@ -0,0 +1,290 @@
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from functions.layout_engine import compute_cells
+
+
+class SlotAllocator:
+    """常駐的視窗格位配置器
+
+    依螢幕配置、視窗大小與排版方式建立格位，以佔用位元圖與空閒堆疊在常數
+    時間內配置與回收格位；只有螢幕配置、格位大小或排版方式改變時才需要
+    重建。格位矩形由 layout_engine 一次計算，依排版方式不同，格位大小可能
+    與視窗大小不同。
+    """
+
+    def __init__(self):
+        self._key: Optional[Tuple] = None
+        self.cell_width = 0
+        self.cell_height = 0
+        self._xs = array('i')
+        self._ys = array('i')
+        self._widths = array('i')
+        self._heights = array('i')
+        self._monitors = array('i')
+        self._occupied = bytearray()
+        self._free: List[int] = []
+        self._cell_index: Dict[Tuple[int, int], int] = {}
+        self._journal: Optional[List[Tuple[str, int, int]]] = None
+        self.free_count = 0
+
+    def configure(self, screens: List[Dict], cell_width: int, cell_height: int, strategy: str = 'grid',
+                  rows: int = 0, columns: int = 0, count: int = 0) -> bool:
+        """設定螢幕、格位大小與排版方式，配置改變時重建格位並回傳 True
+
+        count 只有 fit 排版使用，為要放入的視窗數量。
+        """
+        key = _layout_key(screens, cell_width, cell_height, strategy, rows, columns, count)
+        if key == self._key:
+            return False
+        self._key = key
+        self._journal = None
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        layout = compute_cells(screens, strategy, cell_width, cell_height, rows, columns, count)
+        self._xs, self._ys, self._widths, self._heights, self._monitors = (
+            _as_array(column) for column in (layout.xs, layout.ys, layout.widths, layout.heights, layout.monitors))
+        self._cell_index = dict(zip(zip(self._xs, self._ys), range(len(self._xs))))
+        if len(self._cell_index) < len(self._xs):
+            self._drop_duplicates()
+        self._occupied = bytearray(len(self._xs))
+        # 反向放入堆疊，讓 pop 依螢幕、列、欄的順序取出
+        self._free = list(range(len(self._xs) - 1, -1, -1))
+        self.free_count = len(self._xs)
+        return True
+
+    def is_configured(self, screens: List[Dict], cell_width: int, cell_height: int, strategy: str = 'grid',
+                      rows: int = 0, columns: int = 0, count: int = 0) -> bool:
+        """檢查格位是否已依相同的螢幕配置、格位大小與排版方式建立"""
+        return _layout_key(screens, cell_width, cell_height, strategy, rows, columns, count) == self._key
+
+    def reset(self) -> None:
+        """清除所有格位，下次 configure 時一定重建"""
+        self.configure([], self.cell_width or 1, self.cell_height or 1)
+        self._key = None
+
+    @property
+    def capacity(self) -> int:
+        """格位總數"""
+        return len(self._xs)
+
+    def allocate(self) -> Optional[Tuple[int, int]]:
+        """取得一個空閒格位，沒有空位時回傳 None"""
+        while self._free:
+            cell = self._free.pop()
+            # 透過 claim 指定佔用的格位仍留在堆疊中，取出時略過
+            if not self._occupied[cell]:
+                self._occupied[cell] = 1
+                self.free_count -= 1
+                if self._journal is not None:
+                    self._journal.append(('allocate', self._xs[cell], self._ys[cell]))
+                return self._xs[cell], self._ys[cell]
+        return None
+
+    def claim(self, x: int, y: int) -> bool:
+        """佔用指定位置的格位，位置不是空閒格位時回傳 False"""
+        cell = self._cell_index.get((x, y))
+        if cell is None or self._occupied[cell]:
+            return False
+        self._occupied[cell] = 1
+        self.free_count -= 1
+        if self._journal is not None:
+            self._journal.append(('claim', x, y))
+        return True
+
+    def claim_all(self, positions: Iterable[Tuple[int, int]]) -> None:
+        """佔用多個指定位置"""
+        for x, y in positions:
+            self.claim(x, y)
+
+    def release(self, x: int, y: int) -> bool:
+        """歸還指定位置的格位"""
+        cell = self._cell_index.get((x, y))
+        if cell is None or not self._occupied[cell]:
+            return False
+        self._occupied[cell] = 0
+        self._free.append(cell)
+        self.free_count += 1
+        if self._journal is not None:
+            self._journal.append(('release', x, y))
+        if len(self._free) > 2 * len(self._xs):
+            self._compact()
+        return True
+
+    def _drop_duplicates(self) -> None:
+        """重疊的螢幕（例如鏡像顯示）產生相同位置的格位時只保留第一個"""
+        keep = []
+        seen = set()
+        for cell, position in enumerate(zip(self._xs, self._ys)):
+            if position not in seen:
+                seen.add(position)
+                keep.append(cell)
+        self._xs, self._ys, self._widths, self._heights, self._monitors = (
+            array('i', (column[cell] for cell in keep))
+            for column in (self._xs, self._ys, self._widths, self._heights, self._monitors))
+        self._cell_index = {position: cell for cell, position in enumerate(zip(self._xs, self._ys))}
+
+    def _compact(self) -> None:
+        """移除堆疊中已被佔用的過期項目"""
+        self._free = [cell for cell in range(len(self._xs) - 1, -1, -1) if not self._occupied[cell]]
+
+    def begin(self) -> None:
+        """開始記錄變更，之後可用 rollback 還原"""
+        self._journal = []
+
+    def commit(self) -> None:
+        """保留自 begin 以來的變更"""
+        self._journal = None
+
+    def rollback(self) -> None:
+        """依相反順序還原自 begin 以來的變更"""
+        journal, self._journal = self._journal, None
+        for operation, x, y in reversed(journal or ()):
+            if operation == 'release':
+                self.claim(x, y)
+            else:
+                self.release(x, y)
+
+    def is_free(self, x: int, y: int) -> bool:
+        """檢查指定位置是否為空閒格位"""
+        cell = self._cell_index.get((x, y))
+        return cell is not None and not self._occupied[cell]
+
+    def monitor_of(self, x: int, y: int) -> Optional[int]:
+        """回傳格位所在的螢幕索引"""
+        cell = self._cell_index.get((x, y))
+        return self._monitors[cell] if cell is not None else None
+
+    def cell_size(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """回傳格位的寬高，位置不是格位時回傳 None"""
+        cell = self._cell_index.get((x, y))
+        return (self._widths[cell], self._heights[cell]) if cell is not None else None
+
+    def last_cell(self) -> Optional[Tuple[int, int]]:
+        """回傳排列順序中最後一個格位"""
+        if not self._xs:
+            return None
+        return self._xs[-1], self._ys[-1]
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """依配置順序回傳所有格位的位置"""
+        return list(zip(self._xs, self._ys))
+
+
+class PageAllocator:
+    """溢出視窗的虛擬分頁格位
+
+    第 0 頁是螢幕上的格位，由 SlotAllocator 管理；放不下的視窗依序放到第
+    1 頁之後，每頁使用與第 0 頁相同的格位。每頁以最小堆積保存空閒格位，
+    配置時取有空位的最前面一頁中最前面的格位，關閉視窗空出的格位會先被
+    補上，頁數不會無限增加。
+    """
+
+    def __init__(self):
+        self._cells: List[Tuple[int, int]] = []
+        self._cell_index: Dict[Tuple[int, int], int] = {}
+        # {頁碼: 空閒格位的最小堆積}，透過 claim 佔用的格位仍留在堆積中，取出時略過
+        self._free: Dict[int, List[int]] = {}
+        self._occupied: Dict[int, Set[int]] = {}
+        self._journal: Optional[List[Tuple[str, int, int, int]]] = None
+
+    def configure(self, cells: List[Tuple[int, int]]) -> None:
+        """設定每頁的格位並清除所有佔用"""
+        self._cells = list(cells)
+        self._cell_index = {position: cell for cell, position in enumerate(self._cells)}
+        self._free = {}
+        self._occupied = {}
+        self._journal = None
+
+    @property
+    def page_size(self) -> int:
+        return len(self._cells)
+
+    def _page(self, page: int) -> Tuple[List[int], Set[int]]:
+        if page not in self._free:
+            # 遞增的序列本身就是合法的堆積
+            self._free[page] = list(range(len(self._cells)))
+            self._occupied[page] = set()
+        return self._free[page], self._occupied[page]
+
+    def allocate(self) -> Optional[Tuple[int, int, int]]:
+        """取得空閒格位並回傳 (頁碼, x, y)，沒有設定格位時回傳 None"""
+        if not self._cells:
+            return None
+        page = 1
+        while True:
+            heap, occupied = self._page(page)
+            while heap:
+                cell = heapq.heappop(heap)
+                if cell not in occupied:
+                    occupied.add(cell)
+                    x, y = self._cells[cell]
+                    if self._journal is not None:
+                        self._journal.append(('allocate', page, x, y))
+                    return page, x, y
+            page += 1
+
+    def claim(self, page: int, x: int, y: int) -> bool:
+        """佔用指定頁面的格位，位置不是空閒格位時回傳 False"""
+        cell = self._cell_index.get((x, y))
+        if page < 1 or cell is None:
+            return False
+        _, occupied = self._page(page)
+        if cell in occupied:
+            return False
+        occupied.add(cell)
+        if self._journal is not None:
+            self._journal.append(('claim', page, x, y))
+        return True
+
+    def release(self, page: int, x: int, y: int) -> bool:
+        """歸還指定頁面的格位"""
+        cell = self._cell_index.get((x, y))
+        occupied = self._occupied.get(page)
+        if cell is None or occupied is None or cell not in occupied:
+            return False
+        occupied.remove(cell)
+        heap = self._free[page]
+        heapq.heappush(heap, cell)
+        if self._journal is not None:
+            self._journal.append(('release', page, x, y))
+        if len(heap) > 2 * len(self._cells):
+            self._free[page] = [c for c in range(len(self._cells)) if c not in occupied]
+        return True
+
+    def occupancy(self) -> Dict[int, int]:
+        """回傳每頁已佔用的格位數量"""
+        return {page: len(occupied) for page, occupied in self._occupied.items() if occupied}
+
+    def begin(self) -> None:
+        """開始記錄變更，之後可用 rollback 還原"""
+        self._journal = []
+
+    def commit(self) -> None:
+        """保留自 begin 以來的變更"""
+        self._journal = None
+
+    def rollback(self) -> None:
+        """依相反順序還原自 begin 以來的變更"""
+        journal, self._journal = self._journal, None
+        for operation, page, x, y in reversed(journal or ()):
+            if operation == 'release':
+                self.claim(page, x, y)
+            else:
+                self.release(page, x, y)
+
+
+def _layout_key(screens: List[Dict], cell_width: int, cell_height: int, strategy: str,
+                rows: int, columns: int, count: int) -> Tuple:
+    return (tuple((s['left'], s['top'], s['width'], s['height']) for s in screens), cell_width, cell_height,
+            strategy, rows, columns, count if strategy == 'fit' else 0)
+
+
+def _as_array(values) -> array:
+    """把排版結果轉成 array，NumPy 陣列直接複製記憶體內容"""
+    if isinstance(values, array):
+        return values
+    result = array('i')
+    result.frombytes(values.astype('int32').tobytes())
+    return result
@@ -0,0 +1,87 @@
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('Slot_Store')
+
+STORE_VERSION = 1
+
+
+class SlotRecord:
+    """一個已分配格位的視窗，以行程、啟動序號、執行檔與原始標題識別"""
+    __slots__ = ('pid', 'launch_index', 'executable', 'title', 'group', 'x', 'y', 'order', 'width', 'height', 'page')
+    FIELDS = __slots__
+
+    def __init__(self, pid: int, launch_index: Optional[int], executable: str, title: str, group: str,
+                 x: int, y: int, order: int, width: Optional[int] = None, height: Optional[int] = None,
+                 page: Optional[int] = None):
+        self.pid = pid
+        self.launch_index = launch_index
+        self.executable = executable
+        self.title = title
+        self.group = group
+        self.x = x
+        self.y = y
+        self.order = order
+        self.width = width
+        self.height = height
+        # 舊版檔案沒有頁碼欄位，讀入時為 None
+        self.page = page or 0
+
+    def as_row(self) -> List:
+        return [getattr(self, name) for name in self.FIELDS]
+
+
+class SlotStore:
+    """把格位分配保存到磁碟，程式重新啟動後可接回仍在執行的實例
+
+    檔案只保存一份欄位名稱，每個視窗一列值，另外保存各群組最近一次的排版
+    設定。內容與上次寫入相同時不寫檔；寫入先寫暫存檔再取代，中途中斷也
+    不會留下損壞的檔案。
+    """
+
+    def __init__(self, path: str = "slots.json"):
+        self.path = path
+        self._last_written: Optional[str] = None
+
+    def load(self) -> Tuple[Dict[str, Dict], List[SlotRecord]]:
+        """讀取各群組的排版設定與格位紀錄，檔案不存在或無效時回傳空內容"""
+        try:
+            if not os.path.exists(self.path):
+                return {}, []
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != STORE_VERSION:
+                logger.warning(f"格位檔版本不符，略過: {self.path}")
+                return {}, []
+            fields = data['fields']
+            records = []
+            for row in data['slots']:
+                values = dict(zip(fields, row))
+                records.append(SlotRecord(*(values.get(name) for name in SlotRecord.FIELDS)))
+            return data.get('layout', {}), records
+        except Exception as e:
+            logger.error(f"載入格位時發生錯誤: {str(e)}")
+            return {}, []
+
+    def save(self, layout_options: Dict[str, Dict], records: List[SlotRecord]) -> bool:
+        """寫入格位紀錄，內容未改變時不寫檔"""
+        try:
+            text = json.dumps({
+                'version': STORE_VERSION,
+                'layout': layout_options,
+                'fields': list(SlotRecord.FIELDS),
+                'slots': [record.as_row() for record in records]
+            }, ensure_ascii=False, separators=(',', ':'))
+            if text == self._last_written:
+                return True
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, self.path)
+            self._last_written = text
+            return True
+        except Exception as e:
+            logger.error(f"儲存格位時發生錯誤: {str(e)}")
+            return False
@@ -0,0 +1,125 @@
+import os
+import subprocess
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('Process_Supervisor')
+
+
+def default_popen(program_path: str):
+    """建立行程，執行檔直接建立以保留實際的行程 ID
+
+    Windows 上的捷徑、批次檔等無法直接建立行程，改由 cmd 的 start /wait
+    開啟：cmd 等到開啟的程式結束才離開，受監控的行程在程式執行期間保持存在。
+    這類實例的視窗屬於另一個行程，由啟動器依標題配對。
+    """
+    cwd = os.path.dirname(program_path) or None
+    if os.name == 'nt' and not program_path.lower().endswith('.exe'):
+        return subprocess.Popen(['cmd', '/c', 'start', '', '/wait', program_path], cwd=cwd,
+                                creationflags=subprocess.CREATE_NO_WINDOW)
+    return subprocess.Popen([program_path], cwd=cwd)
+
+
+class ManagedProcess:
+    """受監控的單一實例，launch_index 在重新啟動後保持不變"""
+    __slots__ = ('launch_index', 'program_path', 'process', 'pid', 'started',
+                 'restarts', 'crash_times', 'next_restart', 'failed')
+
+    def __init__(self, launch_index: int, program_path: str):
+        self.launch_index = launch_index
+        self.program_path = program_path
+        self.process = None
+        self.pid: Optional[int] = None
+        self.started = 0.0
+        self.restarts = 0
+        self.crash_times: List[float] = []
+        self.next_restart: Optional[float] = None
+        self.failed = False
+
+
+class ProcessSupervisor:
+    """監控啟動的行程，結束時以指數退避重新啟動
+
+    在 crash_window 秒內結束達 crash_limit 次視為崩潰迴圈並停止重新啟動。
+    """
+
+    def __init__(self, popen: Callable[[str], object] = default_popen, base_delay: float = 1.0,
+                 max_delay: float = 60.0, crash_limit: int = 5, crash_window: float = 300.0):
+        self.popen = popen
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.crash_limit = crash_limit
+        self.crash_window = crash_window
+        self.enabled = False
+        self.processes: Dict[int, ManagedProcess] = {}
+        self.by_pid: Dict[int, ManagedProcess] = {}
+        self._next_index = 0
+
+    def spawn(self, program_path: str) -> int:
+        """啟動新的實例並回傳其行程 ID"""
+        managed = ManagedProcess(self._next_index, program_path)
+        self._next_index += 1
+        self.processes[managed.launch_index] = managed
+        self._start(managed)
+        return managed.pid
+
+    def _start(self, managed: ManagedProcess) -> None:
+        managed.process = self.popen(managed.program_path)
+        managed.pid = managed.process.pid
+        managed.started = time.monotonic()
+        managed.next_restart = None
+        self.by_pid[managed.pid] = managed
+
+    def terminate(self, pid: int) -> bool:
+        """強制結束受監控的行程，之後由 poll 依設定重新啟動"""
+        managed = self.by_pid.get(pid)
+        if managed is None or managed.process is None:
+            return False
+        try:
+            managed.process.kill()
+        except Exception as e:
+            logger.error(f"結束行程 {pid} 失敗: {str(e)}")
+            return False
+        logger.info(f"已結束實例 {managed.launch_index + 1} (PID {pid})")
+        return True
+
+    def poll(self) -> List[Tuple[str, ManagedProcess, int]]:
+        """檢查所有行程，回傳 ('exit' | 'restart' | 'gave_up', 實例, 原行程 ID) 事件"""
+        events = []
+        now = time.monotonic()
+        for managed in list(self.processes.values()):
+            if managed.process is not None:
+                if managed.process.poll() is None:
+                    continue
+                old_pid = managed.pid
+                managed.process = None
+                self.by_pid.pop(old_pid, None)
+                events.append(('exit', managed, old_pid))
+                if not self.enabled:
+                    del self.processes[managed.launch_index]
+                    continue
+                managed.crash_times = [t for t in managed.crash_times if now - t <= self.crash_window]
+                managed.crash_times.append(now)
+                if len(managed.crash_times) >= self.crash_limit:
+                    managed.failed = True
+                    del self.processes[managed.launch_index]
+                    logger.error(f"實例 {managed.launch_index + 1} 在 {self.crash_window:.0f} 秒內結束 "
+                                 f"{len(managed.crash_times)} 次，停止重新啟動")
+                    events.append(('gave_up', managed, old_pid))
+                    continue
+                delay = min(self.max_delay, self.base_delay * 2 ** (len(managed.crash_times) - 1))
+                managed.next_restart = now + delay
+                logger.warning(f"實例 {managed.launch_index + 1} (PID {old_pid}) 已結束，{delay:.1f} 秒後重新啟動")
+            elif managed.next_restart is not None and now >= managed.next_restart:
+                old_pid = managed.pid
+                try:
+                    self._start(managed)
+                except Exception as e:
+                    logger.error(f"重新啟動實例 {managed.launch_index + 1} 失敗: {str(e)}")
+                    managed.next_restart = now + self.max_delay
+                    continue
+                managed.restarts += 1
+                logger.info(f"實例 {managed.launch_index + 1} 已重新啟動，PID {managed.pid}")
+                events.append(('restart', managed, old_pid))
+        return events
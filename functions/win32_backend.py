@@ -0,0 +1,297 @@
+import os
+import ctypes
+import ctypes.wintypes
+import time
+import logging
+import win32gui
+import win32con
+import win32api
+import win32process
+from typing import Callable, Dict, List, Optional, Tuple
+
+from functions.window_backend import WindowBackend, WindowMove
+
+logger = logging.getLogger('Win32_Backend')
+
+user32 = ctypes.windll.user32
+kernel32 = ctypes.windll.kernel32
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+GA_ROOT = 2
+WM_NULL = 0x0000
+WM_GETTEXT = 0x000D
+WM_GETTEXTLENGTH = 0x000E
+SMTO_ABORTIFHUNG = 0x0002
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+DISPLAY_WATCHER_CLASS = 'WindowManagerDisplayWatcher'
+
+EVENT_NAMES = {
+    EVENT_SYSTEM_FOREGROUND: 'foreground',
+    EVENT_OBJECT_CREATE: 'create',
+    EVENT_OBJECT_DESTROY: 'destroy',
+    EVENT_OBJECT_SHOW: 'show',
+    EVENT_OBJECT_HIDE: 'hide',
+    EVENT_OBJECT_LOCATIONCHANGE: 'location',
+    EVENT_OBJECT_NAMECHANGE: 'name',
+}
+
+WinEventProc = ctypes.WINFUNCTYPE(
+    None, ctypes.wintypes.HANDLE, ctypes.wintypes.DWORD, ctypes.wintypes.HWND,
+    ctypes.wintypes.LONG, ctypes.wintypes.LONG, ctypes.wintypes.DWORD, ctypes.wintypes.DWORD
+)
+user32.SetWinEventHook.restype = ctypes.wintypes.HANDLE
+user32.SetWinEventHook.argtypes = [
+    ctypes.wintypes.DWORD, ctypes.wintypes.DWORD, ctypes.wintypes.HMODULE, WinEventProc,
+    ctypes.wintypes.DWORD, ctypes.wintypes.DWORD, ctypes.wintypes.DWORD
+]
+user32.UnhookWinEvent.argtypes = [ctypes.wintypes.HANDLE]
+user32.BeginDeferWindowPos.restype = ctypes.wintypes.HANDLE
+user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+user32.DeferWindowPos.restype = ctypes.wintypes.HANDLE
+user32.DeferWindowPos.argtypes = [
+    ctypes.wintypes.HANDLE, ctypes.wintypes.HWND, ctypes.wintypes.HWND,
+    ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.wintypes.UINT
+]
+user32.EndDeferWindowPos.restype = ctypes.wintypes.BOOL
+user32.EndDeferWindowPos.argtypes = [ctypes.wintypes.HANDLE]
+user32.GetAncestor.restype = ctypes.wintypes.HWND
+user32.GetAncestor.argtypes = [ctypes.wintypes.HWND, ctypes.wintypes.UINT]
+kernel32.OpenProcess.restype = ctypes.wintypes.HANDLE
+kernel32.QueryFullProcessImageNameW.argtypes = [
+    ctypes.wintypes.HANDLE, ctypes.wintypes.DWORD, ctypes.wintypes.LPWSTR, ctypes.POINTER(ctypes.wintypes.DWORD)
+]
+user32.InternalGetWindowText.restype = ctypes.c_int
+user32.InternalGetWindowText.argtypes = [ctypes.wintypes.HWND, ctypes.wintypes.LPWSTR, ctypes.c_int]
+user32.ShowWindowAsync.restype = ctypes.wintypes.BOOL
+user32.ShowWindowAsync.argtypes = [ctypes.wintypes.HWND, ctypes.c_int]
+user32.IsHungAppWindow.restype = ctypes.wintypes.BOOL
+user32.IsHungAppWindow.argtypes = [ctypes.wintypes.HWND]
+user32.SendMessageTimeoutW.restype = ctypes.wintypes.LPARAM
+user32.SendMessageTimeoutW.argtypes = [
+    ctypes.wintypes.HWND, ctypes.wintypes.UINT, ctypes.wintypes.WPARAM, ctypes.wintypes.LPARAM,
+    ctypes.wintypes.UINT, ctypes.wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)
+]
+
+
+class Win32Backend(WindowBackend):
+    """以 pywin32 實作的 Windows 視窗後端"""
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._hook = None
+        self._foreground_hook = None
+        self._hook_proc = None
+        self._display_window = None
+
+    def enum_windows(self) -> List[int]:
+        hwnds = []
+        win32gui.EnumWindows(lambda hwnd, results: results.append(hwnd), hwnds)
+        return hwnds
+
+    def is_window(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindow(hwnd))
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindowVisible(hwnd))
+
+    def get_window_text(self, hwnd: int) -> str:
+        return win32gui.GetWindowText(hwnd)
+
+    def get_window_text_timeout(self, hwnd: int, timeout: float) -> Optional[str]:
+        # InternalGetWindowText 直接讀取系統保存的標題，不會送訊息給目標視窗
+        buffer = ctypes.create_unicode_buffer(512)
+        length = user32.InternalGetWindowText(hwnd, buffer, len(buffer))
+        if length:
+            return buffer.value
+        if not user32.IsWindow(hwnd):
+            return None
+        # 自行繪製標題的視窗沒有系統標題，改以有逾時的 WM_GETTEXT 讀取
+        timeout_ms = max(1, int(timeout * 1000))
+        result = ctypes.c_size_t()
+        if not user32.SendMessageTimeoutW(hwnd, WM_GETTEXTLENGTH, 0, 0, SMTO_ABORTIFHUNG,
+                                          timeout_ms, ctypes.byref(result)):
+            return None
+        if not result.value:
+            return ''
+        buffer = ctypes.create_unicode_buffer(result.value + 1)
+        if not user32.SendMessageTimeoutW(hwnd, WM_GETTEXT, len(buffer), ctypes.addressof(buffer),
+                                          SMTO_ABORTIFHUNG, timeout_ms, ctypes.byref(result)):
+            return None
+        return buffer.value
+
+    def set_window_text(self, hwnd: int, title: str) -> None:
+        win32gui.SetWindowText(hwnd, title)
+
+    def get_window_rect(self, hwnd: int) -> Tuple[int, int, int, int]:
+        return win32gui.GetWindowRect(hwnd)
+
+    def get_window_style(self, hwnd: int) -> int:
+        return win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+
+    def set_window_style(self, hwnd: int, style: int) -> None:
+        win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
+
+    def set_window_pos(self, hwnd: int, x: int, y: int, width: int, height: int, flags: int) -> None:
+        win32gui.SetWindowPos(hwnd, None, x, y, width, height, flags)
+
+    def show_window_async(self, hwnd: int, command: int) -> None:
+        # 只把訊息放入目標執行緒的佇列，無回應的視窗也不會卡住呼叫端
+        if not user32.ShowWindowAsync(hwnd, command) and not win32gui.IsWindow(hwnd):
+            raise ValueError(f"無效的視窗控制代碼: {hwnd}")
+
+    def get_monitors(self) -> List[Dict]:
+        screens = []
+        # 逐一列舉所有螢幕，使用扣除工作列後的工作區
+        for hmonitor, _, _ in win32api.EnumDisplayMonitors(None, None):
+            info = win32api.GetMonitorInfo(hmonitor)
+            left, top, right, bottom = info['Work']
+            screens.append({
+                'left': left,
+                'top': top,
+                'width': right - left,
+                'height': bottom - top,
+                'primary': bool(info['Flags'] & win32con.MONITORINFOF_PRIMARY),
+                'device': info['Device']
+            })
+        return screens
+
+    def get_window_pid(self, hwnd: int) -> int:
+        return win32process.GetWindowThreadProcessId(hwnd)[1]
+
+    def is_hung(self, hwnd: int) -> bool:
+        return bool(user32.IsHungAppWindow(hwnd))
+
+    def get_foreground_window(self) -> int:
+        return win32gui.GetForegroundWindow() or 0
+
+    def probe_window(self, hwnd: int, timeout: float) -> Optional[float]:
+        result = ctypes.c_size_t()
+        started = time.perf_counter()
+        # 已被判定無回應的視窗立即返回，不等到逾時
+        if not user32.SendMessageTimeoutW(hwnd, WM_NULL, 0, 0, SMTO_ABORTIFHUNG,
+                                          max(1, int(timeout * 1000)), ctypes.byref(result)):
+            return None
+        return time.perf_counter() - started
+
+    def get_class_name(self, hwnd: int) -> str:
+        return win32gui.GetClassName(hwnd)
+
+    def get_process_name(self, pid: int) -> str:
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ''
+        try:
+            buffer = ctypes.create_unicode_buffer(1024)
+            size = ctypes.wintypes.DWORD(len(buffer))
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return ''
+            return os.path.basename(buffer.value)
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def batch_set_window_pos(self, moves: List[WindowMove]) -> List[int]:
+        failed = [move[0] for move in moves if not win32gui.IsWindow(move[0])]
+        invalid = set(failed)
+        pending = [move for move in moves if move[0] not in invalid]
+        if not pending:
+            return failed
+        hdwp = user32.BeginDeferWindowPos(len(pending))
+        for hwnd, x, y, width, height, flags in pending:
+            if not hdwp:
+                break
+            # DeferWindowPos 失敗時系統會釋放整個 HDWP
+            hdwp = user32.DeferWindowPos(hdwp, hwnd, None, x, y, width, height, flags)
+        if hdwp and user32.EndDeferWindowPos(hdwp):
+            return failed
+        logger.warning("延遲提交失敗，改為逐一移動視窗")
+        return failed + WindowBackend.batch_set_window_pos(self, pending)
+
+    def subscribe_events(self, callback: Callable[[str, int], None]) -> bool:
+        # 事件以 out-of-context 方式投遞到設定 hook 的執行緒，需在有訊息迴圈的 UI 執行緒呼叫
+        if self._hook is None:
+            self._hook_proc = WinEventProc(self._on_win_event)
+            self._hook = user32.SetWinEventHook(
+                EVENT_OBJECT_CREATE, EVENT_OBJECT_NAMECHANGE, None, self._hook_proc,
+                0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+            )
+            if not self._hook:
+                self._hook_proc = None
+                return False
+            # 前景切換不在物件事件的範圍內，另外設定一個 hook，失敗時只是少了這個事件
+            self._foreground_hook = user32.SetWinEventHook(
+                EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None, self._hook_proc,
+                0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+            ) or None
+            # 顯示設定改變沒有對應的 WinEvent，另外建立隱藏視窗接收廣播，失敗時只是少了這個事件
+            self._display_window = self._create_display_window()
+        self._listeners.append(callback)
+        return True
+
+    def unsubscribe_events(self, callback: Callable[[str, int], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+        if not self._listeners and self._hook is not None:
+            user32.UnhookWinEvent(self._hook)
+            if self._foreground_hook is not None:
+                user32.UnhookWinEvent(self._foreground_hook)
+                self._foreground_hook = None
+            if self._display_window is not None:
+                win32gui.DestroyWindow(self._display_window)
+                self._display_window = None
+            self._hook = None
+            self._hook_proc = None
+
+    def _create_display_window(self) -> Optional[int]:
+        """建立接收 WM_DISPLAYCHANGE 的隱藏頂層視窗，僅限訊息的視窗收不到廣播訊息"""
+        try:
+            instance = win32api.GetModuleHandle(None)
+            window_class = win32gui.WNDCLASS()
+            window_class.hInstance = instance
+            window_class.lpszClassName = DISPLAY_WATCHER_CLASS
+            window_class.lpfnWndProc = {
+                win32con.WM_DISPLAYCHANGE: self._on_display_message,
+                win32con.WM_SETTINGCHANGE: self._on_display_message,
+            }
+            try:
+                win32gui.RegisterClass(window_class)
+            except win32gui.error:
+                # 視窗類別已經註冊過，只是重新建立視窗
+                win32gui.UnregisterClass(DISPLAY_WATCHER_CLASS, instance)
+                win32gui.RegisterClass(window_class)
+            return win32gui.CreateWindow(DISPLAY_WATCHER_CLASS, '', 0, 0, 0, 0, 0, 0, 0, instance, None)
+        except Exception as e:
+            logger.error(f"建立顯示設定監看視窗時發生錯誤: {str(e)}")
+            return None
+
+    def _on_display_message(self, hwnd, message, wparam, lparam):
+        # 工作列移動或改變大小時只會送出 SPI_SETWORKAREA 的 WM_SETTINGCHANGE
+        if message == win32con.WM_DISPLAYCHANGE or wparam == win32con.SPI_SETWORKAREA:
+            for callback in list(self._listeners):
+                try:
+                    callback('display', 0)
+                except Exception as e:
+                    logger.error(f"處理顯示設定事件時發生錯誤: {str(e)}")
+        return 0
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        name = EVENT_NAMES.get(event)
+        if name is None or not hwnd or id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+            return
+        # 只轉發頂層視窗的事件，已關閉的視窗無法再判斷因此直接轉發
+        if name != 'destroy' and user32.GetAncestor(hwnd, GA_ROOT) != hwnd:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(name, hwnd)
+            except Exception as e:
+                logger.error(f"處理視窗事件時發生錯誤: {str(e)}")
@@ -0,0 +1,445 @@
+import sys
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('Window_Backend')
+
+# 與 win32con 相同數值的樣式/旗標常數，讓邏輯層不必直接依賴 win32con
+GWL_STYLE = -16
+WS_CAPTION = 0x00C00000
+WS_THICKFRAME = 0x00040000
+WS_VISIBLE = 0x10000000
+WS_OVERLAPPEDWINDOW = 0x00CF0000
+
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+SWP_FRAMECHANGED = 0x0020
+SWP_SHOWWINDOW = 0x0040
+SWP_HIDEWINDOW = 0x0080
+SWP_ASYNCWINDOWPOS = 0x4000
+
+SW_SHOWNOACTIVATE = 4
+SW_SHOWMINNOACTIVE = 7
+
+# (hwnd, x, y, width, height, flags)
+WindowMove = Tuple[int, int, int, int, int, int]
+
+
+class WindowBackend:
+    """視窗系統後端介面，所有視窗操作都經由此介面進行"""
+
+    def enum_windows(self) -> List[int]:
+        """列舉所有頂層視窗"""
+        raise NotImplementedError
+
+    def is_window(self, hwnd: int) -> bool:
+        """檢查視窗控制代碼是否有效"""
+        raise NotImplementedError
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        """檢查視窗是否可見"""
+        raise NotImplementedError
+
+    def get_window_text(self, hwnd: int) -> str:
+        """獲取視窗標題"""
+        raise NotImplementedError
+
+    def get_window_text_timeout(self, hwnd: int, timeout: float) -> Optional[str]:
+        """在 timeout 秒內讀取視窗標題，不會因目標視窗無回應而卡住，讀不到時回傳 None
+
+        預設直接呼叫 get_window_text，讀取可能等待目標視窗的後端應覆寫此方法。
+        """
+        return self.get_window_text(hwnd)
+
+    def set_window_text(self, hwnd: int, title: str) -> None:
+        """設定視窗標題"""
+        raise NotImplementedError
+
+    def get_window_rect(self, hwnd: int) -> Tuple[int, int, int, int]:
+        """獲取視窗矩形 (left, top, right, bottom)"""
+        raise NotImplementedError
+
+    def get_window_style(self, hwnd: int) -> int:
+        """獲取視窗樣式"""
+        raise NotImplementedError
+
+    def set_window_style(self, hwnd: int, style: int) -> None:
+        """設定視窗樣式"""
+        raise NotImplementedError
+
+    def set_window_pos(self, hwnd: int, x: int, y: int, width: int, height: int, flags: int) -> None:
+        """設定視窗位置與大小"""
+        raise NotImplementedError
+
+    def get_monitors(self) -> List[Dict]:
+        """獲取所有螢幕的資訊"""
+        raise NotImplementedError
+
+    def get_window_pid(self, hwnd: int) -> int:
+        """獲取視窗所屬的行程 ID"""
+        raise NotImplementedError
+
+    def get_class_name(self, hwnd: int) -> str:
+        """獲取視窗類別名稱"""
+        raise NotImplementedError
+
+    def get_process_name(self, pid: int) -> str:
+        """獲取行程的執行檔名稱"""
+        raise NotImplementedError
+
+    def show_window_async(self, hwnd: int, command: int) -> None:
+        """以非同步方式改變視窗顯示狀態（最小化、還原），不等待目標視窗處理"""
+        raise NotImplementedError
+
+    def batch_set_window_pos(self, moves: List[WindowMove]) -> List[int]:
+        """在單次提交中移動多個視窗，回傳失敗的視窗控制代碼
+
+        預設逐一呼叫 set_window_pos，支援延遲提交的後端應覆寫此方法。
+        """
+        failed = []
+        for hwnd, x, y, width, height, flags in moves:
+            try:
+                self.set_window_pos(hwnd, x, y, width, height, flags)
+            except Exception:
+                failed.append(hwnd)
+        return failed
+
+    def is_hung(self, hwnd: int) -> bool:
+        """檢查視窗是否已被系統判定為無回應，不會等待目標視窗"""
+        return False
+
+    def get_foreground_window(self) -> int:
+        """獲取目前接收使用者輸入的視窗，沒有時回傳 0"""
+        return 0
+
+    def probe_window(self, hwnd: int, timeout: float) -> Optional[float]:
+        """送出空訊息並等待目標視窗處理，回傳往返秒數，逾時或失敗時回傳 None"""
+        started = time.perf_counter()
+        return time.perf_counter() - started if self.is_window(hwnd) else None
+
+    def subscribe_events(self, callback: Callable[[str, int], None]) -> bool:
+        """訂閱頂層視窗事件，不支援時回傳 False
+
+        callback 會收到事件名稱 ('create', 'destroy', 'show', 'hide', 'name',
+        'location', 'foreground') 與視窗控制代碼；顯示設定改變時送出 ('display', 0)。
+        """
+        return False
+
+    def unsubscribe_events(self, callback: Callable[[str, int], None]) -> None:
+        """取消訂閱視窗事件"""
+
+
+class SimulatedWindow:
+    """模擬桌面上的單一視窗"""
+    __slots__ = ('title', 'x', 'y', 'width', 'height', 'style', 'visible', 'pid', 'class_name', 'hung', 'posted',
+                 'minimized')
+
+    def __init__(self, title: str, x: int, y: int, width: int, height: int,
+                 style: int, visible: bool, pid: int, class_name: str):
+        self.title = title
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.style = style
+        self.visible = visible
+        self.pid = pid
+        self.class_name = class_name
+        self.hung = False
+        # 無回應期間以 SWP_ASYNCWINDOWPOS 送出、尚未處理的移動
+        self.posted: List[Tuple[int, int, int, int, int]] = []
+        self.minimized = False
+
+
+class SimulatedProcess:
+    """模擬行程的控制代碼，介面與 subprocess.Popen 的 pid、poll、kill 相同"""
+    __slots__ = ('backend', 'pid')
+
+    def __init__(self, backend: 'SimulatedBackend', pid: int):
+        self.backend = backend
+        self.pid = pid
+
+    def poll(self) -> Optional[int]:
+        return None if self.pid in self.backend.processes else 1
+
+    def kill(self) -> None:
+        self.backend.kill_process(self.pid)
+
+
+class SimulatedBackend(WindowBackend):
+    """記憶體內的模擬桌面，可容納大量假視窗與螢幕，供非 Windows 環境測試與效能分析
+
+    無回應的視窗會讓 get_window_text、set_window_style 與同步的移動等待
+    hang_time 秒，模擬送訊息給卡住的執行緒；SWP_ASYNCWINDOWPOS 的移動則
+    立即返回，待視窗恢復回應後才生效。
+    """
+
+    def __init__(self, monitors: Optional[List[Dict]] = None, hang_time: float = 0.5):
+        self.windows: Dict[int, SimulatedWindow] = {}
+        self.monitors: List[Dict] = [dict(m) for m in monitors] if monitors else [
+            {'left': 0, 'top': 0, 'width': 1920, 'height': 1080}
+        ]
+        self.call_counts: Dict[str, int] = {}
+        self.hang_time = hang_time
+        self.processes = set()
+        self.process_names: Dict[int, str] = {}
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._next_hwnd = 0x10000
+        self._next_pid = 1000
+        self.foreground = 0
+
+    def _count(self, name: str) -> None:
+        self.call_counts[name] = self.call_counts.get(name, 0) + 1
+
+    def reset_counts(self) -> None:
+        """清除呼叫次數統計"""
+        self.call_counts.clear()
+
+    def _emit(self, event: str, hwnd: int) -> None:
+        for callback in list(self._listeners):
+            callback(event, hwnd)
+
+    # 模擬桌面操作
+    def create_window(self, title: str, x: int = 0, y: int = 0, width: int = 640, height: int = 480,
+                      style: int = WS_OVERLAPPEDWINDOW | WS_VISIBLE, visible: bool = True,
+                      pid: Optional[int] = None, class_name: str = 'SimulatedWindow',
+                      process_name: str = 'simulated.exe') -> int:
+        """在模擬桌面上建立視窗並回傳其控制代碼"""
+        hwnd = self._next_hwnd
+        self._next_hwnd += 4
+        if pid is None:
+            pid = self._next_pid
+            self._next_pid += 4
+        self.process_names.setdefault(pid, process_name)
+        self.windows[hwnd] = SimulatedWindow(title, x, y, width, height, style, visible, pid, class_name)
+        self._emit('create', hwnd)
+        return hwnd
+
+    def create_windows(self, title: str, count: int, **kwargs) -> List[int]:
+        """一次建立多個相同標題的視窗"""
+        return [self.create_window(title, **kwargs) for _ in range(count)]
+
+    def spawn_process(self, title: str, delay: float = 0.0, **kwargs) -> int:
+        """模擬啟動程式：回傳行程 ID，並在 delay 秒後建立其視窗"""
+        pid = self._next_pid
+        self._next_pid += 4
+        self.processes.add(pid)
+        if delay > 0:
+            timer = threading.Timer(delay, self.create_window, args=(title,), kwargs=dict(kwargs, pid=pid))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.create_window(title, pid=pid, **kwargs)
+        return pid
+
+    def popen(self, title: str, delay: float = 0.0, **kwargs) -> SimulatedProcess:
+        """模擬直接建立行程，回傳可檢查是否結束的控制代碼"""
+        return SimulatedProcess(self, self.spawn_process(title, delay, **kwargs))
+
+    def kill_process(self, pid: int) -> None:
+        """模擬行程結束，關閉其所有視窗"""
+        self.processes.discard(pid)
+        for hwnd in [hwnd for hwnd, window in self.windows.items() if window.pid == pid]:
+            self.destroy_window(hwnd)
+
+    def destroy_window(self, hwnd: int) -> None:
+        """關閉模擬視窗"""
+        if self.windows.pop(hwnd, None) is not None:
+            self._emit('destroy', hwnd)
+
+    def rename_window(self, hwnd: int, title: str) -> None:
+        """模擬程式自行變更視窗標題"""
+        self._get(hwnd).title = title
+        self._emit('name', hwnd)
+
+    def set_window_visible(self, hwnd: int, visible: bool) -> None:
+        """顯示或隱藏模擬視窗"""
+        self._get(hwnd).visible = visible
+        self._emit('show' if visible else 'hide', hwnd)
+
+    def set_window_hung(self, hwnd: int, hung: bool) -> None:
+        """模擬視窗停止或恢復處理訊息"""
+        window = self._get(hwnd)
+        window.hung = hung
+        if not hung:
+            posted, window.posted = window.posted, []
+            for x, y, width, height, flags in posted:
+                self._move(hwnd, window, x, y, width, height, flags)
+
+    def add_monitor(self, left: int, top: int, width: int, height: int) -> None:
+        """新增一個模擬螢幕"""
+        self.monitors.append({'left': left, 'top': top, 'width': width, 'height': height})
+        self._emit('display', 0)
+
+    def set_monitors(self, monitors: List[Dict]) -> None:
+        """替換整組模擬螢幕"""
+        self.monitors = [dict(m) for m in monitors]
+        self._emit('display', 0)
+
+    # WindowBackend 介面
+    def enum_windows(self) -> List[int]:
+        self._count('enum_windows')
+        return list(self.windows)
+
+    def is_window(self, hwnd: int) -> bool:
+        self._count('is_window')
+        return hwnd in self.windows
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        self._count('is_window_visible')
+        window = self.windows.get(hwnd)
+        return window is not None and window.visible
+
+    def get_window_text(self, hwnd: int) -> str:
+        self._count('get_window_text')
+        window = self.windows.get(hwnd)
+        if window is not None and window.hung:
+            time.sleep(self.hang_time)
+        return window.title if window is not None else ''
+
+    def get_window_text_timeout(self, hwnd: int, timeout: float) -> Optional[str]:
+        self._count('get_window_text_timeout')
+        window = self.windows.get(hwnd)
+        # 與 SMTO_ABORTIFHUNG 相同，無回應的視窗立即放棄
+        if window is None or window.hung:
+            return None
+        return window.title
+
+    def set_window_text(self, hwnd: int, title: str) -> None:
+        self._count('set_window_text')
+        self._get(hwnd).title = title
+        self._emit('name', hwnd)
+
+    def get_window_rect(self, hwnd: int) -> Tuple[int, int, int, int]:
+        self._count('get_window_rect')
+        window = self._get(hwnd)
+        return window.x, window.y, window.x + window.width, window.y + window.height
+
+    def get_window_style(self, hwnd: int) -> int:
+        self._count('get_window_style')
+        return self._get(hwnd).style
+
+    def set_window_style(self, hwnd: int, style: int) -> None:
+        self._count('set_window_style')
+        window = self._get(hwnd)
+        if window.hung:
+            time.sleep(self.hang_time)
+        window.style = style
+
+    def set_window_pos(self, hwnd: int, x: int, y: int, width: int, height: int, flags: int) -> None:
+        self._count('set_window_pos')
+        window = self._get(hwnd)
+        if window.hung:
+            if flags & SWP_ASYNCWINDOWPOS:
+                window.posted.append((x, y, width, height, flags))
+                return
+            time.sleep(self.hang_time)
+        self._move(hwnd, window, x, y, width, height, flags)
+
+    def _move(self, hwnd: int, window: SimulatedWindow, x: int, y: int, width: int, height: int, flags: int) -> None:
+        if not flags & SWP_NOMOVE:
+            window.x, window.y = x, y
+        if not flags & SWP_NOSIZE:
+            window.width, window.height = width, height
+        if not flags & SWP_NOMOVE or not flags & SWP_NOSIZE:
+            self._emit('location', hwnd)
+        if flags & SWP_SHOWWINDOW and not window.visible:
+            window.visible = True
+            self._emit('show', hwnd)
+        elif flags & SWP_HIDEWINDOW and window.visible:
+            window.visible = False
+            self._emit('hide', hwnd)
+
+    def show_window_async(self, hwnd: int, command: int) -> None:
+        self._count('show_window_async')
+        window = self._get(hwnd)
+        # 訊息由目標執行緒處理，無回應的視窗要等恢復後才生效，這裡直接忽略
+        if window.hung:
+            return
+        window.minimized = command == SW_SHOWMINNOACTIVE
+        # 兩種命令都會讓隱藏的視窗變成可見
+        if not window.visible:
+            window.visible = True
+            self._emit('show', hwnd)
+
+    def get_monitors(self) -> List[Dict]:
+        self._count('get_monitors')
+        return [dict(m) for m in self.monitors]
+
+    def get_window_pid(self, hwnd: int) -> int:
+        self._count('get_window_pid')
+        return self._get(hwnd).pid
+
+    def get_class_name(self, hwnd: int) -> str:
+        self._count('get_class_name')
+        return self._get(hwnd).class_name
+
+    def get_process_name(self, pid: int) -> str:
+        self._count('get_process_name')
+        return self.process_names.get(pid, '')
+
+    def batch_set_window_pos(self, moves: List[WindowMove]) -> List[int]:
+        self._count('batch_commit')
+        failed = []
+        for hwnd, x, y, width, height, flags in moves:
+            if hwnd not in self.windows:
+                failed.append(hwnd)
+                continue
+            window = self.windows[hwnd]
+            # EndDeferWindowPos 需等待每個視窗處理完畢
+            if window.hung:
+                time.sleep(self.hang_time)
+            self._move(hwnd, window, x, y, width, height, flags)
+        return failed
+
+    def set_foreground(self, hwnd: int) -> None:
+        """模擬使用者切換到指定視窗"""
+        self.foreground = hwnd
+        self._emit('foreground', hwnd)
+
+    def get_foreground_window(self) -> int:
+        self._count('get_foreground_window')
+        return self.foreground if self.foreground in self.windows else 0
+
+    def is_hung(self, hwnd: int) -> bool:
+        self._count('is_hung')
+        window = self.windows.get(hwnd)
+        return window is not None and window.hung
+
+    def probe_window(self, hwnd: int, timeout: float) -> Optional[float]:
+        self._count('probe_window')
+        window = self.windows.get(hwnd)
+        if window is None:
+            return None
+        if window.hung:
+            # 與 SendMessageTimeout 相同，無回應的視窗會讓呼叫端等到逾時
+            time.sleep(timeout)
+            return None
+        return 0.0
+
+    def subscribe_events(self, callback: Callable[[str, int], None]) -> bool:
+        self._listeners.append(callback)
+        return True
+
+    def unsubscribe_events(self, callback: Callable[[str, int], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _get(self, hwnd: int) -> SimulatedWindow:
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise ValueError(f"無效的視窗控制代碼: {hwnd}")
+        return window
+
+
+def create_backend() -> WindowBackend:
+    """依照執行平台建立預設的視窗後端"""
+    if sys.platform == 'win32':
+        from functions.win32_backend import Win32Backend
+        return Win32Backend()
+    logger.warning("非 Windows 平台，使用模擬桌面後端")
+    return SimulatedBackend()
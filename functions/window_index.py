@@ -0,0 +1,183 @@
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from functions.window_backend import WindowBackend
+
+logger = logging.getLogger('Window_Index')
+
+
+class WindowInfo:
+    """快取中的視窗屬性"""
+    __slots__ = ('title', 'rect', 'style', 'pid', 'visible')
+
+    def __init__(self, title: str, rect: Tuple[int, int, int, int], style: int, pid: int, visible: bool):
+        self.title = title
+        self.rect = rect
+        self.style = style
+        self.pid = pid
+        self.visible = visible
+
+
+class WindowIndex:
+    """頂層視窗的記憶體索引
+
+    透過後端的視窗事件（建立、關閉、顯示、隱藏、改名、移動）逐一更新，
+    讀取時不必再對每個視窗進行跨行程呼叫。後端不支援事件、索引被標記為
+    失效或超過 rescan_interval 秒未完整掃描時，才退回完整列舉。
+
+    標題以不等待目標視窗的方式讀取，每個視窗最多等待 read_timeout 秒；
+    無回應或逾時的視窗沿用上次讀到的標題，列舉時間不受卡住的程式影響。
+    """
+
+    def __init__(self, backend: WindowBackend, rescan_interval: float = 30.0, read_timeout: float = 0.2):
+        self.backend = backend
+        self.rescan_interval = rescan_interval
+        self.read_timeout = read_timeout
+        self.windows: Dict[int, WindowInfo] = {}
+        self._by_title: Dict[str, Dict[int, None]] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._dirty = True
+        self._last_scan = 0.0
+        self.live = backend.subscribe_events(self._on_event)
+        if not self.live:
+            logger.info("後端不支援視窗事件，每次讀取前將完整列舉")
+
+    def rescan(self) -> None:
+        """完整列舉所有頂層視窗並重建索引"""
+        windows = {}
+        for hwnd in self.backend.enum_windows():
+            info = self._read(hwnd, self.windows.get(hwnd))
+            if info is not None:
+                windows[hwnd] = info
+        with self._lock:
+            self.windows = windows
+            self._by_title = {}
+            for hwnd, info in windows.items():
+                self._by_title.setdefault(info.title, {})[hwnd] = None
+            self._dirty = False
+            self._last_scan = time.monotonic()
+
+    @property
+    def stale(self) -> bool:
+        """索引是否需要完整列舉"""
+        return (not self.live or self._dirty
+                or time.monotonic() - self._last_scan > self.rescan_interval)
+
+    def ensure_fresh(self) -> None:
+        """必要時進行完整列舉"""
+        if self.stale:
+            self.rescan()
+
+    def invalidate(self) -> None:
+        """標記索引失效，下次讀取時完整列舉"""
+        self._dirty = True
+
+    def add_listener(self, callback: Callable[[str, int], None]) -> None:
+        """在索引因視窗事件更新後通知 callback(event, hwnd)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, int], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get(self, hwnd: int) -> Optional[WindowInfo]:
+        """獲取視窗的快取資訊，視窗不存在時回傳 None"""
+        return self.windows.get(hwnd)
+
+    def find_by_title(self, title: str, visible_only: bool = True) -> List[int]:
+        """依列舉順序回傳符合標題的視窗"""
+        with self._lock:
+            hwnds = self._by_title.get(title, ())
+            if visible_only:
+                return [hwnd for hwnd in hwnds if self.windows[hwnd].visible]
+            return list(hwnds)
+
+    def find_by_pid(self, pid: int, visible_only: bool = True) -> List[int]:
+        """回傳屬於指定行程的視窗"""
+        with self._lock:
+            return [hwnd for hwnd, info in self.windows.items()
+                    if info.pid == pid and (info.visible or not visible_only)]
+
+    # 自行寫入後同步快取
+    def note_title(self, hwnd: int, title: str) -> None:
+        with self._lock:
+            info = self.windows.get(hwnd)
+            if info is not None and info.title != title:
+                self._unlink_title(hwnd, info.title)
+                info.title = title
+                self._by_title.setdefault(title, {})[hwnd] = None
+
+    def note_style(self, hwnd: int, style: int) -> None:
+        info = self.windows.get(hwnd)
+        if info is not None:
+            info.style = style
+
+    def note_rect(self, hwnd: int, x: int, y: int, width: int, height: int) -> None:
+        info = self.windows.get(hwnd)
+        if info is not None:
+            info.rect = (x, y, x + width, y + height)
+
+    def _read(self, hwnd: int, previous: Optional[WindowInfo] = None) -> Optional[WindowInfo]:
+        """從後端讀取單一視窗的屬性，標題讀不到時沿用 previous 的標題"""
+        try:
+            if not self.backend.is_window(hwnd):
+                return None
+            title = None
+            if previous is None or not self.backend.is_hung(hwnd):
+                title = self.backend.get_window_text_timeout(hwnd, self.read_timeout)
+            if title is None:
+                title = previous.title if previous is not None else ''
+            return WindowInfo(
+                title,
+                self.backend.get_window_rect(hwnd),
+                self.backend.get_window_style(hwnd),
+                self.backend.get_window_pid(hwnd),
+                self.backend.is_window_visible(hwnd)
+            )
+        except Exception as e:
+            logger.debug(f"讀取視窗 {hwnd} 失敗: {str(e)}")
+            return None
+
+    def _unlink_title(self, hwnd: int, title: str) -> None:
+        group = self._by_title.get(title)
+        if group is not None:
+            group.pop(hwnd, None)
+            if not group:
+                del self._by_title[title]
+
+    def _on_event(self, event: str, hwnd: int) -> None:
+        """處理後端的視窗事件"""
+        self._apply_event(event, hwnd)
+        for callback in list(self._listeners):
+            callback(event, hwnd)
+
+    def _apply_event(self, event: str, hwnd: int) -> None:
+        if event in ('display', 'foreground'):
+            return
+        with self._lock:
+            if event == 'destroy':
+                info = self.windows.pop(hwnd, None)
+                if info is not None:
+                    self._unlink_title(hwnd, info.title)
+                return
+            info = self.windows.get(hwnd)
+            if event == 'location' and info is not None:
+                try:
+                    info.rect = self.backend.get_window_rect(hwnd)
+                except Exception:
+                    self._dirty = True
+                return
+            if event in ('hide', 'show') and info is not None:
+                info.visible = event == 'show'
+                return
+            # 建立、改名或尚未索引的視窗：重新讀取完整屬性
+            fresh = self._read(hwnd, info)
+            if info is not None:
+                self._unlink_title(hwnd, info.title)
+                del self.windows[hwnd]
+            if fresh is not None:
+                self.windows[hwnd] = fresh
+                self._by_title.setdefault(fresh.title, {})[hwnd] = None
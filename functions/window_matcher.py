@@ -0,0 +1,182 @@
+import re
+import logging
+from typing import Callable, Dict, List, Optional, Pattern, Tuple, Union
+
+from functions.window_backend import WindowBackend
+from functions.layout_engine import LAYOUT_STRATEGIES
+from functions.window_index import WindowIndex, WindowInfo
+
+logger = logging.getLogger('Window_Matcher')
+
+MATCH_KINDS = ('exact', 'prefix', 'regex', 'process', 'class')
+
+
+class WindowGroup:
+    """一組以相同方式比對並排版的視窗
+
+    region 為 None 時與其他未指定區域的群組平分每個螢幕的高度；為整數列表
+    時使用對應索引的螢幕；為 {'left','top','width','height'} 時使用該矩形。
+    strategy、rows 與 columns 為 layout_engine 的排版方式。
+    """
+    __slots__ = ('name', 'kind', 'pattern', 'width', 'height', 'remove_title', 'remove_border',
+                 'bypass_limit', 'region', 'strategy', 'rows', 'columns')
+
+    def __init__(self, name: str, kind: str, pattern: str, width: int, height: int,
+                 remove_title: bool = False, remove_border: bool = False, bypass_limit: bool = False,
+                 region: Union[None, List[int], Dict] = None, strategy: str = 'grid', rows: int = 0,
+                 columns: int = 0):
+        if kind not in MATCH_KINDS:
+            raise ValueError(f"未知的比對方式: {kind}")
+        if strategy not in LAYOUT_STRATEGIES:
+            raise ValueError(f"未知的排版方式: {strategy}")
+        self.name = name
+        self.kind = kind
+        self.pattern = pattern
+        self.width = width
+        self.height = height
+        self.remove_title = remove_title
+        self.remove_border = remove_border
+        self.bypass_limit = bypass_limit
+        self.region = region
+        self.strategy = strategy
+        self.rows = rows
+        self.columns = columns
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WindowGroup':
+        return cls(data['name'], data['kind'], data['pattern'], int(data['width']), int(data['height']),
+                   data.get('remove_title', False), data.get('remove_border', False),
+                   data.get('bypass_limit', False), data.get('region'), data.get('strategy', 'grid'),
+                   int(data.get('rows', 0)), int(data.get('columns', 0)))
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PrefixTrie:
+    """以字元為節點的前綴樹，節點上記錄在此結束的最優先群組"""
+    END = ''
+
+    def __init__(self):
+        self.root: Dict = {}
+
+    def add(self, prefix: str, group: int) -> None:
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(self.END, group)
+
+    def best(self, text: str, limit: int) -> Optional[int]:
+        """回傳 text 的所有前綴中優先序小於 limit 的最優先群組"""
+        best = None
+        node = self.root
+        for char in text:
+            group = node.get(self.END)
+            if group is not None and group < limit:
+                best = limit = group
+            node = node.get(char)
+            if node is None:
+                return best
+        group = node.get(self.END)
+        if group is not None and group < limit:
+            best = group
+        return best
+
+
+class MatcherIndex:
+    """把多個群組的比對條件編譯成單一索引
+
+    完全相同以字典查詢、前綴以前綴樹、正規表示式各自編譯後依群組順序從
+    標題開頭比對，行程名稱與視窗類別也以字典查詢。一個視窗只屬於第一個
+    符合的群組，已找到更優先的群組時略過其餘比對。正規表示式不合併成單一
+    交替式，行內旗標與編號的反向參照才能照常使用。類別與行程名稱只在有
+    群組需要時才讀取，並依視窗與行程快取。
+    """
+
+    def __init__(self, groups: List[WindowGroup], backend: WindowBackend):
+        self.groups = groups
+        self.backend = backend
+        self.exact: Dict[str, int] = {}
+        self.prefixes = PrefixTrie()
+        self.processes: Dict[str, int] = {}
+        self.classes: Dict[str, int] = {}
+        # 依群組順序排列的 (群組索引, 編譯後的正規表示式)
+        self.regexes: List[Tuple[int, Pattern]] = []
+        self._class_cache: Dict[int, str] = {}
+        self._process_cache: Dict[int, str] = {}
+
+        for index, group in enumerate(groups):
+            if group.kind == 'exact':
+                self.exact.setdefault(group.pattern, index)
+            elif group.kind == 'prefix':
+                self.prefixes.add(group.pattern, index)
+            elif group.kind == 'process':
+                self.processes.setdefault(group.pattern.lower(), index)
+            elif group.kind == 'class':
+                self.classes.setdefault(group.pattern, index)
+            else:
+                self.regexes.append((index, re.compile(group.pattern)))
+
+    def match(self, hwnd: int, info: WindowInfo) -> Optional[int]:
+        """回傳視窗所屬群組的索引，沒有符合時回傳 None"""
+        limit = len(self.groups)
+        best = self.exact.get(info.title)
+        if best is not None:
+            limit = best
+        if self.prefixes.root:
+            group = self.prefixes.best(info.title, limit)
+            if group is not None:
+                best = limit = group
+        for group, regex in self.regexes:
+            if group >= limit:
+                break
+            if regex.match(info.title) is not None:
+                best = limit = group
+                break
+        if self.classes:
+            group = self.classes.get(self._class_name(hwnd))
+            if group is not None and group < limit:
+                best = limit = group
+        if self.processes:
+            group = self.processes.get(self._process_name(info.pid))
+            if group is not None and group < limit:
+                best = group
+        return best
+
+    def _class_name(self, hwnd: int) -> str:
+        name = self._class_cache.get(hwnd)
+        if name is None:
+            try:
+                name = self.backend.get_class_name(hwnd)
+            except Exception:
+                name = ''
+            self._class_cache[hwnd] = name
+        return name
+
+    def _process_name(self, pid: int) -> str:
+        name = self._process_cache.get(pid)
+        if name is None:
+            try:
+                name = self.backend.get_process_name(pid).lower()
+            except Exception:
+                name = ''
+            self._process_cache[pid] = name
+        return name
+
+    def resolve(self, window_index: WindowIndex, keep_hidden: Optional[Callable[[int], bool]] = None) -> List[List[int]]:
+        """一次走訪所有可見視窗，依列舉順序回傳每個群組的視窗
+
+        keep_hidden 對不可見、但仍需管理的視窗（例如放在其他分頁而隱藏）回傳 True。
+        """
+        result: List[List[int]] = [[] for _ in self.groups]
+        for hwnd, info in list(window_index.windows.items()):
+            if not info.visible and (keep_hidden is None or not keep_hidden(hwnd)):
+                continue
+            group = self.match(hwnd, info)
+            if group is not None:
+                result[group].append(hwnd)
+        # 已關閉視窗的快取不再需要
+        if len(self._class_cache) > 2 * len(window_index.windows) + 64:
+            self._class_cache = {hwnd: name for hwnd, name in self._class_cache.items()
+                                 if hwnd in window_index.windows}
+        return result
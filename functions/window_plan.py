@@ -0,0 +1,65 @@
+from typing import Dict, List, Optional, Tuple
+
+from functions.window_backend import SWP_NOZORDER, SWP_FRAMECHANGED, SWP_NOMOVE, SWP_NOSIZE
+from functions.window_registry import ManagedWindow
+
+
+class WindowChange:
+    """單一視窗需要執行的寫入操作"""
+    __slots__ = ('hwnd', 'style', 'x', 'y', 'width', 'height', 'flags')
+
+    def __init__(self, hwnd: int, style: Optional[int], x: int, y: int, width: int, height: int, flags: int):
+        self.hwnd = hwnd
+        self.style = style
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.flags = flags
+
+    @property
+    def moves(self) -> bool:
+        """是否改變位置或大小"""
+        return not (self.flags & SWP_NOMOVE and self.flags & SWP_NOSIZE)
+
+    @property
+    def operation_count(self) -> int:
+        return 2 if self.style is not None else 1
+
+
+class LayoutPlan:
+    """一次排版計算出的目標狀態與需要執行的差異操作"""
+
+    def __init__(self, message: str):
+        self.message = message
+        self.positions: Dict[int, ManagedWindow] = {}
+        self.removed: List[int] = []
+        self.changes: List[WindowChange] = []
+        self.unchanged = 0
+        # 緊密排列時計畫使用的裝箱狀態，套用計畫時取代原本的狀態
+        self.packer = None
+        # 重建格位的群組 {群組: (格位配置器, 分頁配置器)}，套用計畫時取代原本的配置器
+        self.allocators: Dict[str, Tuple] = {}
+        # 換頁時以 ShowWindowAsync 送出的 (視窗, 顯示命令)，最小化模式使用
+        self.page_commands: List[Tuple[int, int]] = []
+
+    @property
+    def operation_count(self) -> int:
+        """套用計畫需要的後端寫入次數"""
+        return sum(change.operation_count for change in self.changes)
+
+
+def diff_window(hwnd: int, current_style: int, current_rect: Tuple[int, int, int, int],
+                style: int, x: int, y: int, width: int, height: int) -> Optional[WindowChange]:
+    """比較目前與目標狀態，回傳需要的操作，已符合時回傳 None"""
+    style_changed = style != current_style
+    left, top, right, bottom = current_rect
+    geometry_changed = (left, top, right - left, bottom - top) != (x, y, width, height)
+    if not style_changed and not geometry_changed:
+        return None
+    flags = SWP_NOZORDER
+    if style_changed:
+        flags |= SWP_FRAMECHANGED
+    if not geometry_changed:
+        flags |= SWP_NOMOVE | SWP_NOSIZE
+    return WindowChange(hwnd, style if style_changed else None, x, y, width, height, flags)
@@ -0,0 +1,149 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+class ManagedWindow:
+    """一個已管理視窗的格位與識別資訊"""
+    __slots__ = ('hwnd', 'x', 'y', 'order', 'pid', 'group', 'launch_index', 'title', 'executable', 'width', 'height',
+                 'page')
+
+    def __init__(self, hwnd: int, x: int, y: int, order: int, pid: Optional[int], group: str = '',
+                 launch_index: Optional[int] = None, title: str = '', executable: Optional[str] = None,
+                 width: int = 0, height: int = 0, page: int = 0):
+        self.hwnd = hwnd
+        self.x = x
+        self.y = y
+        self.order = order
+        self.pid = pid
+        self.group = group
+        self.launch_index = launch_index
+        self.title = title
+        self.executable = executable
+        self.width = width
+        self.height = height
+        # 溢出分頁的頁碼，0 為螢幕上的格位
+        self.page = page
+
+    def with_size(self, width: int, height: int) -> 'ManagedWindow':
+        """回傳改變大小後的新紀錄，已加入登錄表的紀錄不直接修改"""
+        return ManagedWindow(self.hwnd, self.x, self.y, self.order, self.pid, self.group, self.launch_index,
+                             self.title, self.executable, width, height, self.page)
+
+    @property
+    def slot(self) -> int:
+        return pack_slot(self.x, self.y, self.page)
+
+
+def pack_slot(x: int, y: int, page: int = 0) -> int:
+    """把頁碼與格位座標合成單一整數作為索引鍵，不必為每個格位建立 tuple"""
+    return page << 64 | (x & 0xFFFFFFFF) << 32 | (y & 0xFFFFFFFF)
+
+
+def _order_key(window: ManagedWindow) -> Tuple[int, int]:
+    return window.order, window.hwnd
+
+
+class WindowRegistry:
+    """已管理視窗的登錄表
+
+    每個視窗只有一筆 __slots__ 紀錄，以 hwnd 與格位在常數時間內查詢，並
+    維持依序號排列的列表：新視窗的序號遞增，加入時直接接在最後，只有接回
+    舊序號時才以二分搜尋插入，重新整理時不需要再排序。另以群組與行程 ID
+    建立索引，查詢只走訪相關的視窗。修改只在持有鎖時進行，對外只提供快照，
+    排版執行緒修改時 UI 執行緒仍可安全讀取。
+    """
+
+    def __init__(self):
+        self._by_hwnd: Dict[int, ManagedWindow] = {}
+        # {group: {pack_slot(x, y): 視窗}}
+        self._by_slot: Dict[str, Dict[int, ManagedWindow]] = {}
+        # {group: {hwnd: 視窗}} 與 {pid: {hwnd: 視窗}}
+        self._by_group: Dict[str, Dict[int, ManagedWindow]] = {}
+        self._by_pid: Dict[Optional[int], Dict[int, ManagedWindow]] = {}
+        self._ordered: List[ManagedWindow] = []
+        self._lock = threading.Lock()
+        self.next_order = 1
+
+    def __len__(self) -> int:
+        return len(self._by_hwnd)
+
+    def __contains__(self, hwnd: int) -> bool:
+        return hwnd in self._by_hwnd
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._by_hwnd))
+
+    def __getitem__(self, hwnd: int) -> ManagedWindow:
+        return self._by_hwnd[hwnd]
+
+    def get(self, hwnd: int) -> Optional[ManagedWindow]:
+        return self._by_hwnd.get(hwnd)
+
+    def at_slot(self, group: str, x: int, y: int, page: int = 0) -> Optional[ManagedWindow]:
+        """回傳佔用指定格位的視窗"""
+        slots = self._by_slot.get(group)
+        return slots.get(pack_slot(x, y, page)) if slots is not None else None
+
+    def find_by_pid(self, pid: int) -> List[ManagedWindow]:
+        """依序號回傳屬於指定行程的視窗"""
+        with self._lock:
+            return sorted(self._by_pid.get(pid, {}).values(), key=_order_key)
+
+    def pids(self) -> Set[int]:
+        with self._lock:
+            return {pid for pid in self._by_pid if pid}
+
+    def records(self) -> List[ManagedWindow]:
+        """依序號排列的視窗快照，可在其他執行緒修改登錄表時安全走訪"""
+        with self._lock:
+            return list(self._ordered)
+
+    def row_of(self, hwnd: int) -> int:
+        """回傳視窗在序號排列中的位置，不存在時回傳 -1"""
+        window = self._by_hwnd.get(hwnd)
+        if window is None:
+            return -1
+        return bisect_left(self._ordered, (window.order, hwnd), key=_order_key)
+
+    def add(self, window: ManagedWindow) -> None:
+        """加入或取代視窗"""
+        with self._lock:
+            if window.hwnd in self._by_hwnd:
+                self._remove(window.hwnd)
+            self._by_hwnd[window.hwnd] = window
+            self._by_slot.setdefault(window.group, {})[window.slot] = window
+            self._by_group.setdefault(window.group, {})[window.hwnd] = window
+            self._by_pid.setdefault(window.pid, {})[window.hwnd] = window
+            key = (window.order, window.hwnd)
+            if not self._ordered or key > _order_key(self._ordered[-1]):
+                self._ordered.append(window)
+            else:
+                self._ordered.insert(bisect_left(self._ordered, key, key=_order_key), window)
+            if window.order >= self.next_order:
+                self.next_order = window.order + 1
+
+    def pop(self, hwnd: int, default=None) -> Optional[ManagedWindow]:
+        """移除並回傳視窗"""
+        with self._lock:
+            if hwnd not in self._by_hwnd:
+                return default
+            return self._remove(hwnd)
+
+    def _remove(self, hwnd: int) -> ManagedWindow:
+        window = self._by_hwnd.pop(hwnd)
+        slots = self._by_slot.get(window.group)
+        if slots is not None and slots.get(window.slot) is window:
+            del slots[window.slot]
+        for index, key in ((self._by_group, window.group), (self._by_pid, window.pid)):
+            windows = index[key]
+            del windows[hwnd]
+            if not windows:
+                del index[key]
+        del self._ordered[bisect_left(self._ordered, (window.order, hwnd), key=_order_key)]
+        return window
+
+    def in_group(self, group: str) -> List[ManagedWindow]:
+        """依序號回傳指定群組的視窗"""
+        with self._lock:
+            return sorted(self._by_group.get(group, {}).values(), key=_order_key)
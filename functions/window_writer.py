@@ -0,0 +1,227 @@
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from functions.window_backend import WindowBackend, SWP_ASYNCWINDOWPOS
+from functions.window_index import WindowIndex
+from functions.window_plan import WindowChange
+
+logger = logging.getLogger('Window_Writer')
+
+
+class PendingWrite:
+    """等待驗證或重試的寫入"""
+    __slots__ = ('change', 'attempts', 'due')
+
+    def __init__(self, change: WindowChange, attempts: int, due: float):
+        self.change = change
+        self.attempts = attempts
+        self.due = due
+
+
+class WindowWriter:
+    """有期限保護的視窗寫入
+
+    已被系統判定無回應的視窗不寫入，直接排入重試佇列。樣式與批次移動在
+    背景執行緒進行，每次提交最多等待 deadline 秒，逾時的視窗改排入重試
+    佇列，其餘視窗照常完成。async_moves 為 True 時以 SWP_ASYNCWINDOWPOS
+    移動視窗，呼叫立即返回，之後由 process_retries 比對實際位置確認。
+    同一視窗重試超過 max_attempts 次即放棄。start 後由背景執行緒每
+    retry_delay 秒處理一次重試佇列。
+    """
+
+    def __init__(self, backend: WindowBackend, window_index: WindowIndex, deadline: float = 0.5,
+                 workers: int = 4, retry_delay: float = 1.0, max_attempts: int = 5, async_moves: bool = False):
+        self.backend = backend
+        self.window_index = window_index
+        self.deadline = deadline
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.async_moves = async_moves
+        self.retry_queue: Dict[int, PendingWrite] = {}
+        self.abandoned: List[int] = []
+        self._verifying: Dict[int, PendingWrite] = {}
+        # 仍卡在寫入呼叫中的視窗，完成前不再對它送出新的寫入
+        self._busy = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='WindowWriter')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """開始在背景處理重試佇列"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='WindowWriterRetry', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止處理重試佇列"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.retry_delay):
+            try:
+                self.process_retries()
+            except Exception as e:
+                logger.error(f"重試視窗寫入時發生錯誤: {str(e)}")
+
+    @property
+    def pending_count(self) -> int:
+        """尚未確認完成的寫入數量"""
+        return len(self.retry_queue) + len(self._verifying)
+
+    def commit(self, changes: List[WindowChange], attempts: Optional[Dict[int, int]] = None) -> List[int]:
+        """寫入變更，回傳本次未完成、已排入重試佇列或等待驗證的視窗"""
+        attempts = attempts or {}
+        deferred = []
+
+        def defer(change: WindowChange) -> None:
+            deferred.append(change.hwnd)
+            self._defer(change, attempts.get(change.hwnd, 0) + 1)
+
+        # 新的目標取代同一視窗尚未完成的舊寫入
+        with self._lock:
+            for change in changes:
+                self.retry_queue.pop(change.hwnd, None)
+                self._verifying.pop(change.hwnd, None)
+
+        ready = []
+        for change in changes:
+            if change.hwnd in self._busy or self.backend.is_hung(change.hwnd):
+                defer(change)
+            else:
+                ready.append(change)
+
+        # SetWindowLong 會同步通知目標視窗，於背景寫入並限制等待時間
+        styled = [change for change in ready if change.style is not None]
+        if styled:
+            futures = {self._executor.submit(self.backend.set_window_style, c.hwnd, c.style): c for c in styled}
+            done, late = wait(futures, timeout=self.deadline)
+            skipped = set()
+            for future in late:
+                change = futures[future]
+                self._mark_busy(change.hwnd, future)
+                skipped.add(change.hwnd)
+                defer(change)
+            for future in done:
+                change = futures[future]
+                if future.exception() is not None:
+                    logger.warning(f"設定視窗 {change.hwnd} 樣式失敗: {str(future.exception())}")
+                    skipped.add(change.hwnd)
+                    defer(change)
+                else:
+                    self.window_index.note_style(change.hwnd, change.style)
+            ready = [change for change in ready if change.hwnd not in skipped]
+
+        if not ready:
+            return deferred
+        if self.async_moves:
+            self._post_moves(ready, attempts, defer)
+        else:
+            deferred.extend(self._batch_moves(ready, defer))
+        return deferred
+
+    def _post_moves(self, changes: List[WindowChange], attempts: Dict[int, int], defer) -> None:
+        """非同步移動：送出後不等待，稍後驗證"""
+        verify_at = time.monotonic() + self.deadline
+        for change in changes:
+            try:
+                self.backend.set_window_pos(change.hwnd, change.x, change.y, change.width, change.height,
+                                            change.flags | SWP_ASYNCWINDOWPOS)
+            except Exception as e:
+                logger.warning(f"移動視窗 {change.hwnd} 失敗: {str(e)}")
+                defer(change)
+                continue
+            if change.moves:
+                with self._lock:
+                    self._verifying[change.hwnd] = PendingWrite(change, attempts.get(change.hwnd, 0), verify_at)
+
+    def _batch_moves(self, changes: List[WindowChange], defer) -> List[int]:
+        """單次批次提交，逾時時整批改為稍後驗證並回傳這些視窗"""
+        moves = [(c.hwnd, c.x, c.y, c.width, c.height, c.flags) for c in changes]
+        future = self._executor.submit(self.backend.batch_set_window_pos, moves)
+        done, _ = wait([future], timeout=self.deadline)
+        if not done:
+            logger.warning(f"批次移動 {len(moves)} 個視窗超過 {self.deadline} 秒，稍後驗證")
+            verify_at = time.monotonic() + self.retry_delay
+            with self._lock:
+                for change in changes:
+                    self._busy.add(change.hwnd)
+                    if change.moves:
+                        self._verifying[change.hwnd] = PendingWrite(change, 0, verify_at)
+            hwnds = [change.hwnd for change in changes]
+            future.add_done_callback(lambda f: self._release_busy(hwnds))
+            return hwnds
+        try:
+            failed = set(future.result())
+        except Exception as e:
+            logger.warning(f"批次移動視窗失敗: {str(e)}")
+            failed = {change.hwnd for change in changes}
+        for change in changes:
+            if change.hwnd in failed:
+                defer(change)
+            elif change.moves:
+                self.window_index.note_rect(change.hwnd, change.x, change.y, change.width, change.height)
+        return []
+
+    def _mark_busy(self, hwnd: int, future) -> None:
+        with self._lock:
+            self._busy.add(hwnd)
+        future.add_done_callback(lambda f: self._release_busy([hwnd]))
+
+    def _release_busy(self, hwnds: List[int]) -> None:
+        with self._lock:
+            self._busy.difference_update(hwnds)
+
+    def _defer(self, change: WindowChange, attempts: int) -> None:
+        with self._lock:
+            if attempts > self.max_attempts:
+                self.retry_queue.pop(change.hwnd, None)
+                self.abandoned.append(change.hwnd)
+                logger.warning(f"視窗 {change.hwnd} 寫入重試 {self.max_attempts} 次仍失敗，放棄")
+                return
+            # 同一視窗只保留最新的目標
+            self.retry_queue[change.hwnd] = PendingWrite(change, attempts, time.monotonic() + self.retry_delay)
+
+    def discard(self, hwnd: int) -> None:
+        """視窗不再管理時移除尚未完成的寫入"""
+        with self._lock:
+            self.retry_queue.pop(hwnd, None)
+            self._verifying.pop(hwnd, None)
+
+    def process_retries(self) -> int:
+        """驗證非同步移動並重試到期的寫入，回傳本次確認完成的視窗數"""
+        now = time.monotonic()
+        confirmed = 0
+        with self._lock:
+            verify = [p for p in self._verifying.values() if p.due <= now and p.change.hwnd not in self._busy]
+            for pending in verify:
+                del self._verifying[pending.change.hwnd]
+        for pending in verify:
+            change = pending.change
+            try:
+                if not self.backend.is_window(change.hwnd):
+                    continue
+                rect = self.backend.get_window_rect(change.hwnd)
+            except Exception:
+                continue
+            if rect == (change.x, change.y, change.x + change.width, change.y + change.height):
+                self.window_index.note_rect(change.hwnd, change.x, change.y, change.width, change.height)
+                confirmed += 1
+            else:
+                self._defer(change, pending.attempts + 1)
+
+        with self._lock:
+            due = [p for p in self.retry_queue.values() if p.due <= now and p.change.hwnd not in self._busy]
+            for pending in due:
+                del self.retry_queue[pending.change.hwnd]
+        due = [p for p in due if self.backend.is_window(p.change.hwnd)]
+        if due:
+            attempts = {p.change.hwnd: p.attempts for p in due}
+            deferred = set(self.commit([p.change for p in due], attempts))
+            confirmed += sum(1 for p in due if p.change.hwnd not in deferred and p.change.hwnd not in self._verifying)
+        return confirmed
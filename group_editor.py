@@ -0,0 +1,124 @@
+from typing import Dict, List
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+                             QTableWidgetItem, QComboBox, QHeaderView)
+
+from functions.layout_engine import LAYOUT_STRATEGIES
+
+GROUP_COLUMNS = ['群組名稱', '比對方式', '比對條件', '寬度', '高度', '螢幕', '排版方式', '列數', '欄數',
+                 '移除標題欄', '移除邊框', '超出限制']
+(GCOL_NAME, GCOL_KIND, GCOL_PATTERN, GCOL_WIDTH, GCOL_HEIGHT, GCOL_SCREENS, GCOL_STRATEGY, GCOL_ROWS,
+ GCOL_COLUMNS, GCOL_REMOVE_TITLE, GCOL_REMOVE_BORDER, GCOL_BYPASS_LIMIT) = range(len(GROUP_COLUMNS))
+KIND_LABELS = {
+    'exact': '完全相同', 'prefix': '開頭相同', 'regex': '正規表示式', 'process': '執行檔名稱', 'class': '視窗類別',
+}
+STRATEGY_LABELS = dict(zip(LAYOUT_STRATEGIES, ("依列排列", "依欄排列", "置中排列", "等比例填滿螢幕", "自訂列欄")))
+CHECK_COLUMNS = ((GCOL_REMOVE_TITLE, 'remove_title'), (GCOL_REMOVE_BORDER, 'remove_border'),
+                 (GCOL_BYPASS_LIMIT, 'bypass_limit'))
+
+
+class GroupEditor(QWidget):
+    """多群組排版的設定表格
+
+    每列為一個群組；螢幕欄填入以逗號分隔的螢幕編號（從 0 開始），空白時
+    與其他未指定螢幕的群組平分畫面。設定檔中以矩形指定的區域與表格沒有
+    的欄位原樣保留。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.table = QTableWidget(0, len(GROUP_COLUMNS))
+        self.table.setHorizontalHeaderLabels(GROUP_COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(GCOL_PATTERN, QHeaderView.ResizeMode.Stretch)
+        self.table.setMinimumHeight(120)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        self.add_btn = QPushButton("新增群組")
+        self.add_btn.clicked.connect(lambda: self.add_group({}))
+        self.remove_btn = QPushButton("刪除群組")
+        self.remove_btn.clicked.connect(self.remove_selected)
+        btn_layout.addWidget(self.add_btn)
+        btn_layout.addWidget(self.remove_btn)
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+    def add_group(self, group: Dict):
+        """新增一列群組設定"""
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        name = QTableWidgetItem(group.get('name', f"群組{row + 1}"))
+        # 保存原本的設定，讀取時保留表格沒有的欄位
+        name.setData(Qt.ItemDataRole.UserRole, dict(group))
+        self.table.setItem(row, GCOL_NAME, name)
+        kind = QComboBox()
+        for key, label in KIND_LABELS.items():
+            kind.addItem(label, key)
+        kind.setCurrentIndex(max(0, kind.findData(group.get('kind', 'exact'))))
+        self.table.setCellWidget(row, GCOL_KIND, kind)
+        self.table.setItem(row, GCOL_PATTERN, QTableWidgetItem(group.get('pattern', '')))
+        self.table.setItem(row, GCOL_WIDTH, QTableWidgetItem(str(group.get('width', 480))))
+        self.table.setItem(row, GCOL_HEIGHT, QTableWidgetItem(str(group.get('height', 344))))
+        region = group.get('region')
+        if isinstance(region, dict):
+            # 矩形區域無法在表格中編輯，顯示其範圍並原樣保留
+            screens = QTableWidgetItem(f"{region['left']},{region['top']} {region['width']}x{region['height']}")
+            screens.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
+        else:
+            screens = QTableWidgetItem(','.join(str(i) for i in region) if isinstance(region, list) else '')
+        self.table.setItem(row, GCOL_SCREENS, screens)
+        strategy = QComboBox()
+        for key, label in STRATEGY_LABELS.items():
+            strategy.addItem(label, key)
+        strategy.setCurrentIndex(max(0, strategy.findData(group.get('strategy', 'grid'))))
+        self.table.setCellWidget(row, GCOL_STRATEGY, strategy)
+        self.table.setItem(row, GCOL_ROWS, QTableWidgetItem(str(group.get('rows', 0))))
+        self.table.setItem(row, GCOL_COLUMNS, QTableWidgetItem(str(group.get('columns', 0))))
+        for column, key in CHECK_COLUMNS:
+            item = QTableWidgetItem()
+            item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+            item.setCheckState(Qt.CheckState.Checked if group.get(key) else Qt.CheckState.Unchecked)
+            self.table.setItem(row, column, item)
+
+    def remove_selected(self):
+        """刪除選取的群組"""
+        for row in sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True):
+            self.table.removeRow(row)
+
+    def set_groups(self, groups: List[Dict]):
+        """以設定檔中的群組重建表格"""
+        self.table.setRowCount(0)
+        for group in groups:
+            self.add_group(group)
+
+    def get_groups(self) -> List[Dict]:
+        """讀取表格中的群組設定，數值欄位無效時拋出 ValueError"""
+        groups = []
+        for row in range(self.table.rowCount()):
+            pattern = self.table.item(row, GCOL_PATTERN).text()
+            if not pattern:
+                continue
+            name = self.table.item(row, GCOL_NAME)
+            group = dict(name.data(Qt.ItemDataRole.UserRole) or {})
+            group.update({
+                'name': name.text() or f"群組{row + 1}",
+                'kind': self.table.cellWidget(row, GCOL_KIND).currentData(),
+                'pattern': pattern,
+                'width': int(self.table.item(row, GCOL_WIDTH).text()),
+                'height': int(self.table.item(row, GCOL_HEIGHT).text()),
+                'strategy': self.table.cellWidget(row, GCOL_STRATEGY).currentData(),
+                'rows': int(self.table.item(row, GCOL_ROWS).text() or 0),
+                'columns': int(self.table.item(row, GCOL_COLUMNS).text() or 0),
+            })
+            if not isinstance(group.get('region'), dict):
+                screens = self.table.item(row, GCOL_SCREENS).text().strip()
+                group['region'] = [int(part) for part in screens.split(',') if part.strip()] if screens else None
+            for column, key in CHECK_COLUMNS:
+                group[key] = self.table.item(row, column).checkState() == Qt.CheckState.Checked
+            groups.append(group)
+        return groups
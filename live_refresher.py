@@ -0,0 +1,62 @@
+import time
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class LiveRefresher(QObject):
+    """合併視窗變動通知並限制每秒最多更新 max_rate 次
+
+    notify 可在任何執行緒呼叫；一段時間內的多次通知只會觸發一次 refresh。
+    另以 poll_interval 毫秒定期更新，涵蓋沒有事件可用的變動（例如樣式）。
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, refresh: Callable[[], None], max_rate: float = 4.0, poll_interval: int = 2000, parent=None):
+        super().__init__(parent)
+        self.refresh = refresh
+        self.min_interval = 1.0 / max_rate
+        self.active = False
+        self.flush_count = 0
+        self._last_flush = 0.0
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval)
+        self._poll_timer.timeout.connect(self._schedule)
+
+        # 跨執行緒的通知經由佇列連線回到 UI 執行緒
+        self.changed.connect(self._schedule)
+
+    def start(self):
+        """開始即時更新"""
+        self.active = True
+        self._poll_timer.start()
+        self._schedule()
+
+    def stop(self):
+        """停止即時更新"""
+        self.active = False
+        self._poll_timer.stop()
+        self._flush_timer.stop()
+
+    def notify(self):
+        """通知有資料變動"""
+        if self.active:
+            self.changed.emit()
+
+    def _schedule(self):
+        if not self.active or self._flush_timer.isActive():
+            return
+        wait = self.min_interval - (time.monotonic() - self._last_flush)
+        self._flush_timer.start(max(0, int(wait * 1000)))
+
+    def _flush(self):
+        if not self.active:
+            return
+        self._last_flush = time.monotonic()
+        self.flush_count += 1
+        self.refresh()
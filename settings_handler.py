@@ -8,19 +8,38 @@ class SettingsHandler:
         self.default_settings = {
             "program_path": "",
             "execution_count": "1",
+            "max_in_flight": "4",
+            "adaptive_launch": False,
+            "load_thresholds": {"cpu": 0.85, "memory": 0.90, "disk": 0.80},
+            "auto_restart": False,
+            "restart_hung": False,
             "window_title": "",
             "window_width": "480",
             "window_height": "344",
+            "layout_strategy": "grid",
+            "layout_rows": "2",
+            "layout_columns": "2",
             "remove_title": False,
             "remove_border": False,
-            "bypass_limit": False
+            "bypass_limit": False,
+            "overflow_pages": False,
+            "page_out_mode": "hide",
+            "throttle_enabled": False,
+            "throttle_policy": {"visible": "normal", "hidden": "suspended", "idle": "low",
+                                "idle_minutes": 0, "affinity_cpus": 1},
+            "async_moves": False,
+            "auto_tile": False,
+            "window_groups": [],
+            "pack_groups": False,
+            "live_refresh": False
         }
         
     def load_settings(self):
         try:
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    # 舊版設定檔缺少的項目使用預設值
+                    return {**self.default_settings, **json.load(f)}
             return self.default_settings.copy()
         except Exception as e:
             print(f"載入設定時發生錯誤: {e}")
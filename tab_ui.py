@@ -1,19 +1,54 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QLineEdit, QFileDialog, QMessageBox, QCheckBox, 
-                             QTableWidget, QTableWidgetItem, QHeaderView)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIntValidator
+                             QTableView, QHeaderView, QAbstractItemView, QComboBox)
+from PyQt6.QtCore import Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QIntValidator, QGuiApplication
 from functions.MainTab_functions import MainTabFunctions
+from functions.slot_store import SlotStore
 from settings_handler import SettingsHandler
+from workers import Worker, TaskWorker
+from live_refresher import LiveRefresher
+from group_editor import GroupEditor, STRATEGY_LABELS
+from functions.window_matcher import WindowGroup
+from functions.process_throttle import THROTTLE_LEVELS, LEVEL_LABELS, ThrottlePolicy
+from window_table_model import (WindowTableModel, ButtonDelegate, COL_ORDER, COL_TITLE, COL_HWND, COL_X, COL_Y,
+                                COL_CAPTION, COL_BORDER, COL_CPU, COL_MEMORY, COL_HANDLES, COL_THREADS, COL_TREND,
+                                COL_HEALTH, COL_THROTTLE, COL_APPLY)
 
 class MainTab(QWidget):
+    # 自動排版在背景執行緒完成後回到 UI 執行緒
+    auto_tiled = pyqtSignal(bool, str)
+
     def __init__(self,parent=None):
         super().__init__(parent)
-        self.functions = MainTabFunctions()
+        self.functions = MainTabFunctions(slot_store=SlotStore())
         self.settings_handler = SettingsHandler()  # 新增
         self.main_window = parent  # 新增
+        self.thread_pool = QThreadPool.globalInstance()
+        self.active_worker = None
+        # 在背景執行中的短暫工作，同一種工作同時只執行一個
+        self.running_tasks = set()
         self.initUI()
         self.load_settings()
+        self.watch_screens()
+
+        # 定期檢查啟動的行程，結束時依設定重新啟動
+        self.supervise_timer = QTimer(self)
+        self.supervise_timer.timeout.connect(self.supervise_processes)
+        self.supervise_timer.start(1000)
+        # 背景取樣已啟動實例的 CPU 與記憶體用量
+        self.functions.process_metrics.start()
+        # 背景探測已管理視窗是否仍有回應
+        self.functions.health_probe.start()
+        # 依政策節流背景實例，程式結束時恢復所有被節流的行程；
+        # 暫停的行程記錄在檔案中，異常結束後下次啟動時恢復
+        self.functions.throttler.state_path = "suspended.json"
+        self.functions.throttler.start()
+        QGuiApplication.instance().aboutToQuit.connect(self.functions.throttler.stop)
+        # 背景重試逾時未完成的視窗寫入
+        self.functions.window_writer.start()
+        # 主視窗建立完成後接回上次管理、仍在執行的實例
+        QTimer.singleShot(0, self.restore_slots)
         
     def initUI(self):
         layout = QVBoxLayout(self)
@@ -60,12 +95,12 @@ class MainTab(QWidget):
                 font-size: 14px;
                 spacing: 8px;
             }
-            QTableWidget {
+            QTableView {
                 border: 1px solid #dfe4ea;
                 border-radius: 4px;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
             QHeaderView::section {
@@ -96,7 +131,17 @@ class MainTab(QWidget):
         separator2.setStyleSheet("background-color: #dfe4ea;")
         layout.addWidget(separator2)
         
-        # 第三組：視窗列表
+        # 第三組：多群組排版
+        group3_layout = self.create_window_groups_group()
+        layout.addLayout(group3_layout)
+
+        # 分隔線
+        separator3 = QWidget()
+        separator3.setFixedHeight(1)
+        separator3.setStyleSheet("background-color: #dfe4ea;")
+        layout.addWidget(separator3)
+
+        # 第四組：視窗列表
         self.create_window_list_group(layout)
         
         layout.addStretch()
@@ -143,12 +188,29 @@ class MainTab(QWidget):
         self.count_input.setFixedWidth(80)
         self.count_input.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.count_input.setText("1")
+
+        in_flight_label = QLabel("同時啟動:")
+        self.in_flight_input = QLineEdit()
+        self.in_flight_input.setValidator(QIntValidator(1, 99))
+        self.in_flight_input.setFixedWidth(80)
+        self.in_flight_input.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.in_flight_input.setText("4")
         
         self.execute_btn = QPushButton("執行程式")
         self.execute_btn.clicked.connect(self.execute_program)
         
         count_layout.addWidget(count_label)
         count_layout.addWidget(self.count_input)
+        count_layout.addWidget(in_flight_label)
+        count_layout.addWidget(self.in_flight_input)
+        self.adaptive_launch_checkbox = QCheckBox("依系統負載調整")
+        count_layout.addWidget(self.adaptive_launch_checkbox)
+        self.auto_restart_checkbox = QCheckBox("自動重啟")
+        self.auto_restart_checkbox.toggled.connect(self.toggle_auto_restart)
+        count_layout.addWidget(self.auto_restart_checkbox)
+        self.restart_hung_checkbox = QCheckBox("無回應時重啟")
+        self.restart_hung_checkbox.toggled.connect(self.toggle_restart_hung)
+        count_layout.addWidget(self.restart_hung_checkbox)
         count_layout.addWidget(self.execute_btn)
         count_layout.addStretch()
         
@@ -203,6 +265,29 @@ class MainTab(QWidget):
         size_layout.addWidget(self.height_input)
         size_layout.addStretch()
         group_layout.addLayout(size_layout)
+
+        # 排版方式，列數與欄數只用於自訂列欄
+        strategy_layout = QHBoxLayout()
+        strategy_label = QLabel("排版方式:")
+        self.strategy_combo = QComboBox()
+        for strategy, label in STRATEGY_LABELS.items():
+            self.strategy_combo.addItem(label, strategy)
+        rows_label = QLabel("列數:")
+        self.rows_input = QLineEdit()
+        self.rows_input.setValidator(QIntValidator(1, 100))
+        self.rows_input.setFixedWidth(60)
+        columns_label = QLabel("欄數:")
+        self.columns_input = QLineEdit()
+        self.columns_input.setValidator(QIntValidator(1, 100))
+        self.columns_input.setFixedWidth(60)
+        strategy_layout.addWidget(strategy_label)
+        strategy_layout.addWidget(self.strategy_combo)
+        strategy_layout.addWidget(rows_label)
+        strategy_layout.addWidget(self.rows_input)
+        strategy_layout.addWidget(columns_label)
+        strategy_layout.addWidget(self.columns_input)
+        strategy_layout.addStretch()
+        group_layout.addLayout(strategy_layout)
         
         # 視窗樣式選項
         style_layout = QHBoxLayout()
@@ -210,12 +295,65 @@ class MainTab(QWidget):
         self.remove_border_checkbox = QCheckBox("移除邊框")
         self.bypass_limit_checkbox = QCheckBox("解除視窗限制")
         self.dont_movewindow_checkbox = QCheckBox("不排序視窗")
+        self.async_moves_checkbox = QCheckBox("非同步移動")
+        self.async_moves_checkbox.toggled.connect(self.toggle_async_moves)
+        self.auto_tile_checkbox = QCheckBox("自動排列新視窗")
+        self.auto_tile_checkbox.toggled.connect(self.toggle_auto_tile)
+        self.auto_tiled.connect(self.auto_tile_finished)
         style_layout.addWidget(self.remove_title_checkbox)
         style_layout.addWidget(self.remove_border_checkbox)
         style_layout.addWidget(self.bypass_limit_checkbox)
         style_layout.addWidget(self.dont_movewindow_checkbox)
+        style_layout.addWidget(self.async_moves_checkbox)
+        style_layout.addWidget(self.auto_tile_checkbox)
         style_layout.addStretch()
         group_layout.addLayout(style_layout)
+
+        # 解除視窗限制時超出的視窗放到虛擬分頁，只顯示目前頁面
+        page_layout = QHBoxLayout()
+        self.overflow_pages_checkbox = QCheckBox("超出的視窗分頁顯示")
+        self.overflow_pages_checkbox.toggled.connect(self.toggle_overflow_pages)
+        self.page_out_combo = QComboBox()
+        self.page_out_combo.addItem("隱藏其他頁", "hide")
+        self.page_out_combo.addItem("最小化其他頁", "minimize")
+        self.page_out_combo.currentIndexChanged.connect(self.change_page_out_mode)
+        self.prev_page_btn = QPushButton("上一頁")
+        self.prev_page_btn.clicked.connect(lambda: self.switch_page(-1))
+        self.next_page_btn = QPushButton("下一頁")
+        self.next_page_btn.clicked.connect(lambda: self.switch_page(1))
+        self.page_label = QLabel()
+        page_layout.addWidget(self.overflow_pages_checkbox)
+        page_layout.addWidget(self.page_out_combo)
+        page_layout.addWidget(self.prev_page_btn)
+        page_layout.addWidget(self.next_page_btn)
+        page_layout.addWidget(self.page_label)
+        page_layout.addStretch()
+        group_layout.addLayout(page_layout)
+
+        # 依視窗狀態降低優先順序、限制 CPU 核心或暫停背景實例
+        throttle_layout = QHBoxLayout()
+        self.throttle_checkbox = QCheckBox("節流背景實例")
+        self.throttle_checkbox.toggled.connect(self.toggle_throttle)
+        self.throttle_combos = {}
+        throttle_layout.addWidget(self.throttle_checkbox)
+        for key, text in (("visible", "未聚焦:"), ("hidden", "其他頁面:"), ("idle", "閒置時:")):
+            combo = QComboBox()
+            for level in THROTTLE_LEVELS:
+                combo.addItem(LEVEL_LABELS[level], level)
+            # 加入選項後才連接，建立期間不更新政策
+            combo.currentIndexChanged.connect(self.update_throttle_policy)
+            self.throttle_combos[key] = combo
+            throttle_layout.addWidget(QLabel(text))
+            throttle_layout.addWidget(combo)
+        idle_label = QLabel("閒置分鐘:")
+        self.idle_minutes_input = QLineEdit()
+        self.idle_minutes_input.setValidator(QIntValidator(0, 1440))
+        self.idle_minutes_input.setFixedWidth(60)
+        self.idle_minutes_input.editingFinished.connect(self.update_throttle_policy)
+        throttle_layout.addWidget(idle_label)
+        throttle_layout.addWidget(self.idle_minutes_input)
+        throttle_layout.addStretch()
+        group_layout.addLayout(throttle_layout)
         
         # 執行按鈕
         btn_layout = QHBoxLayout()
@@ -227,52 +365,139 @@ class MainTab(QWidget):
         
         return group_layout
 
+    def create_window_groups_group(self):
+        """創建多群組排版區域"""
+        group_layout = QVBoxLayout()
+
+        # 標題
+        title_label = QLabel("多群組排版")
+        title_label.setStyleSheet("""
+            QLabel {
+                font-weight: bold;
+                color: #2f3542;
+                font-size: 16px;
+                margin-bottom: 5px;
+            }
+        """)
+        group_layout.addWidget(title_label)
+
+        self.group_editor = GroupEditor(self)
+        group_layout.addWidget(self.group_editor)
+
+        btn_layout = QHBoxLayout()
+        # 忽略各群組的區域，把大小不同的視窗一起緊密排入所有螢幕
+        self.pack_groups_checkbox = QCheckBox("緊密排列不同大小的視窗")
+        self.groups_btn = QPushButton("套用群組")
+        self.groups_btn.clicked.connect(self.manage_groups)
+        btn_layout.addWidget(self.pack_groups_checkbox)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.groups_btn)
+        group_layout.addLayout(btn_layout)
+
+        return group_layout
+
     def load_settings(self):
         """載入設定"""
         settings = self.settings_handler.load_settings()
         
         self.path_display.setText(settings["program_path"])
         self.count_input.setText(settings["execution_count"])
+        self.in_flight_input.setText(settings["max_in_flight"])
+        self.adaptive_launch_checkbox.setChecked(settings["adaptive_launch"])
+        self.functions.rate_controller.thresholds.update(settings["load_thresholds"])
+        self.auto_restart_checkbox.setChecked(settings["auto_restart"])
+        self.restart_hung_checkbox.setChecked(settings["restart_hung"])
         self.window_title_input.setText(settings["window_title"])
         self.width_input.setText(settings["window_width"])
         self.height_input.setText(settings["window_height"])
+        self.strategy_combo.setCurrentIndex(max(0, self.strategy_combo.findData(settings["layout_strategy"])))
+        self.rows_input.setText(settings["layout_rows"])
+        self.columns_input.setText(settings["layout_columns"])
         
         self.remove_title_checkbox.setChecked(settings["remove_title"])
         self.remove_border_checkbox.setChecked(settings["remove_border"])
         self.bypass_limit_checkbox.setChecked(settings["bypass_limit"])
+        self.overflow_pages_checkbox.setChecked(settings["overflow_pages"])
+        self.page_out_combo.setCurrentIndex(max(0, self.page_out_combo.findData(settings["page_out_mode"])))
+        self.functions.throttler.policy = ThrottlePolicy.from_dict(settings["throttle_policy"])
+        self.idle_minutes_input.setText(str(int(self.functions.throttler.policy.idle_minutes)))
+        for key, combo in self.throttle_combos.items():
+            combo.setCurrentIndex(max(0, combo.findData(settings["throttle_policy"].get(key))))
+        self.update_throttle_policy()
+        self.throttle_checkbox.setChecked(settings["throttle_enabled"])
+        self.async_moves_checkbox.setChecked(settings["async_moves"])
+        self.auto_tile_checkbox.setChecked(settings["auto_tile"])
+        self.group_editor.set_groups(settings["window_groups"])
+        self.pack_groups_checkbox.setChecked(settings["pack_groups"])
+        self.live_refresh_checkbox.setChecked(settings["live_refresh"])
 
     def save_settings(self):
         """儲存設定"""
+        # 群組表格內容無效時保留上次儲存的群組
+        groups = self.read_groups()
+        if groups is None:
+            groups = self.settings_handler.load_settings()["window_groups"]
         settings = {
             "program_path": self.path_display.text(),
             "execution_count": self.count_input.text(),
+            "max_in_flight": self.in_flight_input.text(),
+            "adaptive_launch": self.adaptive_launch_checkbox.isChecked(),
+            "load_thresholds": self.functions.rate_controller.thresholds,
+            "auto_restart": self.auto_restart_checkbox.isChecked(),
+            "restart_hung": self.restart_hung_checkbox.isChecked(),
             "window_title": self.window_title_input.text(),
             "window_width": self.width_input.text(),
             "window_height": self.height_input.text(),
+            "layout_strategy": self.strategy_combo.currentData(),
+            "layout_rows": self.rows_input.text(),
+            "layout_columns": self.columns_input.text(),
             "remove_title": self.remove_title_checkbox.isChecked(),
             "remove_border": self.remove_border_checkbox.isChecked(),
-            "bypass_limit": self.bypass_limit_checkbox.isChecked()
+            "bypass_limit": self.bypass_limit_checkbox.isChecked(),
+            "overflow_pages": self.overflow_pages_checkbox.isChecked(),
+            "page_out_mode": self.page_out_combo.currentData(),
+            "throttle_enabled": self.throttle_checkbox.isChecked(),
+            "throttle_policy": self.functions.throttler.policy.as_dict(),
+            "async_moves": self.async_moves_checkbox.isChecked(),
+            "auto_tile": self.auto_tile_checkbox.isChecked(),
+            "window_groups": groups,
+            "pack_groups": self.pack_groups_checkbox.isChecked(),
+            "live_refresh": self.live_refresh_checkbox.isChecked()
         }
         self.settings_handler.save_settings(settings)
         
     def create_window_list_group(self, layout):
         """創建視窗列表區域"""
-        # 建立表格
-        self.window_table = QTableWidget()
-        self.window_table.setColumnCount(8)
-        self.window_table.setHorizontalHeaderLabels(['序號', '視窗名稱', 'HWND',"X","Y", '標題欄', '邊框', '操作'])
+        # 即時更新：合併視窗事件，每秒最多更新數次
+        self.live_refresher = LiveRefresher(self.update_window_list, parent=self)
+        self.functions.window_index.add_listener(self.on_window_event)
+        self.live_refresh_checkbox = QCheckBox("即時更新列表")
+        self.live_refresh_checkbox.toggled.connect(self.toggle_live_refresh)
+        layout.addWidget(self.live_refresh_checkbox)
+
+        # 建立表格，資料由模型提供，只繪製可見的列
+        self.window_model = WindowTableModel(self.functions, self)
+        self.window_table = QTableView()
+        self.window_table.setModel(self.window_model)
+        self.window_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked |
+            QAbstractItemView.EditTrigger.SelectedClicked |
+            QAbstractItemView.EditTrigger.EditKeyPressed
+        )
+        self.apply_delegate = ButtonDelegate(self.window_table)
+        self.apply_delegate.clicked.connect(self.apply_window_changes)
+        self.window_table.setItemDelegateForColumn(COL_APPLY, self.apply_delegate)
         
-        # 設定表格樣式
+        # 設定表格樣式，固定列高與欄寬避免每次更新都量測所有列
+        self.window_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.window_table.verticalHeader().setDefaultSectionSize(36)
         header = self.window_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # 序號
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)          # 視窗名稱
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # HWND
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # X
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Y
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # 標題欄
-        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # 邊框
-        header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)  # 操作
-
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(COL_TITLE, QHeaderView.ResizeMode.Stretch)  # 視窗名稱
+        for column, width in ((COL_ORDER, 60), (COL_HWND, 100), (COL_X, 70), (COL_Y, 70),
+                              (COL_CAPTION, 70), (COL_BORDER, 70), (COL_CPU, 70), (COL_MEMORY, 90),
+                              (COL_HANDLES, 80), (COL_THREADS, 70), (COL_TREND, 160), (COL_HEALTH, 130), (COL_THROTTLE, 110), (COL_APPLY, 80)):
+            self.window_table.setColumnWidth(column, width)
 
         self.window_table.setMinimumHeight(200)
         layout.addWidget(self.window_table)
@@ -283,7 +508,7 @@ class MainTab(QWidget):
             self,
             "選擇執行程式",
             "",
-            "執行檔 (*.exe);;所有檔案 (*.*)"
+            "程式 (*.exe *.lnk *.bat *.cmd);;所有檔案 (*.*)"
         )
         if file_path:
             self.path_display.setText(file_path)
@@ -292,8 +517,76 @@ class MainTab(QWidget):
             program_name = os.path.splitext(os.path.basename(file_path))[0]
             self.window_title_input.setText(program_name)
 
+    def watch_screens(self):
+        """螢幕新增、移除或工作區改變時清除螢幕配置快取"""
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self.screen_added)
+        app.screenRemoved.connect(self.screens_changed)
+        app.primaryScreenChanged.connect(self.screens_changed)
+        for screen in app.screens():
+            self.screen_added(screen)
+
+    def screen_added(self, screen):
+        screen.geometryChanged.connect(self.screens_changed)
+        screen.availableGeometryChanged.connect(self.screens_changed)
+        self.screens_changed()
+
+    def screens_changed(self, *args):
+        self.functions.monitor_topology.invalidate()
+
+    def update_status(self, message: str):
+        """更新主視窗狀態列"""
+        if self.main_window is not None:
+            self.main_window.update_status(message)
+
+    def start_worker(self, worker: Worker, button: QPushButton, on_finished):
+        """在背景執行工作，執行期間按鈕改為取消"""
+        self.active_worker = worker
+        self.active_button = button
+        self.active_button_text = button.text()
+        worker.signals.progress.connect(lambda done, total, message: self.update_status(message))
+        worker.signals.finished.connect(self.worker_finished)
+        worker.signals.finished.connect(on_finished)
+        for btn in (self.execute_btn, self.manage_btn, self.groups_btn):
+            btn.setEnabled(btn is button)
+        button.setText("取消")
+        self.thread_pool.start(worker)
+
+    def worker_finished(self, success: bool, message: str):
+        """背景工作結束後還原按鈕"""
+        self.active_button.setText(self.active_button_text)
+        self.execute_btn.setEnabled(True)
+        self.manage_btn.setEnabled(True)
+        self.groups_btn.setEnabled(True)
+        self.active_worker = None
+        self.update_status(message)
+
+    def run_task(self, name: str, func, on_finished, *args) -> bool:
+        """在背景執行短暫工作，結束後在 UI 執行緒呼叫 on_finished(success, message)
+
+        同名的工作仍在執行時不重複啟動並回傳 False。
+        """
+        if name in self.running_tasks:
+            return False
+        self.running_tasks.add(name)
+        worker = TaskWorker(func, *args)
+        worker.signals.finished.connect(lambda success, message: self.running_tasks.discard(name))
+        worker.signals.finished.connect(on_finished)
+        self.thread_pool.start(worker)
+        return True
+
+    def cancel_worker(self) -> bool:
+        """取消執行中的背景工作"""
+        if self.active_worker is None:
+            return False
+        self.active_worker.cancel()
+        self.update_status("取消中...")
+        return True
+
     def execute_program(self):
         """執行程式"""
+        if self.cancel_worker():
+            return
         program_path = self.path_display.text()
         count = self.count_input.text()
         
@@ -303,16 +596,31 @@ class MainTab(QWidget):
             
         try:
             execution_count = int(count)
-            success, message = self.functions.execute_program(program_path, execution_count)
-            if success:
-                QMessageBox.information(self, "成功", message)
-            else:
-                QMessageBox.warning(self, "錯誤", message)
+            max_in_flight = int(self.in_flight_input.text())
         except ValueError:
             QMessageBox.warning(self, "錯誤", "請輸入有效的執行次數")
+            return
+
+        # 以視窗標題判斷實例是否已開啟
+        worker = Worker(
+            self.functions.execute_program, program_path, execution_count,
+            title=self.window_title_input.text() or None,
+            max_in_flight=max_in_flight,
+            adaptive=self.adaptive_launch_checkbox.isChecked()
+        )
+        self.start_worker(worker, self.execute_btn, self.execute_finished)
+
+    def execute_finished(self, success: bool, message: str):
+        """程式執行完成"""
+        if success:
+            QMessageBox.information(self, "成功", message)
+        else:
+            QMessageBox.warning(self, "錯誤", message)
 
     def manage_windows(self):
         """管理視窗"""
+        if self.cancel_worker():
+            return
         # 獲取輸入值
         title = self.window_title_input.text()
         try:
@@ -322,13 +630,67 @@ class MainTab(QWidget):
             remove_border = self.remove_border_checkbox.isChecked()
             bypass_limit = self.bypass_limit_checkbox.isChecked()
             dont_movewindow = self.dont_movewindow_checkbox.isChecked()
+            strategy, rows, columns = self.layout_strategy()
         except ValueError:
-            QMessageBox.warning(self, "錯誤", "請輸入有效的視窗大小")
+            QMessageBox.warning(self, "錯誤", "請輸入有效的視窗大小與列欄數")
             return
 
+        # 自動排版沿用最新的設定
+        if self.auto_tile_checkbox.isChecked():
+            self.toggle_auto_tile(True)
+
         # 調用功能
-        success, message = self.functions.manage_windows(title, width, height,remove_title,remove_border,bypass_limit,dont_movewindow)
-        
+        worker = Worker(
+            self.functions.manage_windows, title, width, height,
+            remove_title=remove_title,
+            dont_movewindow=dont_movewindow,
+            remove_border=remove_border,
+            bypass_limit=bypass_limit,
+            strategy=strategy,
+            rows=rows,
+            columns=columns
+        )
+        self.start_worker(worker, self.manage_btn, self.manage_finished)
+
+    def layout_strategy(self):
+        """讀取排版方式，自訂列欄時列數或欄數無效會拋出 ValueError"""
+        strategy = self.strategy_combo.currentData()
+        if strategy != 'custom':
+            return strategy, 0, 0
+        rows, columns = int(self.rows_input.text()), int(self.columns_input.text())
+        if rows <= 0 or columns <= 0:
+            raise ValueError("列數與欄數必須大於 0")
+        return strategy, rows, columns
+
+    def read_groups(self):
+        """讀取群組表格，內容無效時回傳 None"""
+        try:
+            return self.group_editor.get_groups()
+        except ValueError:
+            return None
+
+    def manage_groups(self):
+        """依群組表格一次排版多組視窗"""
+        if self.cancel_worker():
+            return
+        groups = self.read_groups()
+        if groups is None:
+            QMessageBox.warning(self, "錯誤", "請輸入有效的視窗大小與螢幕編號")
+            return
+        if not groups:
+            QMessageBox.warning(self, "錯誤", "請先新增群組")
+            return
+        try:
+            window_groups = [WindowGroup.from_dict(group) for group in groups]
+        except Exception as e:
+            QMessageBox.warning(self, "錯誤", f"群組設定無效: {str(e)}")
+            return
+
+        worker = Worker(self.functions.manage_groups, window_groups, pack=self.pack_groups_checkbox.isChecked())
+        self.start_worker(worker, self.groups_btn, self.manage_finished)
+
+    def manage_finished(self, success: bool, message: str):
+        """視窗管理完成"""
         # 更新視窗列表
         if success:
             self.update_window_list()
@@ -336,66 +698,168 @@ class MainTab(QWidget):
         else:
             QMessageBox.warning(self, "錯誤", message)
 
+    def toggle_auto_restart(self, enabled: bool):
+        """開啟或關閉結束實例的自動重啟"""
+        self.functions.supervisor.enabled = enabled
+
+    def toggle_restart_hung(self, enabled: bool):
+        """開啟或關閉無回應視窗的重新啟動"""
+        self.functions.restart_hung = enabled
+
+    def toggle_overflow_pages(self, enabled: bool):
+        """開啟或關閉超出視窗的虛擬分頁"""
+        self.functions.overflow_pages = enabled
+
+    def change_page_out_mode(self, index: int):
+        """切換其他頁面視窗的處理方式，下次換頁時生效"""
+        self.functions.page_out_mode = self.page_out_combo.itemData(index)
+
+    def toggle_throttle(self, enabled: bool):
+        """開啟或關閉背景實例節流，關閉後下一次檢查時恢復所有行程"""
+        if enabled and self.functions.throttler.controller is None:
+            QMessageBox.warning(self, "錯誤", "此平台不支援調整行程的排程設定")
+            self.throttle_checkbox.setChecked(False)
+            return
+        self.functions.throttler.enabled = enabled
+
+    def update_throttle_policy(self, *args):
+        """依目前的選項更新節流政策"""
+        try:
+            idle_minutes = int(self.idle_minutes_input.text() or 0)
+        except ValueError:
+            idle_minutes = 0
+        levels = {key: combo.currentData() for key, combo in self.throttle_combos.items()}
+        self.functions.throttler.policy = ThrottlePolicy(
+            levels["visible"], levels["hidden"], levels["idle"], idle_minutes,
+            self.functions.throttler.policy.affinity_cpus)
+
+    def switch_page(self, step: int):
+        """在背景切換到上一頁或下一頁，切換期間停用換頁按鈕"""
+        if self.run_task('switch_page', self.functions.switch_page, self.switch_page_finished,
+                         self.functions.active_page + step):
+            self.prev_page_btn.setEnabled(False)
+            self.next_page_btn.setEnabled(False)
+
+    def switch_page_finished(self, success: bool, message: str):
+        """換頁完成後更新列表與頁碼"""
+        self.update_status(message)
+        self.update_window_list()
+
+    def update_page_label(self):
+        """顯示目前頁碼與每頁的視窗數量"""
+        occupancy = self.functions.page_occupancy()
+        capacity = self.functions.page_capacity()
+        active = self.functions.active_page
+        pages = "、".join(f"{page + 1}: {count}/{capacity}" for page, count in enumerate(occupancy))
+        self.page_label.setText(f"第 {active + 1}/{len(occupancy)} 頁（{pages}）")
+        self.prev_page_btn.setEnabled(active > 0)
+        self.next_page_btn.setEnabled(active + 1 < len(occupancy))
+
+    def toggle_async_moves(self, enabled: bool):
+        """切換以 SWP_ASYNCWINDOWPOS 移動視窗"""
+        self.functions.window_writer.async_moves = enabled
+
+    def toggle_auto_tile(self, enabled: bool):
+        """開啟時以目前的標題、大小與樣式設定自動排列新出現的視窗"""
+        if not enabled:
+            self.functions.stop_watch()
+            return
+        title = self.window_title_input.text()
+        try:
+            width = int(self.width_input.text())
+            height = int(self.height_input.text())
+            strategy, rows, columns = self.layout_strategy()
+        except ValueError:
+            width = height = 0
+        if not title or width <= 0 or height <= 0:
+            QMessageBox.warning(self, "錯誤", "請先輸入視窗標題、有效的視窗大小與列欄數")
+            self.auto_tile_checkbox.setChecked(False)
+            return
+        self.functions.start_watch(
+            title, width, height,
+            remove_title=self.remove_title_checkbox.isChecked(),
+            remove_border=self.remove_border_checkbox.isChecked(),
+            bypass_limit=self.bypass_limit_checkbox.isChecked(),
+            strategy=strategy,
+            rows=rows,
+            columns=columns,
+            on_tiled=self.auto_tiled.emit
+        )
+        self.update_status(f"自動排列標題為 {title} 的新視窗")
+
+    def auto_tile_finished(self, success: bool, message: str):
+        """自動排版完成後更新列表"""
+        self.update_status(message)
+        if success:
+            self.update_window_list()
+
+    def restore_slots(self):
+        """在背景接回上次保存格位的視窗"""
+        self.run_task('restore_slots', self.functions.restore_slots, self.restore_slots_finished)
+
+    def restore_slots_finished(self, success: bool, message: str):
+        """回報接回的視窗並更新列表"""
+        if message:
+            self.update_status(message)
+        if success:
+            self.update_window_list()
+
+    def supervise_processes(self):
+        """在背景檢查受監控的行程，上次檢查尚未結束時略過"""
+        self.run_task('supervise', self.functions.supervise, self.supervise_finished)
+
+    def supervise_finished(self, success: bool, message: str):
+        """回報實例結束與重新啟動"""
+        if message:
+            self.update_status(message)
+            self.update_window_list()
+
     def update_window_list(self):
-        """更新視窗列表"""
-        window_list = self.functions.get_window_list()
-        self.window_table.setRowCount(len(window_list))
-        
-        # 首先设置整个表格的列宽
-        header = self.window_table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        
-        for row, window in enumerate(window_list):
-            # 序號
-            self.window_table.setItem(row, 0, QTableWidgetItem(str(window['order'])))
-            
-            # 視窗名稱
-            title_edit = QLineEdit(window['title'])
-            self.window_table.setCellWidget(row, 1, title_edit)
-            self.window_table.setColumnWidth(1, 50)
+        """更新視窗列表；索引需要完整列舉時先在背景列舉，不在 UI 執行緒等待"""
+        if self.functions.window_index.stale:
+            # 列舉進行中時不重複啟動，完成後會更新列表
+            self.run_task('refresh_index', self.functions.refresh_window_index,
+                          lambda success, message: self.show_window_list())
+        else:
+            self.show_window_list()
 
-            # HWND
-            self.window_table.setItem(row, 2, QTableWidgetItem(str(window['hwnd'])))
-            
-            self.window_table.setItem(row, 3, QTableWidgetItem(str(window['X'])))
-            self.window_table.setItem(row, 4, QTableWidgetItem(str(window['Y'])))
-            # 標題欄 Checkbox
-            title_check = QCheckBox()
-            title_check.setChecked(not window['has_caption'])
-            self.window_table.setCellWidget(row, 5, title_check)
-            
-            # 邊框 Checkbox
-            border_check = QCheckBox()
-            border_check.setChecked(not window['has_border'])
-            self.window_table.setCellWidget(row, 6, border_check)
-            
-            # 應用按鈕
-            apply_btn = QPushButton("應用")
-            apply_btn.clicked.connect(lambda checked, r=row: self.apply_window_changes(r))
-            self.window_table.setCellWidget(row, 7, apply_btn)
+    def show_window_list(self):
+        """以索引目前的內容更新視窗列表"""
+        self.window_model.set_windows(self.functions.listed_windows())
+        self.update_page_label()
+
+    def toggle_live_refresh(self, enabled: bool):
+        """開啟或關閉即時更新"""
+        if enabled:
+            self.live_refresher.start()
+        else:
+            self.live_refresher.stop()
+
+    def on_window_event(self, event: str, hwnd: int):
+        """已管理視窗有變動時排程更新，可能在非 UI 執行緒呼叫"""
+        if hwnd in self.functions.window_positions:
+            self.live_refresher.notify()
 
     def apply_window_changes(self, row):
         """應用視窗變更"""
-        hwnd = int(self.window_table.item(row, 2).text())
-        new_title = self.window_table.cellWidget(row, 1).text()
-        remove_title = self.window_table.cellWidget(row, 5).isChecked()
-        remove_border = self.window_table.cellWidget(row, 6).isChecked()
+        values = self.window_model.row_values(row)
+        hwnd = values['hwnd']
         
         # 更新標題
-        success, message = self.functions.update_window_title(hwnd, new_title)
+        success, message = self.functions.update_window_title(hwnd, values['title'])
         if not success:
             QMessageBox.warning(self, "錯誤", f"更新標題失敗: {message}")
             return
             
         # 更新樣式
-        success, message = self.functions.update_window_style(hwnd, remove_title, remove_border)
+        success, message = self.functions.update_window_style(hwnd, values['remove_title'], values['remove_border'])
         if not success:
             QMessageBox.warning(self, "錯誤", f"更新樣式失敗: {message}")
             return
         
         # 更新位置
-        x = int(self.window_table.item(row, 3).text())
-        y = int(self.window_table.item(row, 4).text())
+        x = values['X']
+        y = values['Y']
         width = int(self.width_input.text())
         height = int(self.height_input.text())
         
@@ -404,7 +868,8 @@ class MainTab(QWidget):
             QMessageBox.warning(self, "錯誤", f"更新位置失敗: {message}")
             return
 
-
+        self.window_model.clear_edits(hwnd)
+        self.update_window_list()
         QMessageBox.information(self, "成功", "已更新視窗設定")
 
 
@@ -0,0 +1,15 @@
+import pytest
+
+from functions.window_backend import SimulatedBackend
+from functions.MainTab_functions import MainTabFunctions
+
+
+@pytest.fixture
+def backend():
+    return SimulatedBackend([{'left': 0, 'top': 0, 'width': 1920, 'height': 1080}])
+
+
+@pytest.fixture
+def functions(backend):
+    """使用模擬桌面、不保存格位也不啟動背景執行緒的 MainTabFunctions"""
+    return MainTabFunctions(backend)
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from functions.auto_tiler import AutoTiler
+from functions.window_index import WindowIndex
+
+
+def _tiler_threads():
+    return [thread for thread in threading.enumerate() if thread.name == 'AutoTiler']
+
+
+def test_restart_while_tiling_leaves_one_thread(backend):
+    index = WindowIndex(backend)
+    entered = threading.Event()
+    callers = []
+
+    def tile():
+        callers.append(threading.get_ident())
+        entered.set()
+        time.sleep(0.2)
+        return True, ""
+
+    tiler = AutoTiler(index, tile, lambda hwnd: True, quiet=0.01, max_delay=0.05)
+    tiler.start()
+    backend.create_window('T')
+    assert entered.wait(1)
+    old_thread = tiler._thread
+    # 排版仍在進行時重新開始監看
+    tiler.stop()
+    tiler.start()
+    old_thread.join(1)
+    assert not old_thread.is_alive()
+    assert len(_tiler_threads()) == 1
+
+    backend.create_window('T')
+    deadline = time.monotonic() + 1
+    while len(callers) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert callers[-1] == tiler._thread.ident
+    tiler.stop()
+    tiler._thread.join(1)
+    assert not _tiler_threads()
+
+
+def test_start_does_not_enumerate_on_the_calling_thread(backend):
+    backend.create_window('T')
+    index = WindowIndex(backend)
+    tiled = threading.Event()
+    callers = []
+    ensure_fresh = index.ensure_fresh
+
+    def record_ensure_fresh():
+        callers.append(threading.get_ident())
+        return ensure_fresh()
+
+    def tile():
+        tiled.set()
+        return True, ""
+
+    index.ensure_fresh = record_ensure_fresh
+    tiler = AutoTiler(index, tile, lambda hwnd: True, quiet=0.01, max_delay=0.05)
+    tiler.start()
+    # 啟動時已存在的視窗仍由監看執行緒列舉並排版
+    assert tiled.wait(1)
+    assert callers and threading.get_ident() not in callers
+    tiler.stop()
+    tiler._thread.join(1)
@@ -0,0 +1,49 @@
+from functions.bin_packer import MaxRectsBin, WindowPacker
+
+SCREEN = {'left': 0, 'top': 0, 'width': 1920, 'height': 1080}
+
+
+def test_release_restores_full_screen():
+    packer = WindowPacker()
+    packer.configure([SCREEN])
+    for hwnd, (width, height) in enumerate([(960, 360), (960, 480), (960, 540)]):
+        assert packer.place(hwnd, width, height) is not None
+    for hwnd in (0, 2, 1):
+        assert packer.remove(hwnd)
+    assert packer.bins[0].free == [(0, 0, 1920, 1080)]
+    assert packer.place(3, 1920, 1080) == (0, 0)
+
+
+def test_release_rebuilds_maximal_free_rects():
+    packing_bin = MaxRectsBin(SCREEN)
+    packing_bin.insert(0, 0, 960, 540)
+    packing_bin.insert(960, 0, 960, 540)
+    packing_bin.insert(0, 540, 960, 540)
+    packing_bin.release(960, 0, 960, 540)
+    packing_bin.release(0, 0, 960, 540)
+    # 上半部兩個視窗移除後應得到整個上半部的空閒矩形
+    assert packing_bin.find(1920, 540) is not None
+    assert packing_bin.used_area == 960 * 540
+
+
+def test_add_remove_keeps_other_windows():
+    packer = WindowPacker()
+    packer.configure([SCREEN, {'left': 1920, 'top': 0, 'width': 1280, 'height': 1024}])
+    positions = {hwnd: packer.place(hwnd, 640, 360) for hwnd in range(8)}
+    assert all(position is not None for position in positions.values())
+    packer.remove(3)
+    for hwnd in range(8):
+        if hwnd != 3:
+            assert packer.placements[hwnd][1:3] == positions[hwnd]
+    # 空出的位置再放入相同大小的視窗
+    assert packer.place(8, 640, 360) == positions[3]
+
+
+def test_copy_is_independent():
+    packer = WindowPacker()
+    packer.configure([SCREEN])
+    packer.place(1, 960, 540)
+    other = packer.copy()
+    other.remove(1)
+    assert 1 in packer.placements
+    assert packer.bins[0].used_area == 960 * 540
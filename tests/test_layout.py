@@ -0,0 +1,76 @@
+from functions.window_matcher import WindowGroup
+
+
+def _rects(backend, hwnds):
+    return [backend.get_window_rect(hwnd) for hwnd in hwnds]
+
+
+def _overlapping(rects):
+    return any(a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+               for index, a in enumerate(rects) for b in rects[index + 1:])
+
+
+def test_retile_commits_in_one_batch(backend, functions):
+    hwnds = backend.create_windows('T', 20)
+    assert functions.manage_windows('T', 384, 216)[0]
+    assert backend.call_counts['batch_commit'] == 1
+
+    # 改變視窗大小時 20 個視窗仍在同一批次中移動
+    backend.reset_counts()
+    assert functions.manage_windows('T', 480, 216)[0]
+    assert backend.call_counts['batch_commit'] == 1
+    assert not _overlapping(_rects(backend, hwnds))
+    assert all(right - left == 480 and bottom - top == 216 for left, top, right, bottom in _rects(backend, hwnds))
+
+
+def test_reapply_without_changes_makes_no_backend_calls(backend, functions):
+    backend.create_windows('T', 20)
+    assert functions.manage_windows('T', 384, 216)[0]
+    backend.reset_counts()
+    success, message = functions.manage_windows('T', 384, 216)
+    assert success
+    assert backend.call_counts == {}
+
+
+def test_dry_run_leaves_windows_and_slots_untouched(backend, functions):
+    hwnds = backend.create_windows('T', 4)
+    assert functions.manage_windows('T', 480, 344)[0]
+    before = _rects(backend, hwnds)
+
+    backend.reset_counts()
+    success, message = functions.manage_windows('T', 640, 360, dry_run=True)
+    assert success and message.startswith('預計執行')
+    assert backend.call_counts == {}
+    assert _rects(backend, hwnds) == before
+
+    assert functions.manage_windows('T', 640, 360)[0]
+    rects = _rects(backend, hwnds)
+    assert not _overlapping(rects)
+    assert all(right - left == 640 for left, _, right, _ in rects)
+
+
+def test_failed_plan_keeps_existing_slots(backend, functions):
+    backend.create_windows('T', 4)
+    assert functions.manage_windows('T', 640, 360)[0]
+    backend.create_windows('T', 9)
+    success, message = functions.manage_windows('T', 480, 344)
+    assert not success and message == "螢幕空間不足，請關閉多餘的視窗"
+    # 失敗的計畫不影響目前的格位
+    assert functions.slot_allocator.cell_width == 640
+    assert functions.slot_allocator.free_count == functions.slot_allocator.capacity - 4
+
+
+def test_packed_groups_keep_placed_windows(backend, functions):
+    large = backend.create_windows('Large', 2, width=960, height=540)
+    small = backend.create_windows('Small', 4, width=480, height=270)
+    groups = [WindowGroup('large', 'exact', 'Large', 960, 540), WindowGroup('small', 'exact', 'Small', 480, 270)]
+    assert functions.manage_groups(groups, pack=True)[0]
+    placed = dict(zip(large + small, _rects(backend, large + small)))
+    assert not _overlapping(list(placed.values()))
+
+    backend.destroy_window(large[0])
+    backend.reset_counts()
+    assert functions.manage_groups(groups, pack=True)[0]
+    for hwnd in large[1:] + small:
+        assert backend.get_window_rect(hwnd) == placed[hwnd]
+    assert large[0] not in functions.packer.placements
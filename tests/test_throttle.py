@@ -0,0 +1,96 @@
+import json
+import time
+
+from functions.process_throttle import InstanceThrottler, SimulatedProcessController, ThrottlePolicy
+
+
+def _throttler(states, **kwargs):
+    throttler = InstanceThrottler(SimulatedProcessController(), lambda: states, **kwargs)
+    throttler.enabled = True
+    throttler.policy = ThrottlePolicy(visible='normal', hidden='suspended', idle='low', idle_minutes=1)
+    return throttler
+
+
+def test_levels_follow_policy():
+    states = {101: (True, True), 102: (False, True), 103: (False, False)}
+    throttler = _throttler(states)
+    controller = throttler.controller
+    now = time.monotonic()
+    throttler.tick(now)
+    assert [throttler.level_of(pid) for pid in (101, 102, 103)] == ['normal', 'normal', 'suspended']
+    assert controller.applied[103] == {'priority', 'affinity', 'suspended'}
+
+    # 狀態沒有改變時不呼叫控制器
+    calls = controller.calls
+    throttler.tick(now)
+    assert controller.calls == calls
+
+    # 閒置超過 idle_minutes 的顯示中實例降低優先順序
+    throttler.tick(now + 61)
+    assert throttler.level_of(102) == 'low'
+    assert throttler.counts() == {'normal': 1, 'low': 1, 'limited': 0, 'suspended': 1}
+
+
+def test_wake_resumes_and_holds_for_grace():
+    states = {201: (False, False)}
+    throttler = _throttler(states, grace=3.0)
+    now = time.monotonic()
+    throttler.tick(now)
+    assert throttler.level_of(201) == 'suspended'
+
+    assert throttler.wake([201]) == 1
+    assert throttler.level_of(201) == 'normal'
+    assert 'suspended' not in throttler.controller.applied[201]
+    throttler.tick(time.monotonic())
+    assert throttler.level_of(201) == 'normal'
+    throttler.tick(time.monotonic() + 10)
+    assert throttler.level_of(201) == 'suspended'
+
+
+def test_disable_and_removed_instances_restore_processes():
+    states = {301: (False, False), 302: (False, False)}
+    throttler = _throttler(states)
+    throttler.tick()
+    del states[302]
+    throttler.tick()
+    assert 302 not in throttler.controller.applied
+    throttler.enabled = False
+    throttler.tick()
+    assert throttler.counts()['suspended'] == 0
+    assert not throttler.controller.applied
+
+
+def test_suspended_pids_are_recorded_and_resumed(tmp_path):
+    path = str(tmp_path / 'suspended.json')
+    throttler = _throttler({401: (False, False)}, state_path=path)
+    throttler.tick()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {'suspended': [401]}
+
+    # 模擬異常結束後重新啟動：新的節流器恢復紀錄中的行程並刪除檔案
+    restarted = InstanceThrottler(SimulatedProcessController(), lambda: {}, state_path=path)
+    restarted.controller.applied[401] = {'suspended'}
+    restarted.start()
+    restarted.stop()
+    assert not tmp_path.joinpath('suspended.json').exists()
+    assert restarted.controller.applied.get(401, set()) == set()
+
+
+def test_throttler_follows_managed_windows(backend, functions):
+    backend.create_windows('W', 20)
+    functions.overflow_pages = True
+    assert functions.manage_windows('W', 640, 540, bypass_limit=True)[0]
+    throttler = functions.throttler
+    throttler.enabled = True
+    throttler.policy = ThrottlePolicy(visible='normal', hidden='suspended')
+    throttler.tick()
+    assert throttler.counts()['suspended'] == 14
+
+    # 換頁時先恢復要顯示的實例
+    assert functions.switch_page(1)[0]
+    shown = [pos.pid for pos in functions.window_positions.records() if pos.page == 1]
+    assert all(throttler.level_of(pid) == 'normal' for pid in shown)
+    # 聚焦的視窗立即恢復
+    hidden = next(pos for pos in functions.window_positions.records() if pos.page == 2)
+    backend.set_foreground(hidden.hwnd)
+    assert throttler.level_of(hidden.pid) == 'normal'
@@ -0,0 +1,36 @@
+from functions.window_registry import ManagedWindow, WindowRegistry
+
+
+def _registry():
+    registry = WindowRegistry()
+    for hwnd, order, pid, group in ((10, 3, 100, 'a'), (11, 1, 100, 'b'), (12, 2, 101, 'a'), (13, 4, 100, 'a')):
+        registry.add(ManagedWindow(hwnd, hwnd * 10, 0, order, pid, group))
+    return registry
+
+
+def test_group_and_pid_lookups_follow_order():
+    registry = _registry()
+    assert [window.hwnd for window in registry.records()] == [11, 12, 10, 13]
+    assert [window.hwnd for window in registry.in_group('a')] == [12, 10, 13]
+    assert [window.hwnd for window in registry.find_by_pid(100)] == [11, 10, 13]
+    assert registry.pids() == {100, 101}
+
+
+def test_indexes_follow_replacement_and_removal():
+    registry = _registry()
+    registry.add(ManagedWindow(10, 100, 0, 3, 102, 'b'))
+    assert [window.hwnd for window in registry.in_group('a')] == [12, 13]
+    assert [window.hwnd for window in registry.in_group('b')] == [11, 10]
+    assert [window.hwnd for window in registry.find_by_pid(100)] == [11, 13]
+    registry.pop(12)
+    assert registry.pids() == {100, 102}
+    assert registry.in_group('missing') == []
+    assert registry.at_slot('a', 120, 0) is None
+
+
+def test_records_is_a_snapshot():
+    registry = _registry()
+    records = registry.records()
+    registry.pop(11)
+    assert [window.hwnd for window in records] == [11, 12, 10, 13]
+    assert len(registry) == 3
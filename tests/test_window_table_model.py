@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+from window_table_model import WindowTableModel, COL_TITLE
+
+
+def _model(functions):
+    model = WindowTableModel(functions)
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles=(): changed.append(
+        (first.row(), first.column(), last.row(), last.column())))
+    return model, changed
+
+
+def test_refresh_without_changes_emits_nothing(backend, functions):
+    backend.create_windows('T', 5)
+    assert functions.manage_windows('T', 384, 216)[0]
+    model, changed = _model(functions)
+    model.set_windows(functions.listed_windows())
+    assert model.rowCount() == 5
+
+    model.set_windows(functions.listed_windows())
+    assert changed == []
+
+
+def test_refresh_emits_only_changed_cells(backend, functions):
+    hwnds = backend.create_windows('T', 5)
+    assert functions.manage_windows('T', 384, 216)[0]
+    model, changed = _model(functions)
+    model.set_windows(functions.listed_windows())
+
+    backend.rename_window(hwnds[2], 'T renamed')
+    functions.window_index.ensure_fresh()
+    model.set_windows(functions.listed_windows())
+    row = model.row_of(hwnds[2])
+    assert changed == [(row, COL_TITLE, row, COL_TITLE)]
@@ -0,0 +1,13 @@
+def test_batch_timeout_is_reported_as_deferred(backend, functions, monkeypatch):
+    hwnds = backend.create_windows('T', 4)
+    assert functions.manage_windows('T', 384, 216)[0]
+
+    # 視窗卡住但系統尚未判定為無回應，批次移動會超過期限
+    backend.hang_time = 0.3
+    functions.window_writer.deadline = 0.05
+    backend.set_window_hung(hwnds[1], True)
+    monkeypatch.setattr(backend, 'is_hung', lambda hwnd: False)
+    success, message = functions.manage_windows('T', 480, 216)
+    assert success
+    assert "4 個視窗未回應，已排入重試" in message
+    assert functions.window_writer.pending_count == 4
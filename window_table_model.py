@@ -0,0 +1,270 @@
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+from functions.window_backend import WS_CAPTION, WS_THICKFRAME
+from functions.window_index import WindowInfo
+from functions.window_registry import ManagedWindow
+
+COLUMNS = ['序號', '視窗名稱', 'HWND', "X", "Y", '標題欄', '邊框', 'CPU%', '記憶體(MB)', '控制代碼', '執行緒', 'CPU 走勢',
+           '回應', '節流', '操作']
+(COL_ORDER, COL_TITLE, COL_HWND, COL_X, COL_Y, COL_CAPTION, COL_BORDER,
+ COL_CPU, COL_MEMORY, COL_HANDLES, COL_THREADS, COL_TREND, COL_HEALTH, COL_THROTTLE, COL_APPLY) = range(len(COLUMNS))
+HUNG_COLOR = QColor('#ffe0e0')
+# 資源使用量欄位在最新讀數中的位置與顯示格式，尚未取樣時顯示空白
+METRIC_FORMATS = {COL_CPU: (0, '{:.1f}'), COL_MEMORY: (1, '{:.0f}'),
+                  COL_HANDLES: (2, '{}'), COL_THREADS: (3, '{}')}
+# 列快照中每個值影響的欄範圍；走勢由資源讀數計算，無回應狀態改變整列的背景
+SNAPSHOT_SPANS = ((COL_ORDER, COL_ORDER), (COL_TITLE, COL_TITLE), (COL_X, COL_X), (COL_Y, COL_Y),
+                  (COL_CAPTION, COL_BORDER), (COL_CPU, COL_TREND), (COL_HEALTH, COL_HEALTH),
+                  (COL_THROTTLE, COL_THROTTLE), (COL_ORDER, COL_APPLY))
+
+
+class WindowTableModel(QAbstractTableModel):
+    """已管理視窗列表的資料模型
+
+    直接保存登錄表紀錄的快照，只複製參照；儲存格的值在 QTableView 繪製
+    可見的列時才從視窗索引、資源取樣與回應探測讀取，重新整理時不為每個
+    視窗建立資料。重新整理時以 hwnd 比對，只發出新增與移除的列層級更新，
+    其餘列與上次重新整理的快照比較，只對有改變的欄範圍發出 dataChanged。
+    使用者尚未套用的編輯另外保存，不會被重新整理覆蓋。
+    """
+
+    def __init__(self, functions, parent=None):
+        super().__init__(parent)
+        self.functions = functions
+        self._rows: List[ManagedWindow] = []
+        self._row_of: Dict[int, int] = {}
+        self._edits: Dict[int, Dict] = {}
+        self._snapshots: Dict[int, Tuple] = {}
+
+    # 資料讀取
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def _info(self, window: ManagedWindow) -> Optional[WindowInfo]:
+        return self.functions.window_index.get(window.hwnd)
+
+    def _pid(self, window: ManagedWindow) -> Optional[int]:
+        info = self._info(window)
+        return info.pid if info is not None else window.pid
+
+    def _title(self, window: ManagedWindow) -> str:
+        info = self._info(window)
+        return info.title if info is not None else window.title
+
+    def _style(self, window: ManagedWindow) -> int:
+        info = self._info(window)
+        return info.style if info is not None else 0
+
+    def _snapshot(self, window: ManagedWindow) -> Tuple:
+        """回傳列中會改變的值，順序與 SNAPSHOT_SPANS 相同"""
+        hwnd = window.hwnd
+        info = self._info(window)
+        pid = info.pid if info is not None else window.pid
+        return (
+            window.order,
+            info.title if info is not None else window.title,
+            window.x,
+            window.y,
+            info.style & (WS_CAPTION | WS_THICKFRAME) if info is not None else 0,
+            self.functions.process_metrics.latest(pid),
+            self.functions.health_probe.summary(hwnd),
+            self.functions.throttler.summary(pid),
+            self.functions.health_probe.is_hung(hwnd),
+        )
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        window = self._rows[index.row()]
+        hwnd = window.hwnd
+        column = index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if column == COL_ORDER:
+                return str(window.order)
+            if column == COL_TITLE:
+                return self.pending(hwnd, 'title', self._title(window))
+            if column == COL_HWND:
+                return str(hwnd)
+            if column == COL_X:
+                return str(window.x)
+            if column == COL_Y:
+                return str(window.y)
+            if column in METRIC_FORMATS:
+                position, fmt = METRIC_FORMATS[column]
+                metrics = self.functions.process_metrics.latest(self._pid(window))
+                return fmt.format(metrics[position]) if metrics is not None else ""
+            if column == COL_TREND:
+                return self.functions.process_metrics.trend(self._pid(window))
+            if column == COL_HEALTH:
+                return self.functions.health_probe.summary(hwnd)
+            if column == COL_THROTTLE:
+                return self.functions.throttler.summary(self._pid(window))
+            if column == COL_APPLY:
+                return "應用"
+        elif role == Qt.ItemDataRole.BackgroundRole:
+            # 無回應的視窗整列標示
+            return HUNG_COLOR if self.functions.health_probe.is_hung(hwnd) else None
+        elif role == Qt.ItemDataRole.CheckStateRole:
+            # 勾選代表移除標題欄/邊框
+            if column == COL_CAPTION:
+                checked = self.pending(hwnd, 'remove_title', not self._style(window) & WS_CAPTION)
+            elif column == COL_BORDER:
+                checked = self.pending(hwnd, 'remove_border', not self._style(window) & WS_THICKFRAME)
+            else:
+                return None
+            return Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == COL_TITLE:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        elif index.column() in (COL_CAPTION, COL_BORDER):
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        hwnd = self._rows[index.row()].hwnd
+        column = index.column()
+        if column == COL_TITLE and role == Qt.ItemDataRole.EditRole:
+            self._edits.setdefault(hwnd, {})['title'] = str(value)
+        elif column in (COL_CAPTION, COL_BORDER) and role == Qt.ItemDataRole.CheckStateRole:
+            key = 'remove_title' if column == COL_CAPTION else 'remove_border'
+            self._edits.setdefault(hwnd, {})[key] = Qt.CheckState(value) == Qt.CheckState.Checked
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    # 編輯狀態
+    def pending(self, hwnd: int, key: str, default):
+        """回傳尚未套用的編輯值，沒有編輯時回傳 default"""
+        return self._edits.get(hwnd, {}).get(key, default)
+
+    def row_values(self, row: int) -> Dict:
+        """回傳列的目前值（包含尚未套用的編輯）"""
+        window = self._rows[row]
+        hwnd = window.hwnd
+        style = self._style(window)
+        return {
+            'hwnd': hwnd,
+            'title': self.pending(hwnd, 'title', self._title(window)),
+            'remove_title': self.pending(hwnd, 'remove_title', not style & WS_CAPTION),
+            'remove_border': self.pending(hwnd, 'remove_border', not style & WS_THICKFRAME),
+            'X': window.x,
+            'Y': window.y,
+        }
+
+    def clear_edits(self, hwnd: int) -> None:
+        """清除已套用的編輯"""
+        self._edits.pop(hwnd, None)
+
+    # 列層級更新
+    def set_windows(self, windows: List[ManagedWindow]) -> None:
+        """以登錄表紀錄的快照更新模型，只對新增與移除的視窗發出列層級通知"""
+        new_hwnds = [window.hwnd for window in windows]
+        keep = set(new_hwnds)
+
+        # 移除已不存在的視窗，連續的列合併為一次通知
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row].hwnd in keep:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._rows[row].hwnd not in keep:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            for window in self._rows[row + 1:last + 1]:
+                self._edits.pop(window.hwnd, None)
+            del self._rows[row + 1:last + 1]
+            self.endRemoveRows()
+
+        old_hwnds = [window.hwnd for window in self._rows]
+        old_set = set(old_hwnds)
+        remaining = [hwnd for hwnd in new_hwnds if hwnd in old_set]
+        if not old_hwnds or remaining != old_hwnds:
+            # 首次載入或既有視窗的順序改變，直接重設模型
+            self.beginResetModel()
+            self._rows = list(windows)
+            self._reindex()
+            self._snapshots = {window.hwnd: self._snapshot(window) for window in self._rows}
+            self.endResetModel()
+            return
+
+        row = 0
+        while row < len(windows):
+            if row < len(self._rows) and self._rows[row].hwnd == windows[row].hwnd:
+                # 排版後紀錄可能被取代
+                self._rows[row] = windows[row]
+                row += 1
+                continue
+            # 連續的新視窗合併為一次插入
+            end = row
+            while end < len(windows) and windows[end].hwnd not in old_set:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            self._rows[row:row] = windows[row:end]
+            self.endInsertRows()
+            row = end
+        self._reindex()
+        self._emit_changed_cells()
+
+    def _emit_changed_cells(self) -> None:
+        """與上次的快照比較，每列只對有改變的欄範圍發出 dataChanged"""
+        previous = self._snapshots
+        self._snapshots = {}
+        for row, window in enumerate(self._rows):
+            snapshot = self._snapshot(window)
+            self._snapshots[window.hwnd] = snapshot
+            old = previous.get(window.hwnd)
+            if old is None:
+                # 新插入的列由 endInsertRows 通知
+                continue
+            first = last = None
+            for (start, end), before, after in zip(SNAPSHOT_SPANS, old, snapshot):
+                if before != after:
+                    first = start if first is None else min(first, start)
+                    last = end if last is None else max(last, end)
+            if first is not None:
+                self.dataChanged.emit(self.index(row, first), self.index(row, last))
+
+    def row_of(self, hwnd: int) -> int:
+        """回傳 hwnd 所在的列，不存在時回傳 -1"""
+        return self._row_of.get(hwnd, -1)
+
+    def _reindex(self) -> None:
+        self._row_of = {window.hwnd: row for row, window in enumerate(self._rows)}
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """在儲存格中繪製按鈕，不為每一列建立元件"""
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 4, -4, -4)
+        button.text = index.data()
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and option.rect.contains(event.position().toPoint()):
+            self.clicked.emit(index.row())
+            return True
+        return False
@@ -0,0 +1,59 @@
+import threading
+import traceback
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """背景工作回報給 UI 執行緒的訊號"""
+    progress = pyqtSignal(int, int, str)   # 已完成數量、總數、訊息
+    partial = pyqtSignal(object)           # 部分結果
+    finished = pyqtSignal(bool, str)       # 是否成功、訊息
+
+
+class Worker(QRunnable):
+    """在 QThreadPool 中執行耗時操作
+
+    被執行的函式會收到 progress、partial 與 cancel_event 三個關鍵字參數，
+    需回傳 (success, message)。
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """要求工作盡快停止"""
+        self.cancel_event.set()
+
+    def call(self):
+        return self.func(
+            *self.args,
+            progress=self.signals.progress.emit,
+            partial=self.signals.partial.emit,
+            cancel_event=self.cancel_event,
+            **self.kwargs
+        )
+
+    def run(self):
+        try:
+            success, message = self.call()
+        except Exception as e:
+            traceback.print_exc()
+            success, message = False, f"背景工作發生錯誤: {str(e)}"
+        self.signals.finished.emit(success, message)
+
+
+class TaskWorker(Worker):
+    """在 QThreadPool 中執行不回報進度、不能取消的短暫工作
+
+    被執行的函式只收到建立時的參數，需回傳 (success, message)。
+    """
+
+    def call(self):
+        return self.func(*self.args, **self.kwargs)